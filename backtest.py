@@ -0,0 +1,211 @@
+"""
+Vectorized backtest of the 1st Buy / 2nd Buy / 1st Sell strategy.
+
+Uses the same indicator (indicators.AlignedCloses) and signal (signals.SIGNAL_RULES)
+code as the daily briefing, evaluated on the full price history of every ticker
+at once. A long position is opened at the close of a Buy1/Buy2 bar and closed at
+the close of the next Sell1 bar; trade returns come from array operations, not
+a bar-by-bar loop. Parameter grids are spread over a process pool.
+
+Usage:
+    python backtest.py --fast 10,20 --mid 50,60 --slow 100,120 --oversold 25,30 --overbought 70,75
+"""
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from indicators import AlignedCloses, EMA_LENGTHS, RSI_LENGTH
+from signals import SIGNAL_PARAMS, compile_rules
+
+DEFAULT_GRID = {
+    "fast": [EMA_LENGTHS[0]],
+    "mid": [EMA_LENGTHS[1]],
+    "slow": [EMA_LENGTHS[2]],
+    "rsi_oversold": [SIGNAL_PARAMS["rsi_oversold"]],
+    "rsi_overbought": [SIGNAL_PARAMS["rsi_overbought"]],
+}
+
+
+def positions_from_signals(signals):
+    """
+    Long (1) from a Buy1/Buy2 bar until the next Sell1 bar, flat (0) otherwise.
+    Each argument frame is date x ticker; returns a float frame of the same shape.
+    """
+    entries = signals["Buy1"] | signals["Buy2"]
+    exits = signals["Sell1"]
+    state = pd.DataFrame(np.nan, index=entries.index, columns=entries.columns)
+    state = state.mask(exits, 0.0).mask(entries, 1.0)
+    return state.ffill().fillna(0.0)
+
+def trade_statistics(closes, positions):
+    """
+    Per-ticker performance of holding `positions` (decided at each close).
+    Returns a DataFrame indexed by ticker.
+    """
+    log_returns = np.log(closes / closes.ffill().shift(1)).fillna(0.0)
+    held = positions.shift(1).fillna(0.0)
+    strategy = held * log_returns
+
+    equity = np.exp(strategy.cumsum())
+    drawdown = (equity / equity.cummax() - 1).min()
+
+    # Trade ids: every flat -> long transition starts a new trade
+    starts = (positions.diff().fillna(positions) > 0)
+    trade_id = starts.cumsum()
+    per_bar = strategy.stack()
+    mask = held.stack() > 0
+    keys = trade_id.stack()[mask]
+    trade_log = per_bar[mask].groupby([keys.index.get_level_values(1), keys.values]).sum()
+    trade_returns = np.exp(trade_log) - 1
+
+    stats = pd.DataFrame({
+        "total_return": np.exp(strategy.sum()) - 1,
+        "trades": starts.sum(),
+        "max_drawdown": drawdown,
+    })
+    if len(trade_returns):
+        stats["win_rate"] = (trade_returns > 0).groupby(level=0).mean()
+        stats["avg_trade"] = trade_returns.groupby(level=0).mean()
+    else:
+        stats["win_rate"] = np.nan
+        stats["avg_trade"] = np.nan
+    return stats
+
+def run_config(aligned, fast, mid, slow, rsi_oversold, rsi_overbought, ema_cache=None, rsi=None):
+    """Backtest one parameter set over every ticker; returns per-ticker statistics."""
+    ema_cache = ema_cache if ema_cache is not None else {}
+    for length in (fast, mid, slow):
+        if length not in ema_cache:
+            ema_cache[length] = aligned.ema(length)
+    frame = {
+        "Close": aligned.closes,
+        "RSI": rsi if rsi is not None else aligned.rsi(RSI_LENGTH),
+        "fast": ema_cache[fast],
+        "mid": ema_cache[mid],
+        "slow": ema_cache[slow],
+    }
+    evaluate = compile_rules(
+        params={"rsi_oversold": rsi_oversold, "rsi_overbought": rsi_overbought},
+        columns={"Close": "Close", "RSI": "RSI", "FastEMA": "fast", "MidEMA": "mid", "SlowEMA": "slow"},
+    )
+    return trade_statistics(aligned.closes, positions_from_signals(evaluate(frame)))
+
+def summarize(stats):
+    return {
+        "avg_return": stats["total_return"].mean(),
+        "trades": int(stats["trades"].sum()),
+        "win_rate": stats["win_rate"].mean(),
+        "avg_max_drawdown": stats["max_drawdown"].mean(),
+    }
+
+
+# Per-process state for the sweep workers (the close matrix is sent once per worker)
+_WORKER = {}
+
+def _init_worker(closes):
+    _WORKER["aligned"] = AlignedCloses(closes)
+    _WORKER["rsi"] = _WORKER["aligned"].rsi(RSI_LENGTH)
+    _WORKER["ema"] = {}
+
+def _run_group(task):
+    """Run every threshold pair for one EMA-length combination (indicators computed once)."""
+    (fast, mid, slow), thresholds = task
+    rows = []
+    for rsi_oversold, rsi_overbought in thresholds:
+        stats = run_config(_WORKER["aligned"], fast, mid, slow, rsi_oversold, rsi_overbought,
+                           ema_cache=_WORKER["ema"], rsi=_WORKER["rsi"])
+        rows.append({
+            "fast": fast, "mid": mid, "slow": slow,
+            "rsi_oversold": rsi_oversold, "rsi_overbought": rsi_overbought,
+            **summarize(stats),
+        })
+    return rows
+
+def sweep(closes, grid=None, workers=None):
+    """
+    Backtest every combination in `grid` ({param: [values]}) over the close matrix.
+    Configurations sharing EMA lengths are grouped so their indicators are computed once.
+    Returns a DataFrame with one row per configuration, best average return first.
+    """
+    grid = {**DEFAULT_GRID, **(grid or {})}
+    thresholds = list(itertools.product(grid["rsi_oversold"], grid["rsi_overbought"]))
+    tasks = [
+        ((fast, mid, slow), thresholds)
+        for fast, mid, slow in itertools.product(grid["fast"], grid["mid"], grid["slow"])
+        if fast < mid < slow
+    ]
+    if not tasks:
+        return pd.DataFrame()
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        _init_worker(closes)
+        results = [_run_group(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(closes,)) as pool:
+            results = list(pool.map(_run_group, tasks))
+
+    table = pd.DataFrame([row for rows in results for row in rows])
+    return table.sort_values("avg_return", ascending=False).reset_index(drop=True)
+
+def load_closes(tickers, update=True):
+    """Date x ticker close matrix from the local price store."""
+    from price_store import PriceStore
+
+    store = PriceStore()
+    if update:
+        histories = store.get_histories(tickers)
+    else:
+        histories = {t: store.load(t) for t in tickers}
+    return pd.DataFrame({t: h['Close'] for t, h in histories.items() if not h.empty})
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+def _float_list(value):
+    return [float(v) for v in value.split(",") if v]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FinRep: Backtest the EMA/RSI signal strategy")
+    parser.add_argument("--tickers", help="Comma-separated tickers (default: main.TICKERS)")
+    parser.add_argument("--fast", type=_int_list, default=DEFAULT_GRID["fast"], help="Fast EMA lengths, e.g. 10,20")
+    parser.add_argument("--mid", type=_int_list, default=DEFAULT_GRID["mid"], help="Mid EMA lengths, e.g. 50,60")
+    parser.add_argument("--slow", type=_int_list, default=DEFAULT_GRID["slow"], help="Slow EMA lengths, e.g. 100,120")
+    parser.add_argument("--oversold", type=_float_list, default=DEFAULT_GRID["rsi_oversold"], help="RSI buy thresholds, e.g. 25,30")
+    parser.add_argument("--overbought", type=_float_list, default=DEFAULT_GRID["rsi_overbought"], help="RSI sell thresholds, e.g. 70,75")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--offline", action="store_true", help="Use stored history only (no download)")
+    parser.add_argument("--top", type=int, default=20, help="Number of configurations to print")
+    parser.add_argument("--out", help="Write the full result table to this CSV file")
+    args = parser.parse_args()
+
+    if args.tickers:
+        tickers = [t.strip() for t in args.tickers.split(",") if t.strip()]
+    else:
+        from main import TICKERS
+        tickers = TICKERS
+
+    closes = load_closes(tickers, update=not args.offline)
+    if closes.empty:
+        print("❌ No price history available for backtesting.")
+        exit(1)
+
+    grid = {
+        "fast": args.fast, "mid": args.mid, "slow": args.slow,
+        "rsi_oversold": args.oversold, "rsi_overbought": args.overbought,
+    }
+    print(f"Backtesting {len(closes.columns)} tickers over {len(closes)} bars...")
+    table = sweep(closes, grid, workers=args.workers)
+    if table.empty:
+        print("No valid configurations (EMA lengths must satisfy fast < mid < slow).")
+        exit(1)
+
+    print(table.head(args.top).to_string(index=False))
+    if args.out:
+        table.to_csv(args.out, index=False)
+        print(f"Saved {len(table)} configurations to {args.out}")
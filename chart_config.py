@@ -0,0 +1,52 @@
+"""
+Chart settings and rendering jobs.
+
+Kept free of matplotlib / mplfinance / Pillow so the analysis stage and the report
+can use them without loading the plotting libraries (see charts.py for rendering).
+"""
+CHART_DIR = "public/charts"
+
+# Columns charts.generate_chart reads (only these are sent to the worker processes)
+CHART_COLUMNS = ['Open', 'High', 'Low', 'Close', 'EMA20', 'EMA60', 'EMA120', 'RSI']
+CHART_BARS = 120
+
+# Style and layout of every chart. Part of the chart cache key, so changing a value
+# here re-renders the charts; bump CHART_RENDERER_VERSION when the drawing code changes.
+CHART_STYLE = {
+    "bars": CHART_BARS,
+    "colors": {
+        "up": '#10b981', "down": '#f43f5e',
+        "EMA20": '#f59e0b', "EMA60": '#8b5cf6', "EMA120": '#64748b', "RSI": '#313d4a',
+        "EMA20_label": '#f59e0b', "EMA60_label": '#8b5cf6', "EMA120_label": '#475569',
+        "high": '#f43f5e', "low": '#10b981',
+        "grid": '#f1f5f9', "edge": '#cbd5e1',
+    },
+    "ema_width": 1.2,
+    "rsi_width": 1.0,
+    "rsi_guides": [[70, '#f43f5e'], [30, '#10b981']],
+    "font_size": 6.5,
+    "label_size": 6,
+    "figratio": [12, 8],
+    "panel_ratios": [2, 1],
+    "margins": {"left": 0.12, "right": 0.85, "top": 0.8, "bottom": 0.2},
+    "dpi": 160,
+}
+CHART_RENDERER_VERSION = 1
+
+# Thumbnail (shown in the cards) and full-size (zoom modal) image variants
+CHART_VARIANTS = {
+    "thumb_width": 720,
+    "avif": {"quality": 60, "speed": 8},
+    "webp": {"quality": 85, "method": 4},
+}
+
+
+def chart_job(symbol, df, filename):
+    """Picklable rendering job with just the bars and columns the chart needs."""
+    columns = [c for c in CHART_COLUMNS if c in df.columns]
+    return (symbol, df[columns].tail(CHART_BARS).copy(), filename)
+
+def thumb_size():
+    """(width, height) in pixels of the card thumbnails."""
+    width = CHART_VARIANTS["thumb_width"]
+    return width, round(width * CHART_STYLE["figratio"][1] / CHART_STYLE["figratio"][0])
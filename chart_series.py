@@ -0,0 +1,108 @@
+"""
+Compact chart series for client-side rendering (--chart-mode series).
+
+Instead of a PNG, each ticker gets a small JSON file with the chart window's
+OHLC, EMA20/60/120 and RSI values, which static/series-chart.js draws in the
+browser with the same colors and high/low markers as the rendered charts.
+
+Values are stored as integers in units of 1/scale and delta-encoded per series
+(null marks a missing value; the next value is relative to the last present
+one). Dates are stored as day offsets from the previous bar.
+"""
+import json
+import math
+import os
+
+from chart_config import CHART_BARS, CHART_DIR
+
+SERIES_VERSION = 1
+
+# Series name in the file -> DataFrame column
+SERIES_COLUMNS = {
+    "o": "Open",
+    "h": "High",
+    "l": "Low",
+    "c": "Close",
+    "ema20": "EMA20",
+    "ema60": "EMA60",
+    "ema120": "EMA120",
+    "rsi": "RSI",
+}
+
+
+def series_filename(symbol):
+    return f"{symbol}_series.json"
+
+def price_scale(closes):
+    """Integer units per price unit: cents, or 1/10000 for sub-dollar prices."""
+    finite = [abs(v) for v in closes if not math.isnan(v)]
+    return 100 if finite and min(finite) >= 1 else 10000
+
+def delta_encode(values, scale):
+    encoded = []
+    prev = 0
+    for v in values:
+        if math.isnan(v):
+            encoded.append(None)
+            continue
+        q = int(round(v * scale))
+        encoded.append(q - prev)
+        prev = q
+    return encoded
+
+def delta_decode(encoded, scale):
+    values = []
+    prev = 0
+    for d in encoded:
+        if d is None:
+            values.append(float("nan"))
+            continue
+        prev += d
+        values.append(prev / scale)
+    return values
+
+def encode_series(symbol, df):
+    """Compact dict for the last CHART_BARS complete bars of `df` (same window as the PNG chart)."""
+    plot_df = df.tail(CHART_BARS).dropna(subset=['Open', 'High', 'Low', 'Close'])
+    if plot_df.empty:
+        raise ValueError(f"No price data to chart for {symbol}")
+    scale = price_scale([float(v) for v in plot_df['Close']])
+    days = [d.toordinal() for d in plot_df.index.date]
+    series = {}
+    for name, column in SERIES_COLUMNS.items():
+        if column not in plot_df.columns or plot_df[column].isnull().all():
+            continue
+        series[name] = delta_encode([float(v) for v in plot_df[column]], scale)
+    return {
+        "v": SERIES_VERSION,
+        "symbol": symbol,
+        "start": plot_df.index[0].strftime('%Y-%m-%d'),
+        "days": [0] + [b - a for a, b in zip(days, days[1:])],
+        "scale": scale,
+        "series": series,
+    }
+
+def write_series(symbol, df, filename=None):
+    """Write `symbol`'s series file to CHART_DIR. Returns its path."""
+    os.makedirs(CHART_DIR, exist_ok=True)
+    full_path = os.path.join(CHART_DIR, filename or series_filename(symbol))
+    tmp_path = f"{full_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(encode_series(symbol, df), f, separators=(",", ":"))
+    os.replace(tmp_path, full_path)
+    return full_path
+
+def write_series_files(jobs):
+    """
+    Write a series file per chart job ((symbol, df, filename) tuples, see chart_config.chart_job).
+    Returns one {"Symbol", "Path", "Status", "Error", "Cached"} dict per job, like render_charts.
+    """
+    statuses = []
+    for symbol, df, filename in jobs:
+        full_path = os.path.join(CHART_DIR, filename)
+        try:
+            write_series(symbol, df, filename)
+            statuses.append({"Symbol": symbol, "Path": full_path, "Status": "ok", "Error": None, "Cached": False})
+        except Exception as e:
+            statuses.append({"Symbol": symbol, "Path": full_path, "Status": "error", "Error": str(e), "Cached": False})
+    return statuses
@@ -0,0 +1,424 @@
+"""
+Chart rendering.
+
+Matplotlib rendering is CPU-bound and holds the GIL, so the charts of a run are
+rendered by a process pool (see render_charts) on the non-interactive Agg backend.
+This module imports matplotlib, mplfinance and Pillow; the style, variant settings
+and chart_job live in chart_config so the analysis stage doesn't load them.
+"""
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+import mplfinance as mpf
+import matplotlib.colors as mcolors
+import matplotlib.dates as mdates
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import PIL
+from PIL import Image, features
+
+from chart_config import (CHART_BARS, CHART_DIR, CHART_RENDERER_VERSION, CHART_STYLE,
+                          CHART_VARIANTS, chart_job)
+from storage import cache_path
+
+# Image formats written for each chart variant (AVIF / WebP when Pillow supports them)
+IMAGE_FORMATS = [fmt for fmt in ("avif", "webp") if features.check(fmt)] + ["png"]
+
+# Rendered images keyed by chart_key(), under the cache root
+CHART_CACHE_NAME = "charts"
+CHART_CACHE_LIMIT = 500
+
+
+def chart_key(plot_df):
+    """
+    Content hash of everything that determines a chart image: the plotted bars and
+    indicator values (with their dates), the style/layout parameters, the renderer
+    version and the plotting library versions.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps({
+        "renderer": CHART_RENDERER_VERSION,
+        "style": CHART_STYLE,
+        "columns": [str(c) for c in plot_df.columns],
+        "variants": [CHART_VARIANTS, IMAGE_FORMATS],
+        "libraries": [matplotlib.__version__, getattr(mpf, "__version__", ""), PIL.__version__],
+    }, sort_keys=True).encode("utf-8"))
+    digest.update(plot_df.index.astype(str).str.cat(sep=",").encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(plot_df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def chart_variants(filename):
+    """
+    Image files produced for a chart: the full-resolution image and a thumbnail, each
+    in every available format (AVIF / WebP when Pillow supports them, PNG always).
+    Returns {"full": {format: filename}, "thumb": {format: filename}}, best format first.
+    """
+    base = os.path.splitext(filename)[0]
+    return {
+        "full": {fmt: f"{base}.{fmt}" for fmt in IMAGE_FORMATS},
+        "thumb": {fmt: f"{base}_thumb.{fmt}" for fmt in IMAGE_FORMATS},
+    }
+
+def _variant_files(filename):
+    variants = chart_variants(filename)
+    return list(variants["full"].values()) + list(variants["thumb"].values())
+
+def write_variants(full_path):
+    """Derive the thumbnail and the AVIF/WebP variants from the rendered full-size PNG."""
+    directory, filename = os.path.split(full_path)
+    variants = chart_variants(filename)
+    with Image.open(full_path) as image:
+        full = image.convert("RGB")
+    width = CHART_VARIANTS["thumb_width"]
+    thumb = full.resize((width, round(full.height * width / full.width)), Image.LANCZOS)
+    for size, img in [("full", full), ("thumb", thumb)]:
+        for fmt, name in variants[size].items():
+            path = os.path.join(directory, name)
+            if path == full_path:
+                continue
+            if fmt == "png":
+                # Few colors in a chart: a palette PNG keeps the fallback thumbnail small
+                img.quantize(256).save(path, "PNG", optimize=True)
+            else:
+                img.save(path, fmt.upper(), **CHART_VARIANTS[fmt])
+
+def restore_cached_chart(key, filename):
+    """Copy the cached images for `key` to CHART_DIR. Returns False on a cache miss."""
+    base = os.path.splitext(filename)[0]
+    copies = [(cache_path(CHART_CACHE_NAME, key + name[len(base):]), os.path.join(CHART_DIR, name))
+              for name in _variant_files(filename)]
+    if not all(os.path.exists(cached) for cached, _ in copies):
+        return False
+    os.makedirs(CHART_DIR, exist_ok=True)
+    for cached, target in copies:
+        shutil.copyfile(cached, target)
+    os.utime(copies[0][0])  # most recently used
+    return True
+
+def store_cached_chart(key, filename):
+    base = os.path.splitext(filename)[0]
+    for name in _variant_files(filename):
+        cached = cache_path(CHART_CACHE_NAME, key + name[len(base):])
+        tmp_path = f"{cached}.{os.getpid()}.tmp"
+        shutil.copyfile(os.path.join(CHART_DIR, name), tmp_path)
+        os.replace(tmp_path, cached)
+
+def prune_chart_cache(limit=CHART_CACHE_LIMIT):
+    """Keep only the images of the `limit` most recently used charts."""
+    directory = cache_path(CHART_CACHE_NAME, "")
+    try:
+        files = {}
+        for name in os.listdir(directory):
+            files.setdefault(name[:64], []).append(os.path.join(directory, name))
+        # The full-size PNG is touched on every cache hit
+        last_used = {key: os.path.getmtime(os.path.join(directory, f"{key}.png"))
+                     if os.path.exists(os.path.join(directory, f"{key}.png")) else 0 for key in files}
+        for key in sorted(files, key=last_used.get, reverse=True)[limit:]:
+            for path in files[key]:
+                os.remove(path)
+    except OSError as e:
+        print(f"Error pruning chart cache: {e}")
+
+def plot_frame(df):
+    # Use more trading days for better context (120 days)
+    plot_df = df.tail(CHART_STYLE["bars"]).copy()
+    
+    # Remove empty data
+    return plot_df.dropna(subset=['Open', 'High', 'Low', 'Close'])
+
+EMA_LINES = [('EMA20', 'EMA 20'), ('EMA60', 'EMA 60'), ('EMA120', 'EMA 120')]
+
+
+class ChartTemplate:
+    """
+    Styled chart figure built once per process (and bar count) with mplfinance.
+
+    The market colors, style, figure, panels, margins, RSI guide lines and tick
+    settings are set up when the template is created; render() only swaps a
+    symbol's candles, EMA/RSI lines, value labels and high/low annotations into
+    the existing artists and saves the figure.
+    """
+
+    def __init__(self, bars):
+        self.bars = bars
+        colors = CHART_STYLE["colors"]
+        label_size = CHART_STYLE["label_size"]
+
+        # Minimal style settings
+        self.marketcolors = mpf.make_marketcolors(up=colors['up'], down=colors['down'], edge='inherit', wick='inherit', volume='inherit')
+        style = mpf.make_mpf_style(
+            marketcolors=self.marketcolors, 
+            gridstyle=':', 
+            gridcolor=colors['grid'],
+            facecolor='white', 
+            edgecolor=colors['edge'],
+            rc={'font.family': 'sans-serif', 'font.size': CHART_STYLE["font_size"]}
+        )
+
+        # Placeholder bars; every line is added so any symbol's data can be swapped in
+        placeholder = pd.DataFrame(
+            {column: np.linspace(1.0, 2.0, bars) for column in ['Open', 'High', 'Low', 'Close']},
+            index=pd.bdate_range("2000-01-03", periods=bars),
+        )
+        apds = [
+            mpf.make_addplot(placeholder['Close'], color=colors[name], width=CHART_STYLE["ema_width"], label=label)
+            for name, label in EMA_LINES
+        ]
+        apds.append(mpf.make_addplot(placeholder['Close'], panel=1, color=colors['RSI'], width=CHART_STYLE["rsi_width"], secondary_y=False))
+
+        # Set sufficient margins to center the chart body (box)
+        width_config = {}
+        self.fig, self.axes = mpf.plot(
+            placeholder,
+            type='candle',
+            addplot=apds,
+            volume=False,
+            figratio=tuple(CHART_STYLE["figratio"]), # Adjusted aspect ratio
+            style=style,
+            returnfig=True,
+            panel_ratios=tuple(CHART_STYLE["panel_ratios"]),
+            tight_layout=False,
+            ylabel='',
+            ylabel_lower='',
+            return_width_config=width_config
+        )
+        self.candle_width = width_config['candle_width']
+        main_ax, rsi_ax = self.axes[0], self.axes[2]
+        self.wicks, self.bodies = main_ax.collections[0], main_ax.collections[1]
+        self.ema_lines = dict(zip([name for name, _ in EMA_LINES], main_ax.lines))
+        self.rsi_line = rsi_ax.lines[0]
+
+        # Reflect user feedback: Reduce left margin per orange guideline (0.2 -> 0.12)
+        # Maintain right margin (right=0.8) -> Increased to 0.85 for labels
+        # Maintain top/bottom margins (top=0.8, bottom=0.2)
+        self.fig.subplots_adjust(**CHART_STYLE["margins"])
+
+        # RSI Horizontal lines
+        self.rsi_guides = [
+            rsi_ax.axhline(y=level, color=color, linestyle='--', linewidth=0.6, alpha=0.3)
+            for level, color in CHART_STYLE["rsi_guides"]
+        ]
+
+        # Axis alignment settings
+        main_ax.set_ylabel('')
+        rsi_ax.set_ylabel('')
+
+        # Current EMA values as text labels on the right margin
+        self.value_labels = {
+            name: main_ax.text(0, 0, '', color=colors[f'{name}_label'],
+                               fontsize=label_size, fontweight='bold', va='center', ha='left')
+            for name, _ in EMA_LINES
+        }
+
+        # Font and tick settings (Adjust pad so numbers appear outside the chart box with sufficient space)
+        for ax in self.axes:
+            ax.tick_params(axis='y', labelsize=label_size, pad=5)
+            ax.tick_params(axis='x', labelsize=label_size, pad=5)
+
+        # High/Low price annotations
+        self.high_note = main_ax.annotate('', xy=(0, 0), xytext=(0, 5), textcoords='offset points',
+                                          ha='center', va='bottom', fontsize=label_size, fontweight='bold',
+                                          color=colors['high'],
+                                          arrowprops=dict(arrowstyle='-', color=colors['high'], linewidth=0.5))
+        self.low_note = main_ax.annotate('', xy=(0, 0), xytext=(0, -5), textcoords='offset points',
+                                         ha='center', va='top', fontsize=label_size, fontweight='bold',
+                                         color=colors['low'],
+                                         arrowprops=dict(arrowstyle='-', color=colors['low'], linewidth=0.5))
+
+    def _set_candles(self, opens, highs, lows, closes):
+        xs = np.arange(len(opens))
+        delta = self.candle_width / 2.0
+        self.bodies.set_verts([
+            ((x - delta, o), (x - delta, c), (x + delta, c), (x + delta, o))
+            for x, o, c in zip(xs, opens, closes)
+        ])
+        self.wicks.set_segments(
+            [((x, l), (x, min(o, c))) for x, l, o, c in zip(xs, lows, opens, closes)] +
+            [((x, h), (x, max(o, c))) for x, h, o, c in zip(xs, highs, opens, closes)]
+        )
+        mc = self.marketcolors
+        up = opens < closes
+        pick = lambda key: [mc[key]['up'] if u else mc[key]['down'] for u in up]
+        self.bodies.set_facecolor([mcolors.to_rgba(c, mc['alpha']) for c in pick('candle')])
+        self.bodies.set_edgecolor(pick('edge'))
+        self.wicks.set_color(pick('wick'))
+
+    def render(self, plot_df, full_path):
+        """Swap `plot_df` (CHART_BARS rows or fewer, see plot_frame) into the figure and save it."""
+        if len(plot_df) != self.bars:
+            raise ValueError(f"Chart template for {self.bars} bars got {len(plot_df)}")
+        main_ax, rsi_ax = self.axes[0], self.axes[2]
+        xs = np.arange(len(plot_df))
+        opens, highs, lows, closes = (plot_df[c].to_numpy(dtype=float) for c in ['Open', 'High', 'Low', 'Close'])
+        self._set_candles(opens, highs, lows, closes)
+
+        # EMA lines (only those with data, e.g. no EMA 120 for newly listed stocks) and RSI
+        shown = []
+        for name, line in self.ema_lines.items():
+            has_data = name in plot_df.columns and not plot_df[name].isnull().all()
+            line.set_visible(has_data)
+            if has_data:
+                line.set_data(xs, plot_df[name].to_numpy(dtype=float))
+                shown.append(line)
+        has_rsi = 'RSI' in plot_df.columns and not plot_df['RSI'].isnull().all()
+        self.rsi_line.set_visible(has_rsi)
+        if has_rsi:
+            self.rsi_line.set_data(xs, plot_df['RSI'].to_numpy(dtype=float))
+
+        # Legend settings (Simple)
+        main_ax.legend(handles=shown, loc='upper left', fontsize=CHART_STYLE["label_size"], frameon=False)
+
+        # Dates on the x axis (mplfinance plots bars against their integer position)
+        dates = mdates.date2num(plot_df.index.to_pydatetime())
+        fmt = '%Y-%b-%d' if plot_df.index[0].year != plot_df.index[-1].year else '%b %d'
+        for ax in self.axes:
+            formatter = ax.xaxis.get_major_formatter()
+            if hasattr(formatter, 'dates'):
+                formatter.dates, formatter.len, formatter.fmt = dates, len(dates), fmt
+
+        # Axis limits as mplfinance derives them (bar range padded by one bar spacing);
+        # the RSI guide lines don't widen the RSI panel's range
+        spacing = (xs[-1] - xs[0]) / float(len(xs))
+        corners = (xs[0] - spacing, np.nanmin(lows)), (xs[-1] + spacing, np.nanmax(highs))
+        for guide in self.rsi_guides:
+            guide.set_visible(False)
+        for ax in (main_ax, rsi_ax):
+            ax.relim(visible_only=True)
+        for guide in self.rsi_guides:
+            guide.set_visible(True)
+        main_ax.update_datalim(corners)
+        for ax in (main_ax, rsi_ax):
+            ax.autoscale_view()
+
+        # Current EMA values on the right margin
+        last_p = plot_df.iloc[-1]
+        for name, label in self.value_labels.items():
+            val = last_p[name] if name in last_p else np.nan
+            label.set_visible(not pd.isna(val))
+            if not pd.isna(val):
+                label.set_position((len(plot_df)-0.5, val))
+                label.set_text(f' {val:.2f}')
+
+        # Highest / lowest point of the window
+        max_pos, min_pos = int(np.nanargmax(highs)), int(np.nanargmin(lows))
+        self.high_note.xy = (max_pos, highs[max_pos])
+        self.high_note.set_text(f'{highs[max_pos]:.2f}')
+        self.low_note.xy = (min_pos, lows[min_pos])
+        self.low_note.set_text(f'{lows[min_pos]:.2f}')
+
+        self.fig.savefig(full_path, dpi=CHART_STYLE["dpi"])
+
+# Templates of this process, by bar count (most tickers have the full CHART_BARS window)
+_TEMPLATES = {}
+
+def chart_template(bars):
+    if bars not in _TEMPLATES:
+        _TEMPLATES[bars] = ChartTemplate(bars)
+    return _TEMPLATES[bars]
+
+def generate_chart(symbol, df, filename, use_cache=True):
+    """
+    Render `symbol`'s chart to CHART_DIR/filename. Returns True when the image was
+    rendered and False when an identical image was reused from the chart cache.
+    """
+    plot_df = plot_frame(df)
+    
+    # Create chart folder (several workers may get here at once)
+    os.makedirs(CHART_DIR, exist_ok=True)
+    full_path = os.path.join(CHART_DIR, filename)
+
+    # Reuse the image if these exact inputs were rendered before (reruns, holidays)
+    key = chart_key(plot_df) if use_cache else None
+    if key and restore_cached_chart(key, filename):
+        print(f"Reusing cached chart: {full_path}")
+        return False
+
+    if plot_df.empty:
+        raise ValueError(f"No price data to chart for {symbol}")
+
+    # Save chart
+    print(f"Generating chart: {full_path}")
+    chart_template(len(plot_df)).render(plot_df, full_path)
+    if os.path.exists(full_path):
+        print(f"Successfully saved chart to {full_path}")
+        write_variants(full_path)
+        if key:
+            try:
+                store_cached_chart(key, filename)
+            except OSError as e:
+                print(f"Error caching chart {full_path}: {e}")
+    else:
+        print(f"Failed to save chart to {full_path}")
+    return True
+
+def _status(symbol, full_path, status, error=None, cached=False):
+    variants = chart_variants(os.path.basename(full_path)) if status == "ok" else None
+    return {"Symbol": symbol, "Path": full_path, "Status": status, "Error": error, "Cached": cached,
+            "Variants": variants}
+
+def render_chart(job):
+    """
+    Render one job; returns {"Symbol", "Path", "Status", "Error", "Cached", "Variants"}
+    instead of raising ("Variants" as in chart_variants).
+    """
+    symbol, df, filename = job
+    full_path = os.path.join(CHART_DIR, filename)
+    try:
+        rendered = generate_chart(symbol, df, filename)
+    except Exception as e:
+        # Start from fresh templates after a failed render
+        _TEMPLATES.clear()
+        plt.close('all')
+        return _status(symbol, full_path, "error", str(e))
+    if not os.path.exists(full_path):
+        return _status(symbol, full_path, "error", "chart file was not written")
+    return _status(symbol, full_path, "ok", cached=not rendered)
+
+def _restore(job):
+    """Cache lookup done in the parent so unchanged charts never reach the pool."""
+    symbol, df, filename = job
+    full_path = os.path.join(CHART_DIR, filename)
+    try:
+        if restore_cached_chart(chart_key(plot_frame(df)), filename):
+            return _status(symbol, full_path, "ok", cached=True)
+    except Exception:
+        pass  # let the renderer report the problem
+    return None
+
+def _init_worker():
+    matplotlib.use("Agg", force=True)
+
+def render_charts(jobs, workers=None):
+    """
+    Render chart jobs (see chart_job) on a pool of `workers` processes (default: CPU count).
+    Charts whose inputs are unchanged are copied from the chart cache without rendering.
+    Returns one status dict per job, in the same order as `jobs`.
+    """
+    jobs = list(jobs)
+    statuses = [_restore(job) for job in jobs]
+    pending = [i for i, status in enumerate(statuses) if status is None]
+    if not pending:
+        return statuses
+    print(f"Chart cache: {len(statuses) - len(pending)} reused, {len(pending)} to render")
+
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    rendered = None
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                rendered = list(pool.map(render_chart, [jobs[i] for i in pending]))
+        except Exception as e:
+            # e.g. no process support in the sandbox or a crashed worker
+            print(f"Error rendering charts in worker processes, rendering serially: {e}")
+    if rendered is None:
+        rendered = [render_chart(jobs[i]) for i in pending]
+    for i, status in zip(pending, rendered):
+        statuses[i] = status
+    prune_chart_cache()
+    return statuses
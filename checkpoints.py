@@ -0,0 +1,72 @@
+"""
+Per-market-date stage checkpoints.
+
+Each stage of a run saves its output under .cache/runs/<market date>/<stage>.json
+together with the inputs it was computed from. A later run for the same market
+date reuses a stage's output while those inputs are unchanged, so re-rendering
+the report or retrying a failed notification doesn't refetch, recompute or
+re-render everything. Only the newest RUNS_KEEP run directories are kept.
+"""
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+
+from results_json import json_safe
+from storage import cache_path
+
+RUNS_DIR_NAME = "runs"
+RUNS_KEEP = 14
+
+
+class RunCheckpoint:
+    def __init__(self, market_date, root=None, enabled=True):
+        self.root = root or cache_path(RUNS_DIR_NAME)
+        self.market_date = market_date
+        self.dir = os.path.join(self.root, market_date)
+        # Disabled checkpoints (--fresh) never return saved outputs but still record the new ones
+        self.enabled = enabled
+
+    def _path(self, stage):
+        return os.path.join(self.dir, f"{stage}.json")
+
+    def load(self, stage, inputs=None):
+        """Saved output of `stage`, or None if there is none or it was computed from other inputs."""
+        if not self.enabled:
+            return None
+        try:
+            with open(self._path(stage), "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if saved.get("inputs") != json_safe(inputs):
+            return None
+        return saved.get("output")
+
+    def done(self, stage):
+        """True if `stage` has saved an output for this market date (even with --fresh)."""
+        return os.path.exists(self._path(stage))
+
+    def save(self, stage, output, inputs=None):
+        path = self._path(stage)
+        try:
+            os.makedirs(self.dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(json_safe({
+                    "saved_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "inputs": inputs,
+                    "output": output,
+                }), f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error saving {stage} checkpoint: {e}")
+
+    def prune(self, keep=RUNS_KEEP):
+        """Remove all but the newest `keep` run directories."""
+        try:
+            runs = sorted(d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d)))
+            for name in runs[:-keep] if keep else runs:
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+        except OSError as e:
+            print(f"Error pruning run checkpoints: {e}")
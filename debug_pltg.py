@@ -2,10 +2,12 @@ import yfinance as yf
 import pandas as pd
 import pandas_ta as ta
 
+from yahoo_scheduler import YAHOO
+
 def debug_tickers():
     for ticker_symbol in ["BITU", "PLTG", "CRWU"]:
         ticker = yf.Ticker(ticker_symbol)
-        df = ticker.history(period="1y")
+        df = YAHOO.call("history", ticker.history, period="1y", key=[ticker_symbol, "1y"])
         df['EMA20'] = ta.ema(df['Close'], length=20)
         df['EMA60'] = ta.ema(df['Close'], length=60)
         df['EMA120'] = ta.ema(df['Close'], length=120)
@@ -0,0 +1,110 @@
+"""
+Near-duplicate headline clustering.
+
+The same story republished by several outlets usually differs only in a few
+words ("Nvidia shares rise after earnings beat" / "Nvidia stock rises after
+earnings beat estimates"). Headlines are reduced to sets of normalized words,
+summarized by MinHash signatures and bucketed with LSH (BANDS bands of ROWS
+rows), so only headlines sharing a bucket are compared; candidate pairs are then
+confirmed by their exact Jaccard similarity. Cost is linear in the number of
+headlines plus the (few) candidate pairs, instead of all n² pairs.
+"""
+import re
+import zlib
+
+import numpy as np
+
+# Pairs at or above this word-set Jaccard similarity are the same story
+SIMILARITY_THRESHOLD = 0.5
+
+# 16 bands x 3 rows: a pair at J=0.5 shares a bucket with ~88% probability, at J=0.6 ~98%, at J=0.1 ~2%
+BANDS = 16
+ROWS = 3
+
+# Headlines with fewer words are only grouped when their word sets are identical
+MIN_WORDS = 3
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "at", "by", "with", "from",
+    "as", "is", "are", "be", "its", "it", "this", "that", "after", "amid", "over", "says",
+}
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240101)
+_A = _rng.integers(1, _PRIME, BANDS * ROWS, dtype=np.int64)
+_B = _rng.integers(0, _PRIME, BANDS * ROWS, dtype=np.int64)
+
+
+def headline_words(title):
+    """Normalized word set: lowercase, punctuation and stopwords dropped, plural "s" stripped."""
+    words = set()
+    for word in re.findall(r"[\w']+", title.casefold().replace("'s", "")):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.add(word)
+    return frozenset(words)
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+def minhash(words):
+    """MinHash signature (BANDS * ROWS values) of a non-empty word set."""
+    hashes = np.fromiter((zlib.crc32(w.encode("utf-8")) % _PRIME for w in words), dtype=np.int64, count=len(words))
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME).min(axis=1)
+
+def cluster_headlines(titles, threshold=SIMILARITY_THRESHOLD):
+    """
+    Group near-duplicate titles. Returns a cluster id per title; ids are the index
+    of the cluster's first title, so titles that match nothing keep their own index.
+    """
+    parent = list(range(len(titles)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+
+    words = [headline_words(t or "") for t in titles]
+    buckets = {}
+    for i, ws in enumerate(words):
+        if not ws:
+            continue
+        if len(ws) < MIN_WORDS:
+            key = ("exact", ws)
+            if key in buckets:
+                union(buckets[key][0], i)
+            else:
+                buckets[key] = [i]
+            continue
+        signature = minhash(ws)
+        for band in range(BANDS):
+            key = (band, signature[band * ROWS:(band + 1) * ROWS].tobytes())
+            members = buckets.setdefault(key, [])
+            for j in members:
+                if find(i) != find(j) and jaccard(ws, words[j]) >= threshold:
+                    union(i, j)
+            members.append(i)
+    return [find(i) for i in range(len(titles))]
+
+def best_of_clusters(items, title_of, rank_of, threshold=SIMILARITY_THRESHOLD):
+    """
+    Keep one item per near-duplicate cluster: the one with the lowest rank_of(item),
+    ties going to the earlier item. Kept items stay in their original order.
+    """
+    clusters = cluster_headlines([title_of(item) for item in items], threshold)
+    best = {}
+    for i, (cluster, item) in enumerate(zip(clusters, items)):
+        if cluster not in best or rank_of(item) < rank_of(items[best[cluster]]):
+            best[cluster] = i
+    keep = set(best.values())
+    return [item for i, item in enumerate(items) if i in keep]
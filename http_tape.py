@@ -0,0 +1,174 @@
+"""
+Record / replay of outbound HTTP (Yahoo via yfinance, Kakao).
+
+Every response-producing call goes through TAPE.call(namespace, key, fetch). In
+record mode the outcome of each call (its value, or the exception it raised) is
+pickled under the recording directory; in replay mode the recorded outcome is
+returned and nothing is sent, so a full run can be profiled offline and compared
+before and after a change. A replayed call that was never recorded raises
+ReplayMissError, which callers handle like any other failed request.
+
+What a run requests also depends on the local cache (stored price bars decide
+which bars are downloaded, cached names skip `info`, ...) and on the clock (the
+market date), so a recording also keeps a copy of the cache directory the run
+started from and the run's start time. Replay runs against a fresh copy of that
+cache at that time.
+
+Layout: <dir>/manifest.json, <dir>/responses/<namespace>/<digest>.pickle, <dir>/cache/.
+Recordings contain the Kakao token responses, so keep them private.
+"""
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+OFF = "off"
+RECORD = "record"
+REPLAY = "replay"
+
+RECORDINGS_DIR = "recordings"
+
+# Cache entries a replay must not start from (saved stages would skip the work being replayed)
+SNAPSHOT_IGNORE = ["runs", "*.tmp"]
+
+
+class ReplayMissError(Exception):
+    """A replayed run made a request that the recording does not contain."""
+
+
+class HttpTape:
+    def __init__(self, mode=OFF, directory=None):
+        self.mode = mode
+        self.directory = directory
+        self.meta = {}      # run facts needed to replay it (start time, ...)
+        self._entries = {}  # response file -> {"namespace", "key"}
+        self.counts = dict.fromkeys(["recorded", "replayed", "missed"], 0)
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return self.mode != OFF
+
+    def start(self, mode, directory=RECORDINGS_DIR):
+        """Switch to RECORD or REPLAY; replay loads the recording's manifest."""
+        self.mode = mode
+        self.directory = directory
+        if mode == REPLAY:
+            try:
+                with open(os.path.join(directory, "manifest.json"), "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+                self.meta = manifest.get("meta", {})
+                self._entries = manifest.get("entries", {})
+            except (OSError, ValueError) as e:
+                print(f"Recording manifest unavailable ({e}). Replaying responses only.")
+        elif mode == RECORD:
+            os.makedirs(directory, exist_ok=True)
+
+    def _file(self, namespace, key):
+        digest = hashlib.sha1(json.dumps([namespace, key], sort_keys=True, default=str).encode()).hexdigest()
+        return os.path.join("responses", namespace, f"{digest}.pickle")
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def call(self, namespace, key, fetch):
+        """
+        `fetch()` recorded or replayed under (namespace, key). `key` must be
+        JSON-serializable and identify the request (symbol, period, URL, ...).
+        """
+        if self.mode == OFF:
+            return fetch()
+
+        name = self._file(namespace, key)
+        path = os.path.join(self.directory, name)
+        if self.mode == REPLAY:
+            try:
+                with open(path, "rb") as f:
+                    outcome = pickle.load(f)
+            except OSError:
+                self._count("missed")
+                raise ReplayMissError(f"No recorded {namespace} response for {key}")
+            self._count("replayed")
+            if "error" in outcome:
+                raise outcome["error"]
+            return outcome["value"]
+
+        try:
+            value = fetch()
+        except Exception as e:
+            self._write(name, namespace, key, {"error": e})
+            raise
+        self._write(name, namespace, key, {"value": value})
+        return value
+
+    def _write(self, name, namespace, key, outcome):
+        path = os.path.join(self.directory, name)
+        try:
+            data = pickle.dumps(outcome)
+        except Exception:
+            if "value" in outcome:
+                print(f"Could not record {namespace} response for {key}.")
+                return
+            data = pickle.dumps({"error": RuntimeError(repr(outcome["error"]))})
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error recording {namespace} response: {e}")
+            return
+        with self._lock:
+            self._entries[name] = {"namespace": namespace, "key": key}
+            self.counts["recorded"] += 1
+
+    def snapshot_cache(self, cache_dir):
+        """Keep a copy of the cache directory the recorded run starts from."""
+        target = os.path.join(self.directory, "cache")
+        shutil.rmtree(target, ignore_errors=True)
+        if os.path.isdir(cache_dir):
+            shutil.copytree(cache_dir, target, ignore=shutil.ignore_patterns(*SNAPSHOT_IGNORE))
+        else:
+            os.makedirs(target)
+
+    def restore_cache(self):
+        """Fresh temporary copy of the recorded cache snapshot; returns its path."""
+        target = tempfile.mkdtemp(prefix="finrep-replay-")
+        source = os.path.join(self.directory, "cache")
+        if os.path.isdir(source):
+            shutil.copytree(source, target, dirs_exist_ok=True)
+        return target
+
+    def save(self):
+        """Write the manifest of a recording (readable keys of every response and the run facts)."""
+        if self.mode != RECORD:
+            return
+        manifest = {
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "meta": self.meta,
+            "entries": dict(sorted(self._entries.items())),
+        }
+        path = os.path.join(self.directory, "manifest.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+    def summary(self):
+        return (f"HTTP {self.mode}: {self.counts['recorded']} recorded, {self.counts['replayed']} replayed, "
+                f"{self.counts['missed']} missing ({self.directory})")
+
+
+# Shared by the Yahoo scheduler and the Kakao calls; main.py starts it with --record / --replay,
+# other scripts with FINREP_RECORD=DIR / FINREP_REPLAY=DIR
+TAPE = HttpTape()
+if os.getenv("FINREP_REPLAY"):
+    TAPE.start(REPLAY, os.getenv("FINREP_REPLAY"))
+elif os.getenv("FINREP_RECORD"):
+    TAPE.start(RECORD, os.getenv("FINREP_RECORD"))
@@ -0,0 +1,314 @@
+"""
+Stateful EMA/RSI engine.
+
+EMA(20/60/120) and Wilder RSI(14) are plain recurrences, so after a full
+computation the engine saves each ticker's recurrence state (final EMA values,
+RSI average gain/loss, last close) and the next run only steps the new bars
+forward. Everything is recomputed when the stored history was revised.
+
+The step functions replay pandas' own `ewm(adjust=False).mean()` arithmetic,
+which is what `pandas_ta.ema` / `pandas_ta.rsi` use, so incremental values are
+bit-for-bit identical to a full recomputation (see `parity_check`).
+"""
+import json
+import math
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from storage import cache_path
+
+EMA_LENGTHS = (20, 60, 120)
+RSI_LENGTH = 14
+
+# Indicator values kept in the state for the newest bars (the chart window)
+KEEP_BARS = 120
+
+INDICATOR_STATE_NAME = "indicator_state.json"
+STATE_VERSION = 1
+
+NAN = float("nan")
+
+
+def ewm_alpha(span=None, alpha=None):
+    """Smoothing factor exactly as pandas derives it (via the center of mass)."""
+    com = (span - 1) / 2 if span is not None else (1 - alpha) / alpha
+    return 1. / (1. + com)
+
+def ewm_step(state, cur, alpha, ignore_na=False):
+    """
+    Advance an `ewm(adjust=False).mean()` recurrence by one observation.
+    `state` is [weighted, old_wt]; returns the new mean (NaN until the first observation).
+    """
+    weighted, old_wt = state
+    is_observation = cur == cur
+    if weighted == weighted:
+        if is_observation or not ignore_na:
+            old_wt *= 1. - alpha
+            if is_observation:
+                if weighted != cur:
+                    weighted = old_wt * weighted + alpha * cur
+                    weighted /= (old_wt + alpha)
+                old_wt = 1.
+    elif is_observation:
+        weighted = cur
+    state[0], state[1] = weighted, old_wt
+    return weighted
+
+def rsi_value(pos_avg, neg_avg):
+    denominator = pos_avg + abs(neg_avg)
+    if denominator == 0 or denominator != denominator:
+        return NAN
+    return 100 * pos_avg / denominator
+
+def gain_loss(close, prev_close):
+    diff = close - prev_close
+    return (0 if diff < 0 else diff), (0 if diff > 0 else diff)
+
+
+def compute_full(close):
+    """
+    Compute every indicator over the full close series with pandas_ta (the reference
+    implementation) and derive the recurrence state at the last bar.
+    Returns ({column: Series}, state).
+    """
+    import pandas_ta as ta
+
+    columns = {'RSI': ta.rsi(close, length=RSI_LENGTH)}
+    for length in EMA_LENGTHS:
+        columns[f'EMA{length}'] = ta.ema(close, length=length)
+
+    values = [float(v) for v in close]
+    state = {
+        "version": STATE_VERSION,
+        "bars": len(values),
+        "last_date": close.index[-1].strftime('%Y-%m-%d') if len(values) else None,
+        "last_close": values[-1] if values else NAN,
+        "ema": {},
+        "rsi": None,
+    }
+
+    # Replay the recurrences to capture their state
+    for length in EMA_LENGTHS:
+        if len(values) < length:
+            continue
+        seed = float(close.iloc[0:length].mean())
+        ema_state = [NAN, 1.]
+        alpha = ewm_alpha(span=length)
+        ewm_step(ema_state, seed, alpha)
+        for v in values[length:]:
+            ewm_step(ema_state, v, alpha)
+        state["ema"][str(length)] = ema_state
+
+    if len(values) >= RSI_LENGTH + 1:
+        alpha = ewm_alpha(alpha=1.0 / RSI_LENGTH)
+        pos_state, neg_state = [NAN, 1.], [NAN, 1.]
+        ewm_step(pos_state, NAN, alpha)
+        ewm_step(neg_state, NAN, alpha)
+        for prev_v, v in zip(values, values[1:]):
+            gain, loss = gain_loss(v, prev_v)
+            ewm_step(pos_state, gain, alpha)
+            ewm_step(neg_state, loss, alpha)
+        state["rsi"] = {"pos": pos_state, "neg": neg_state}
+
+    state["tail"] = {
+        name: [float(v) for v in series.iloc[-KEEP_BARS:]] if series is not None else []
+        for name, series in columns.items()
+    }
+
+    # Only resume from this state if the replay reproduced pandas_ta exactly
+    # (e.g. pandas_ta switches to TA-Lib's implementation when it is installed)
+    replayed = {f'EMA{length}': state["ema"][str(length)][0] for length in EMA_LENGTHS if str(length) in state["ema"]}
+    if state["rsi"]:
+        replayed['RSI'] = rsi_value(state["rsi"]["pos"][0], state["rsi"]["neg"][0])
+    for name, value in replayed.items():
+        expected = state["tail"][name][-1] if state["tail"][name] else NAN
+        if not (value == expected or (value != value and expected != expected)):
+            state["version"] = None
+            break
+    return columns, state
+
+def step_state(state, new_close):
+    """Advance a saved state by the given new closes (in order). Returns {column: [values]}."""
+    new_values = {name: [] for name in state["tail"]}
+    prev = state["last_close"]
+    rsi_alpha = ewm_alpha(alpha=1.0 / RSI_LENGTH)
+    for v in new_close:
+        v = float(v)
+        for length in EMA_LENGTHS:
+            ema_state = state["ema"].get(str(length))
+            new_values[f'EMA{length}'].append(
+                ewm_step(ema_state, v, ewm_alpha(span=length)) if ema_state else NAN
+            )
+        if state["rsi"]:
+            gain, loss = gain_loss(v, prev)
+            pos = ewm_step(state["rsi"]["pos"], gain, rsi_alpha)
+            neg = ewm_step(state["rsi"]["neg"], loss, rsi_alpha)
+            new_values['RSI'].append(rsi_value(pos, neg))
+        else:
+            new_values['RSI'].append(NAN)
+        prev = v
+    state["last_close"] = prev
+    state["bars"] += len(new_close)
+    for name, vals in new_values.items():
+        state["tail"][name] = (state["tail"][name] + vals)[-KEEP_BARS:]
+    return new_values
+
+def parity_check(close, cut=None):
+    """
+    Compare an incremental update against a full recomputation on the same closes.
+    The state is built from close[:cut] and stepped through the remaining bars.
+    Returns a list of mismatching column names (empty when bit-for-bit identical).
+    """
+    cut = cut if cut is not None else max(len(close) - 5, 1)
+    full_columns, _ = compute_full(close)
+    _, state = compute_full(close.iloc[:cut])
+    # Indicators that were not defined yet at `cut` need a full pass, not a step
+    if any(len(close.iloc[:cut]) < length for length in EMA_LENGTHS) or state["rsi"] is None:
+        return []
+    step_state(state, close.iloc[cut:])
+
+    mismatches = []
+    for name, series in full_columns.items():
+        expected = [float(v) for v in series.iloc[-KEEP_BARS:]] if series is not None else []
+        got = state["tail"][name]
+        same = len(expected) == len(got) and all(
+            (a == b) or (math.isnan(a) and math.isnan(b)) for a, b in zip(expected, got)
+        )
+        if not same:
+            mismatches.append(name)
+    return mismatches
+
+
+class AlignedCloses:
+    """
+    Date x ticker close matrix with every ticker's own bars left-aligned
+    (compact[k, j] is the k-th close of ticker j), so recurrences run over each
+    ticker's own bars only and can be computed for all columns at once.
+    """
+
+    def __init__(self, closes):
+        self.closes = closes
+        arr = closes.to_numpy(dtype=float)
+        self.valid = ~np.isnan(arr)
+        self.counts = self.valid.sum(axis=0)
+        order = np.argsort(~self.valid, axis=0, kind='stable')
+        self.compact = pd.DataFrame(np.take_along_axis(arr, order, axis=0))
+        self._rank = np.cumsum(self.valid, axis=0) - 1
+        self._rows, self._cols = np.nonzero(self.valid)
+
+    def _scatter(self, values):
+        """Place left-aligned results back onto the shared date index."""
+        out = np.full(self.valid.shape, np.nan)
+        out[self._rows, self._cols] = values[self._rank[self._rows, self._cols], self._cols]
+        return pd.DataFrame(out, index=self.closes.index, columns=self.closes.columns)
+
+    def rsi(self, length=RSI_LENGTH):
+        delta = self.compact.diff()
+        gains = delta.where(~(delta < 0), 0.0)
+        losses = delta.where(~(delta > 0), 0.0)
+        alpha = 1.0 / length
+        pos_avg = gains.ewm(alpha=alpha, adjust=False).mean()
+        neg_avg = losses.ewm(alpha=alpha, adjust=False).mean()
+        rsi = (100 * pos_avg / (pos_avg + neg_avg.abs())).to_numpy(copy=True)
+        rsi[:, self.counts < length + 1] = np.nan
+        return self._scatter(rsi)
+
+    def ema(self, length):
+        seeded = self.compact.to_numpy(copy=True)
+        if len(seeded) >= length:
+            # SMA seed over each ticker's first `length` bars (summed per row like Series.mean)
+            seeded[length - 1] = np.ascontiguousarray(seeded[:length].T).sum(axis=1) / length
+        seeded[:length - 1] = np.nan
+        ema = pd.DataFrame(seeded).ewm(span=length, adjust=False).mean().to_numpy(copy=True)
+        ema[:, self.counts < length] = np.nan
+        return self._scatter(ema)
+
+def compute_matrix(closes, ema_lengths=EMA_LENGTHS, rsi_length=RSI_LENGTH):
+    """
+    Compute RSI and the EMAs for every column of a date x ticker close matrix in one
+    vectorized pass. Returns {'RSI': DataFrame, 'EMA<length>': DataFrame, ...} aligned
+    with `closes`.
+
+    Each ticker is evaluated over its own bars only (dates where it has no close are
+    skipped, not treated as gaps), so the values match a per-ticker pandas_ta run.
+    """
+    aligned = AlignedCloses(closes)
+    columns = {'RSI': aligned.rsi(rsi_length)}
+    for length in ema_lengths:
+        columns[f'EMA{length}'] = aligned.ema(length)
+    return columns
+
+
+class IndicatorEngine:
+    def __init__(self, path=None):
+        self.path = path
+        self._states = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._states is None:
+            if self.path is None:
+                self.path = cache_path(INDICATOR_STATE_NAME)
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._states = json.load(f)
+            except (OSError, ValueError):
+                self._states = {}
+        return self._states
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._states, f)
+        os.replace(tmp_path, self.path)
+
+    def _resume_position(self, state, close):
+        """Index of the first new bar if `state` still describes `close`, else None."""
+        if not state or state.get("version") != STATE_VERSION or not state.get("last_date"):
+            return None
+        position = state["bars"] - 1
+        if position >= len(close) or close.index[position].strftime('%Y-%m-%d') != state["last_date"]:
+            return None
+        # Adjusted closes change when Yahoo re-adjusts the history (dividends, splits)
+        last_close = float(close.iloc[position])
+        if not (last_close == state["last_close"] or (last_close != last_close and state["last_close"] != state["last_close"])):
+            return None
+        # A window that was not fully defined yet needs the seeding of a full pass
+        if any(str(length) not in state["ema"] for length in EMA_LENGTHS) or state["rsi"] is None:
+            return None
+        return position + 1
+
+    def apply(self, symbol, df):
+        """
+        Add RSI / EMA20 / EMA60 / EMA120 columns to `df` (in place).
+
+        After a full computation the columns cover the whole history; after an
+        incremental update only the newest KEEP_BARS rows carry values.
+        """
+        close = df['Close']
+        with self._lock:
+            state = self._load().get(symbol)
+
+        start = self._resume_position(state, close)
+        if start is None:
+            columns, state = compute_full(close)
+            for name, series in columns.items():
+                df[name] = series
+        else:
+            step_state(state, close.iloc[start:])
+            state["last_date"] = close.index[-1].strftime('%Y-%m-%d')
+            for name, values in state["tail"].items():
+                column = [NAN] * len(df)
+                column[len(df) - len(values):] = values
+                df[name] = pd.Series(column, index=df.index)
+
+        with self._lock:
+            self._load()[symbol] = state
+            try:
+                self._save()
+            except OSError as e:
+                print(f"Error saving indicator state: {e}")
+        return df
@@ -0,0 +1,109 @@
+"""
+TTL-cached access to yfinance `Ticker.info`.
+
+`info` is one of the slowest Yahoo endpoints, so it is fetched at most once per
+symbol per run. The fields callers ask for are also kept on disk: static fields
+(names) for weeks, volatile quote fields only for a few minutes.
+"""
+import json
+import os
+import threading
+import time
+
+import yfinance as yf
+
+from storage import cache_path
+from yahoo_scheduler import YAHOO
+
+INFO_CACHE_NAME = "info_cache.json"
+
+# Fields that practically never change for a listed symbol
+STATIC_FIELDS = {"longName", "shortName"}
+STATIC_TTL = 30 * 24 * 3600
+
+# Everything else (quotes, 52-week range, ...) goes stale quickly
+QUOTE_TTL = 15 * 60
+
+
+class InfoCache:
+    def __init__(self, path=None, static_ttl=STATIC_TTL, quote_ttl=QUOTE_TTL, fetch=None, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self.static_ttl = static_ttl
+        self.quote_ttl = quote_ttl
+        self.fetch = fetch or (lambda symbol: YAHOO.call("info", lambda: yf.Ticker(symbol).info, key=symbol))
+        self._disk = None
+        self._fetched = {}  # symbol -> info dict fetched during this run
+        self._lock = threading.Lock()
+        self._symbol_locks = {}
+
+    def _load(self):
+        if self._disk is None:
+            if self.path is None:
+                self.path = cache_path(INFO_CACHE_NAME)
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._disk = json.load(f)
+            except (OSError, ValueError):
+                self._disk = {}
+        return self._disk
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._disk, f)
+        os.replace(tmp_path, self.path)
+
+    def _ttl(self, field):
+        return self.static_ttl if field in STATIC_FIELDS else self.quote_ttl
+
+    def _cached(self, symbol, fields, now, fresh_only=True):
+        entries = self._load().get(symbol, {})
+        values = {}
+        for field in fields:
+            entry = entries.get(field)
+            if entry is None:
+                continue
+            value, fetched_at = entry
+            if not fresh_only or now - fetched_at <= self._ttl(field):
+                values[field] = value
+        return values
+
+    def get(self, symbol, fields):
+        """
+        Return {field: value} for the requested `info` fields (missing fields map to None).
+        Calls `info` only if some field is not cached or has expired, and never more than
+        once per symbol for the lifetime of this cache.
+        """
+        with self._lock:
+            symbol_lock = self._symbol_locks.setdefault(symbol, threading.Lock())
+
+        with symbol_lock:
+            now = self.clock()
+            with self._lock:
+                values = self._cached(symbol, fields, now)
+            if len(values) == len(fields):
+                return values
+
+            if symbol not in self._fetched:
+                try:
+                    self._fetched[symbol] = self.fetch(symbol) or {}
+                except Exception as e:
+                    print(f"Error fetching info for {symbol}: {e}")
+                    self._fetched[symbol] = None
+
+            info = self._fetched[symbol]
+            with self._lock:
+                if info is None:
+                    # Serve stale names rather than nothing, but never stale quotes
+                    stale = self._cached(symbol, STATIC_FIELDS & set(fields), now, fresh_only=False)
+                    return {field: stale.get(field) for field in fields}
+
+                entries = self._load().setdefault(symbol, {})
+                for field in fields:
+                    entries[field] = [info.get(field), now]
+                try:
+                    self._save()
+                except OSError as e:
+                    print(f"Error saving info cache: {e}")
+            return {field: info.get(field) for field in fields}
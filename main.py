@@ -1,10 +1,7 @@
 import yfinance as yf
 import pandas as pd
-import pandas_ta as ta
 import requests
 import os
-import mplfinance as mpf
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta, timezone
 try:
     from zoneinfo import ZoneInfo
@@ -13,7 +10,26 @@ except ImportError:
     from datetime import timezone as ZoneInfo
 import json
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from price_store import PriceStore
+from info_cache import InfoCache
+from news_cache import NewsCache
+from news_history import NewsHistory
+from publishers import EXCLUDED, MAJOR, PREFERRED, TIER_RANK, PublisherClassifier
+from headlines import best_of_clusters
+from market_snapshot import MarketSnapshot
+from market_calendar import NY_TZ, holiday_name, last_session, session_close
+from indicators import IndicatorEngine, compute_matrix
+from signals import evaluate_signals, latest_signals
+from chart_config import CHART_DIR, chart_job, thumb_size
+from chart_series import series_filename, write_series, write_series_files
+from report import render_report
+from results_json import write_results_json
+from checkpoints import RunCheckpoint
+from yahoo_scheduler import YAHOO
+from http_tape import RECORD, REPLAY, TAPE
+import storage
 
 # Load environment variables (for local testing)
 load_dotenv()
@@ -54,108 +70,382 @@ EXCLUDED_PUBLISHERS = [
     "Wall Street Journal", "WSJ", "MarketWatch", "Investor's Business Daily", "IBD", "Zacks"
 ]
 
-def fetch_and_analyze(ticker_symbol):
+# Publisher lists compiled into one matcher; tiers are memoized per publisher name
+PUBLISHER_CLASSIFIER = PublisherClassifier(EXCLUDED_PUBLISHERS, PREFERRED_PUBLISHERS, MAJOR_PUBLISHERS)
+
+# Major indices shown in the market overview
+MARKET_INDICES = [
+    {"name": "S&P 500", "symbol": "^GSPC"},
+    {"name": "Dow Jones", "symbol": "^DJI"},
+    {"name": "Nasdaq", "symbol": "^IXIC"},
+    {"name": "Russell 2000", "symbol": "^RUT"}
+]
+
+# Local OHLCV history (only bars after the last stored session are downloaded)
+PRICE_STORE = PriceStore()
+
+# Ticker.info is fetched at most once per symbol per run (names are cached on disk for weeks)
+INFO_CACHE = InfoCache()
+
+# Ticker.news is fetched at most once per symbol per run, shared by tickers and market news
+NEWS_CACHE = NewsCache()
+
+# Headlines shown in earlier reports (or on another card of this run) are not repeated
+NEWS_HISTORY = NewsHistory()
+
+# Saved EMA/RSI recurrence state per ticker (only new bars are computed on later runs)
+INDICATOR_ENGINE = IndicatorEngine()
+
+def fetch_price_histories(tickers=TICKERS):
+    """
+    Fetch the daily history of every symbol needed for a run (tickers and the major
+    indices) in batched requests. Returns {symbol: DataFrame}.
+    """
+    symbols = list(tickers) + [idx["symbol"] for idx in MARKET_INDICES]
+    print(f"Fetching price history for {len(symbols)} symbols...")
     try:
-        ticker = yf.Ticker(ticker_symbol)
-        df = ticker.history(period="max")
-        
-        if df.empty:
-            return f"❌ {ticker_symbol}: Unable to fetch data."
+        return PRICE_STORE.get_histories(symbols)
+    except Exception as e:
+        print(f"Error fetching batched price history: {e}")
+        return {}
 
-        # Get long name (fallback if Fast Info is missing)
-        long_name = ""
-        try:
-            # info call might be slow, so timeout/exception handling needed but simplified here.
-            # fast_info doesn't provide name. Using info.
-            long_name = ticker.info.get('longName', ticker.info.get('shortName', ''))
-        except:
-            long_name = ""
-
-        # Calculate indicators
-        df['RSI'] = ta.rsi(df['Close'], length=14)
-        df['EMA20'] = ta.ema(df['Close'], length=20)
-        df['EMA60'] = ta.ema(df['Close'], length=60)
-        df['EMA120'] = ta.ema(df['Close'], length=120)
-
-        # Close price information
-        last_row = df.iloc[-1]
-        prev_close = df.iloc[-2]['Close']
-        current_close = last_row['Close']
-        change_pct = ((current_close - prev_close) / prev_close) * 100
-
-        # After-hours information
-        after_hours_price = None
-        after_hours_change = None
-        try:
-            info = ticker.info
-            after_hours_price = info.get('postMarketPrice')
-            if after_hours_price:
-                after_hours_change = ((after_hours_price - current_close) / current_close) * 100
-        except:
-            pass
-
-        # Generate chart
-        chart_filename = f"{ticker_symbol}_chart.png"
-        generate_chart(ticker_symbol, df, chart_filename)
+def fetch_after_hours_price(ticker_symbol, session_day):
+    """
+    Last post-market price after the close of `session_day`, or None if nothing traded.
+    Read from the 5-minute chart with extended hours, which is much cheaper than `info`.
+    """
+    close = session_close(session_day)
+    if close is None:
+        return None
+    ticker = yf.Ticker(ticker_symbol)
+    bars = YAHOO.call("quote", ticker.history, period="5d", interval="5m", prepost=True,
+                      key=[ticker_symbol, "post", str(session_day)])
+    if bars is None or bars.empty:
+        return None
+    times = bars.index.tz_convert(NY_TZ) if bars.index.tz is not None else bars.index
+    after = bars[(times.date == session_day) & (times.time >= close)]['Close'].dropna()
+    return after.iloc[-1] if not after.empty else None
 
-        # Fetch news
-        news, news_asset = fetch_news(ticker_symbol)
+def fetch_ticker_data(ticker_symbol, history=None):
+    """
+    Network-bound part of the per-ticker analysis: price history and metadata.
+    The raw news comes from NEWS_CACHE (see prefetch_news); the headlines shown on the
+    card are picked afterwards by select_news, in ticker order.
+    Returns a dict consumed by analyze_ticker_data.
+    """
+    # Use the batch-fetched history when given, otherwise fetch this ticker alone
+    if history is not None and not history.empty:
+        df = history.copy()
+    else:
+        df = PRICE_STORE.get_history(ticker_symbol)
 
-        # Analyze strategy signals
-        # NaN check
-        c_rsi = last_row['RSI'] if not pd.isna(last_row['RSI']) else 50
-        c_ema20 = last_row['EMA20'] if not pd.isna(last_row['EMA20']) else 0
-        c_ema60 = last_row['EMA60'] if not pd.isna(last_row['EMA60']) else 0
-        c_ema120 = last_row['EMA120'] if not pd.isna(last_row['EMA120']) else 0
-        
-        # 1st Buy: Bearish Alignment (20 < 60 < 120*) AND Close < EMA20
-        # *EMA 120 is included in alignment check only if available (for new listings)
-        alignment_buy = (c_ema20 < c_ema60)
-        if c_ema120 > 0:
-            alignment_buy = alignment_buy and (c_ema60 < c_ema120)
-            
-        is_buy_1 = alignment_buy and (c_ema20 > 0) and (current_close < c_ema20)
-        
-        # 2nd Buy: 1st Buy Condition Met AND RSI < 30
-        is_buy_2 = is_buy_1 and (c_rsi < 30)
-        
-        # If it's a 2nd Buy, remove it from 1st Buy list as requested by user
-        if is_buy_2:
-            is_buy_1 = False
-        
-        # 1st Sell: Bullish Alignment (20 > 60 > 120*) AND Close > EMA20 AND RSI > 70
-        # *EMA 120 is included in alignment check only if available (for new listings)
-        alignment_sell = (c_ema20 > c_ema60)
-        if c_ema120 > 0:
-            alignment_sell = alignment_sell and (c_ema60 > c_ema120)
-
-        is_sell_1 = alignment_sell and (current_close > c_ema20) and (c_rsi > 70)
-
-        result = {
-            "Symbol": ticker_symbol,
-            "LongName": long_name,
-            "Price": round(current_close, 2),
-            "Change": round(change_pct, 2),
-            "AfterPrice": round(after_hours_price, 2) if after_hours_price else None,
-            "AfterChange": round(after_hours_change, 2) if after_hours_change else None,
-            "RSI": round(c_rsi, 2),
-            "EMA20": round(c_ema20, 2),
-            "EMA60": round(c_ema60, 2),
-            "EMA120": round(c_ema120, 2),
-            "Chart": chart_filename,
-            "News": news,
-            "NewsAsset": news_asset,
-            "Signals": {
-                "Buy1": is_buy_1,
-                "Buy2": is_buy_2,
-                "Sell1": is_sell_1
-            }
+    data = {"Symbol": ticker_symbol, "History": df}
+    if df.empty:
+        return data
+
+    # fast_info doesn't provide the name, so it comes from `info`, cached on disk for weeks
+    names = INFO_CACHE.get(ticker_symbol, ['longName', 'shortName'])
+    data["LongName"] = names.get('longName') or names.get('shortName') or ""
+
+    # The after-hours price changes every run, so it is read from the extended-hours chart instead of `info`
+    try:
+        data["AfterPrice"] = fetch_after_hours_price(ticker_symbol, df.index[-1].date())
+    except Exception as e:
+        print(f"Error fetching after-hours price for {ticker_symbol}: {e}")
+        data["AfterPrice"] = None
+    return data
+
+def select_news(data, news=None):
+    """
+    Pick the headlines of a fetched ticker (data["News"], data["NewsAsset"]).
+    `news` is a (news, asset) pair already picked for this market date, if any.
+    Headlines are claimed across cards, so this runs one ticker at a time in ticker
+    order: when two tickers share a story, the first one always shows it.
+    """
+    if data["History"].empty:
+        return data
+    if news is not None:
+        data["News"], data["NewsAsset"] = news
+        # Saved headlines count as shown, so other cards don't repeat them
+        for n in data["News"]:
+            NEWS_HISTORY.claim(n['title'], n['link'])
+    else:
+        data["News"], data["NewsAsset"] = fetch_news(data["Symbol"])
+    return data
+
+def analyze_ticker_data(data, chart_jobs=None, chart_mode="png"):
+    """
+    CPU-bound part of the per-ticker analysis: indicators, chart and strategy signals.
+    When `chart_jobs` is a list the chart is queued there for render_chart_stage instead
+    of being rendered here. chart_mode "series" writes a JSON series file for the
+    client-side chart instead of a PNG.
+    """
+    ticker_symbol = data["Symbol"]
+    df = data["History"]
+
+    if df.empty:
+        return f"❌ {ticker_symbol}: Unable to fetch data."
+
+    long_name = data["LongName"]
+    news, news_asset = data["News"], data["NewsAsset"]
+
+    # Calculate indicators (RSI14, EMA20/60/120), stepping yesterday's state forward when possible.
+    # In batch mode they were already computed for all tickers at once.
+    if data.get("Indicators") is not None:
+        for name, series in data["Indicators"].items():
+            df[name] = series.reindex(df.index)
+    else:
+        INDICATOR_ENGINE.apply(ticker_symbol, df)
+
+    # Close price information
+    last_row = df.iloc[-1]
+    prev_close = df.iloc[-2]['Close']
+    current_close = last_row['Close']
+    change_pct = ((current_close - prev_close) / prev_close) * 100
+
+    # After-hours information
+    after_hours_price = data["AfterPrice"]
+    after_hours_change = None
+    if after_hours_price:
+        after_hours_change = ((after_hours_price - current_close) / current_close) * 100
+
+    # Generate chart
+    chart_filename = series_filename(ticker_symbol) if chart_mode == "series" else f"{ticker_symbol}_chart.png"
+    if chart_jobs is not None:
+        chart_jobs.append(chart_job(ticker_symbol, df, chart_filename))
+    elif chart_mode == "series":
+        write_series(ticker_symbol, df, chart_filename)
+    else:
+        # Plotting libraries are only loaded by the stages that render charts
+        from charts import generate_chart
+        generate_chart(ticker_symbol, df, chart_filename)
+
+    # Analyze strategy signals
+    # NaN check (for display; the signal rules apply the same fill values)
+    c_rsi = last_row['RSI'] if not pd.isna(last_row['RSI']) else 50
+    c_ema20 = last_row['EMA20'] if not pd.isna(last_row['EMA20']) else 0
+    c_ema60 = last_row['EMA60'] if not pd.isna(last_row['EMA60']) else 0
+    c_ema120 = last_row['EMA120'] if not pd.isna(last_row['EMA120']) else 0
+    
+    # Buy1 / Buy2 / Sell1 are defined declaratively in signals.SIGNAL_RULES and evaluated
+    # over the whole history; batch mode already evaluated them on the date x ticker matrix.
+    signals = data.get("Signals")
+    if signals is None:
+        signals = latest_signals(df)
+
+    result = {
+        "Symbol": ticker_symbol,
+        "LongName": long_name,
+        "Price": round(current_close, 2),
+        "Change": round(change_pct, 2),
+        "AfterPrice": round(after_hours_price, 2) if after_hours_price else None,
+        "AfterChange": round(after_hours_change, 2) if after_hours_change else None,
+        "RSI": round(c_rsi, 2),
+        "EMA20": round(c_ema20, 2),
+        "EMA60": round(c_ema60, 2),
+        "EMA120": round(c_ema120, 2),
+        "Chart": chart_filename,
+        "ChartMode": chart_mode,
+        "News": news,
+        "NewsAsset": news_asset,
+        "Signals": {
+            "Buy1": signals["Buy1"],
+            "Buy2": signals["Buy2"],
+            "Sell1": signals["Sell1"]
         }
-        return result
+    }
+    return result
+
+def fetch_and_analyze(ticker_symbol, history=None, chart_jobs=None, chart_mode="png", news=None):
+    try:
+        return analyze_ticker_data(select_news(fetch_ticker_data(ticker_symbol, history), news), chart_jobs, chart_mode)
     except Exception as e:
         return f"❌ {ticker_symbol}: Error occurred - {str(e)}"
 
-def fetch_news(ticker_symbol):
+def attach_batch_indicators(fetched):
+    """
+    Batch mode: align every ticker's closes into one date x ticker matrix, compute the
+    indicators and signal conditions for all of them in a single vectorized pass and
+    attach each ticker's columns and latest signals to its fetched data.
+    """
+    valid = [d for d in fetched if isinstance(d, dict) and not d["History"].empty]
+    if not valid:
+        return
+    closes = pd.DataFrame({d["Symbol"]: d["History"]['Close'] for d in valid})
+    columns = compute_matrix(closes)
+    signals = evaluate_signals({**columns, 'Close': closes})
+    for d in valid:
+        symbol, last_date = d["Symbol"], d["History"].index[-1]
+        d["Indicators"] = {name: frame[symbol] for name, frame in columns.items()}
+        d["Signals"] = {name: bool(frame.at[last_date, symbol]) for name, frame in signals.items()}
+
+def analyze_tickers(tickers=TICKERS, price_histories=None, workers=1, batch=False, chart_workers=None,
+                    chart_mode="png", news=None):
+    """
+    Analyze every ticker and return the results in the same order as `tickers`.
+
+    With workers > 1 the network-bound fetch of each ticker runs on a bounded thread
+    pool (the raw news of every ticker is prefetched concurrently beforehand); the
+    headlines, indicators and signals are still picked and computed one ticker at a
+    time, in ticker order.
+    With batch=True the indicators and signals of all tickers are computed together
+    on a date x ticker matrix (see attach_batch_indicators).
+    Charts are rendered afterwards in one stage on `chart_workers` processes
+    (default: CPU count, see charts.render_charts); with chart_mode="series" only
+    compact series files are written and the browser draws the charts.
+    `news` maps tickers to (news, asset) pairs that are used instead of fetching.
+    A failing ticker yields an error string without affecting the others.
+    """
+    price_histories = price_histories or {}
+    news = news or {}
+    chart_jobs = []
+    prefetch_news([t for t in tickers if t not in news])
+
+    if workers <= 1 and not batch:
+        results = []
+        for ticker in tickers:
+            print(f"Analyzing {ticker}...")
+            results.append(fetch_and_analyze(ticker, price_histories.get(ticker), chart_jobs, chart_mode,
+                                             news.get(ticker)))
+        attach_chart_variants(results, render_chart_stage(chart_jobs, chart_workers, chart_mode))
+        return results
+
+    def fetch(ticker):
+        try:
+            return fetch_ticker_data(ticker, price_histories.get(ticker))
+        except Exception as e:
+            return f"❌ {ticker}: Error occurred - {str(e)}"
+
+    if workers > 1:
+        print(f"Fetching {len(tickers)} tickers with {workers} workers...")
+        with ThreadPoolExecutor(max_workers=min(workers, len(tickers) or 1)) as pool:
+            fetched = list(pool.map(fetch, tickers))
+    else:
+        fetched = [fetch(ticker) for ticker in tickers]
+
+    if batch:
+        try:
+            attach_batch_indicators(fetched)
+        except Exception as e:
+            # Fall back to the per-ticker engine
+            print(f"Error computing batch indicators: {e}")
+
+    results = []
+    for ticker, data in zip(tickers, fetched):
+        print(f"Analyzing {ticker}...")
+        if isinstance(data, str):
+            results.append(data)
+            continue
+        try:
+            # Serial, in ticker order, so shared headlines always land on the same card
+            results.append(analyze_ticker_data(select_news(data, news.get(ticker)), chart_jobs, chart_mode))
+        except Exception as e:
+            results.append(f"❌ {ticker}: Error occurred - {str(e)}")
+    attach_chart_variants(results, render_chart_stage(chart_jobs, chart_workers, chart_mode))
+    return results
+
+def history_fingerprint(df):
+    """Identifies the price data an analysis was computed from (last bar date and close, bar count)."""
+    if df is None or df.empty:
+        return None
+    return {"date": df.index[-1].strftime('%Y-%m-%d'), "close": round(float(df['Close'].iloc[-1]), 6),
+            "bars": len(df)}
+
+def ticker_inputs(ticker, chart_mode, fingerprint):
+    """What a ticker's saved analysis depends on besides the market date."""
+    return {"chart_mode": chart_mode, "news": UNDERLYING_MAP.get(ticker, ticker), "history": fingerprint}
+
+def chart_files_exist(res):
+    names = [res['Chart']] + [name for size in (res.get('ChartVariants') or {}).values() for name in size.values()]
+    return all(os.path.exists(os.path.join(CHART_DIR, name)) for name in names)
+
+def analyze_with_checkpoint(checkpoint, tickers=TICKERS, workers=1, batch=False, chart_workers=None, chart_mode="png"):
+    """
+    analyze_tickers for a market date that may already have been (partly) analyzed.
+
+    The price histories are always brought up to date first (one incremental batched
+    download). A ticker's saved analysis is reused only if it was computed from the
+    same bars (see history_fingerprint), with the same chart mode and news symbol,
+    and its chart files still exist; a run during market hours is therefore redone
+    after the close. Saved news is reused for the tickers that are analyzed again,
+    so only the ones without any are fetched. Returns (results, price_histories).
+    """
+    # Fetch stage: every symbol's price history, in batched requests
+    price_histories = fetch_price_histories(tickers)
+    fingerprints = {t: history_fingerprint(price_histories.get(t)) for t in tickers}
+    checkpoint.save("fetch", fingerprints)
+
+    saved = checkpoint.load("analyze") or {}
+    reused = {}
+    for ticker in tickers:
+        entry = saved.get(ticker)
+        if (entry and entry["inputs"] == ticker_inputs(ticker, chart_mode, fingerprints[ticker])
+                and chart_files_exist(entry["result"])):
+            reused[ticker] = entry["result"]
+    todo = [t for t in tickers if t not in reused]
+
+    # Headlines on reused cards count as shown, so the re-analyzed cards don't repeat them
+    for res in reused.values():
+        for n in res['News']:
+            NEWS_HISTORY.claim(n['title'], n['link'])
+
+    # News stage: headlines of this market date, per ticker (empty results are fetched again)
+    saved_news = checkpoint.load("news") or {}
+    news = {
+        t: (saved_news[t]["news"], saved_news[t]["asset"]) for t in todo
+        if t in saved_news and saved_news[t]["source"] == UNDERLYING_MAP.get(t, t) and saved_news[t]["news"]
+    }
+
+    fresh = {}
+    if reused:
+        print(f"Reusing the saved analysis of {len(reused)} tickers for {checkpoint.market_date}")
+    if todo:
+        fresh = dict(zip(todo, analyze_tickers(todo, price_histories, workers=workers, batch=batch,
+                                               chart_workers=chart_workers, chart_mode=chart_mode, news=news)))
+
+    results = [reused[t] if t in reused else fresh[t] for t in tickers]
+    ok = [(t, res) for t, res in zip(tickers, results) if isinstance(res, dict)]
+    checkpoint.save("news", {
+        t: {"source": UNDERLYING_MAP.get(t, t), "news": res['News'], "asset": res['NewsAsset']} for t, res in ok
+    })
+    checkpoint.save("analyze", {
+        t: {"inputs": ticker_inputs(t, chart_mode, fingerprints[t]), "result": res} for t, res in ok
+    })
+    return results, price_histories
+
+def market_inputs(results, price_histories):
+    """What the market overview depends on: the analyzed tickers' data and the index histories."""
+    return {
+        "tickers": {r['Symbol']: history_fingerprint(price_histories.get(r['Symbol']))
+                    for r in results if isinstance(r, dict)},
+        "indices": {idx["symbol"]: history_fingerprint(price_histories.get(idx["symbol"])) for idx in MARKET_INDICES},
+    }
+
+def render_chart_stage(chart_jobs, workers=None, chart_mode="png"):
+    """Render the queued charts in parallel (or write their series files) and report each chart's status."""
+    if not chart_jobs:
+        return []
+    if chart_mode == "series":
+        print(f"Writing {len(chart_jobs)} chart series...")
+        statuses = write_series_files(chart_jobs)
+    else:
+        print(f"Rendering {len(chart_jobs)} charts...")
+        from charts import render_charts
+        statuses = render_charts(chart_jobs, workers)
+    for status in statuses:
+        if status["Status"] != "ok":
+            print(f"❌ {status['Symbol']}: Chart rendering failed - {status['Error']}")
+    return statuses
+
+def attach_chart_variants(results, statuses):
+    """Record each rendered chart's thumbnail / full-size image files on its result."""
+    variants = {status["Symbol"]: status.get("Variants") for status in statuses if status["Status"] == "ok"}
+    for res in results:
+        if isinstance(res, dict):
+            res["ChartVariants"] = variants.get(res["Symbol"])
+
+def news_sources(ticker_symbol):
+    """Symbols whose news is shown for `ticker_symbol`, and the asset name displayed for them."""
     underlying_data = UNDERLYING_MAP.get(ticker_symbol, ticker_symbol)
     
     # Normalize to list
@@ -165,14 +455,35 @@ def fetch_news(ticker_symbol):
     else:
         search_tickers = [underlying_data]
         display_name = underlying_data
+    return search_tickers, display_name
+
+def prefetch_news(tickers=TICKERS):
+    """Fetch the news of every unique underlying and market index of a run concurrently."""
+    symbols = [sym for ticker in tickers for sym in news_sources(ticker)[0]]
+    NEWS_CACHE.prefetch(symbols + [idx["symbol"] for idx in MARKET_INDICES])
+
+def news_fields(n):
+    """(title, publisher, link) of a yfinance news item (flat or nested under 'content')."""
+    content = n.get('content', n)
+    title = content.get('title')
+    provider = content.get('provider', {})
+    publisher = provider.get('displayName', provider.get('name', content.get('publisher', 'Unknown')))
+    link_obj = content.get('canonicalUrl', content.get('clickThroughUrl', {}))
+    link = link_obj.get('url', content.get('link'))
+    return title, publisher, link
+
+def news_rank(n):
+    """Which copy of a story to keep: valid articles from the best publisher tier first."""
+    title, publisher, link = news_fields(n)
+    if not title or not link or title == "None":
+        return len(TIER_RANK)
+    return TIER_RANK[PUBLISHER_CLASSIFIER.tier(publisher)]
+
+def fetch_news(ticker_symbol):
+    search_tickers, display_name = news_sources(ticker_symbol)
 
     try:
-        all_news = []
-        for sym in search_tickers:
-            t = yf.Ticker(sym)
-            news = t.news
-            if news:
-                all_news.extend(news)
+        all_news = NEWS_CACHE.get_many(search_tickers)
         
         if not all_news:
             return [], display_name
@@ -185,34 +496,34 @@ def fetch_news(ticker_symbol):
             return content.get('providerPublishTime', 0)
             
         all_news.sort(key=get_pub_time, reverse=True)
+
+        # The same story from several outlets: keep the best-tier publisher's copy (ties: the newest)
+        all_news = best_of_clusters(all_news, lambda n: news_fields(n)[0], news_rank)
         
-        news_list = all_news
+        # Rank in one pass: trusted (preferred / major) publishers first, up to 3 articles.
+        # Other non-excluded articles are kept as a fallback in case fewer than 2 trusted ones are found.
         filtered_news = []
+        fallback = []
 
         seen_titles = set()
         seen_links = set()
 
-        for n in news_list:
-            content = n.get('content', n) 
-            title = content.get('title')
-            provider = content.get('provider', {})
-            publisher = provider.get('displayName', provider.get('name', content.get('publisher', 'Unknown')))
-            link_obj = content.get('canonicalUrl', content.get('clickThroughUrl', {}))
-            link = link_obj.get('url', content.get('link'))
-            
+        for n in all_news:
+            title, publisher, link = news_fields(n)
             if not title or not link or title == "None": continue
-            
-            # Deduplication Check
-            if title in seen_titles or link in seen_links:
-                continue
 
             # 제외 매체 체크
-            if any(ex.lower() in publisher.lower() for ex in EXCLUDED_PUBLISHERS):
+            tier = PUBLISHER_CLASSIFIER.tier(publisher)
+            if tier == EXCLUDED:
                 continue
 
             # 선호 매체 및 메이저 매체 체크
-            if any(pref.lower() in publisher.lower() for pref in PREFERRED_PUBLISHERS) or \
-               any(major.lower() in publisher.lower() for major in MAJOR_PUBLISHERS):
+            if tier in (PREFERRED, MAJOR):
+                # Deduplication Check (this feed, then earlier reports and other cards)
+                if title in seen_titles or link in seen_links:
+                    continue
+                if not NEWS_HISTORY.claim(title, link):
+                    continue
                 filtered_news.append({
                     "title": title,
                     "publisher": publisher,
@@ -220,27 +531,18 @@ def fetch_news(ticker_symbol):
                 })
                 seen_titles.add(title)
                 seen_links.add(link)
-            
-            if len(filtered_news) >= 3: break
+                if len(filtered_news) >= 3: break
+            else:
+                fallback.append((title, publisher, link))
         
         # Fallback: If no major news found, try to include any news (excluding blocked)
         if len(filtered_news) < 2:
-            for n in news_list:
-                content = n.get('content', n)
-                title = content.get('title')
-                provider = content.get('provider', {})
-                publisher = provider.get('displayName', provider.get('name', content.get('publisher', 'Unknown')))
-                link_obj = content.get('canonicalUrl', content.get('clickThroughUrl', {}))
-                link = link_obj.get('url', content.get('link'))
-                if not title or not link or title == "None": continue
-                
-                # 제외 매체 체크 (백업 루프에서도 제외)
-                if any(ex.lower() in publisher.lower() for ex in EXCLUDED_PUBLISHERS):
-                    continue
-                
+            for title, publisher, link in fallback:
                 # Check duplication again (explicitly against seen sets)
                 if title in seen_titles or link in seen_links:
                     continue
+                if not NEWS_HISTORY.claim(title, link):
+                    continue
 
                 filtered_news.append({
                     "title": title,
@@ -257,70 +559,32 @@ def fetch_news(ticker_symbol):
         print(f"Error fetching news for {ticker_symbol}: {e}")
         return [], display_name
 
-def fetch_market_indices():
+def market_snapshot(price_histories=None):
+    """Price, previous close, 52-week high and news of every index in MARKET_INDICES, fetched once."""
+    return MarketSnapshot(MARKET_INDICES, price_histories, info_cache=INFO_CACHE, news_cache=NEWS_CACHE)
+
+def fetch_market_indices(price_histories=None, snapshot=None):
     """
     Fetch data for Major 4 Indices: S&P 500, Dow, Nasdaq, Russell 2000
     Returns a list of dicts with Name, Price, Change, ChangePercent
     """
-    indices = [
-        {"name": "S&P 500", "symbol": "^GSPC"},
-        {"name": "Dow Jones", "symbol": "^DJI"},
-        {"name": "Nasdaq", "symbol": "^IXIC"},
-        {"name": "Russell 2000", "symbol": "^RUT"}
-    ]
+    snapshot = snapshot or market_snapshot(price_histories)
     
     results = []
     print("Fetching major indices data...")
     
-    for idx in indices:
-        try:
-            ticker = yf.Ticker(idx["symbol"])
-            price = None
-            change_pct = None
-            
-            # Try fast_info first
-            if hasattr(ticker, 'fast_info'):
-                try:
-                    price = ticker.fast_info['last_price']
-                    prev_close = ticker.fast_info['previous_close']
-                    change_pct = ((price - prev_close) / prev_close) * 100
-                except:
-                    pass
-            
-            # Fallback to history
-            if price is None:
-                hist = ticker.history(period="2d")
-                if not hist.empty:
-                    current = hist.iloc[-1]['Close']
-                    if len(hist) > 1:
-                        prev = hist.iloc[-2]['Close']
-                        price = current
-                        change_pct = ((current - prev) / prev) * 100
-                    else:
-                        price = current
-                        change_pct = 0.0
-            
-            if price is not None:
-                results.append({
-                    "name": idx["name"],
-                    "symbol": idx["symbol"],
-                    "price": price,
-                    "change_pct": change_pct
-                })
-            else:
-                results.append({
-                    "name": idx["name"],
-                    "symbol": idx["symbol"],
-                    "price": 0.0,
-                    "change_pct": 0.0,
-                    "error": True
-                })
-                
-        except Exception as e:
-            print(f"Error fetching index {idx['name']}: {e}")
+    for quote in snapshot.quotes():
+        if not quote["error"]:
+            results.append({
+                "name": quote["name"],
+                "symbol": quote["symbol"],
+                "price": quote["price"],
+                "change_pct": quote["change_pct"]
+            })
+        else:
             results.append({
-                "name": idx["name"],
-                "symbol": idx["symbol"],
+                "name": quote["name"],
+                "symbol": quote["symbol"],
                 "price": 0.0,
                 "change_pct": 0.0,
                 "error": True
@@ -328,57 +592,36 @@ def fetch_market_indices():
             
     return results
 
-def fetch_market_highlights():
+def fetch_market_highlights(price_histories=None, snapshot=None):
     """
     Check 52-week highs for major indices.
     Returns list of highlight strings.
     """
-    indices = [
-        {"name": "S&P 500", "symbol": "^GSPC"},
-        {"name": "Dow Jones", "symbol": "^DJI"},
-        {"name": "Nasdaq", "symbol": "^IXIC"},
-        {"name": "Russell 2000", "symbol": "^RUT"}
-    ]
+    snapshot = snapshot or market_snapshot(price_histories)
     
     highlights = []
     print("Checking market highlights...")
     
-    for idx in indices:
-        try:
-            t = yf.Ticker(idx["symbol"])
-            # Use info for 52-week high data
-            info = t.info
-            price = info.get('regularMarketPrice') or info.get('currentPrice')
-            year_high = info.get('fiftyTwoWeekHigh')
-            
-            if price and year_high:
-                # threshold: within 1% of 52-week high
-                if price >= year_high * 0.99:
-                    highlights.append(f"🚀 <strong>{idx['name']}</strong> is trading near its 52-week high, signaling strong momentum.")
-        except Exception as e:
-            print(f"Error checking highlight for {idx['name']}: {e}")
+    for quote in snapshot.quotes():
+        price, year_high = quote["price"], quote["year_high"]
+        if price and year_high:
+            # threshold: within 1% of 52-week high
+            if price >= year_high * 0.99:
+                highlights.append(f"🚀 <strong>{quote['name']}</strong> is trading near its 52-week high, signaling strong momentum.")
             
     return highlights
 
-def fetch_market_news():
+def fetch_market_news(price_histories=None, snapshot=None):
     """
     Fetch and curate top market news from major indices.
     Returns list of dicts {title, link, source}.
     """
-    # Check all 4 indices for broad coverage
-    indices = ["^GSPC", "^DJI", "^IXIC", "^RUT"] 
-    all_news = []
-    
+    snapshot = snapshot or market_snapshot(price_histories)
+
+    # Check all indices for broad coverage
     print("Fetching market driver news...")
-    for sym in indices:
-        try:
-            t = yf.Ticker(sym)
-            news = t.news
-            if news:
-                all_news.extend(news)
-        except Exception as e:
-            print(f"Error fetching news for {sym}: {e}")
-            
+    all_news = [n for quote in snapshot.quotes() for n in quote["news"]]
+
     # Deduplicate by link and title
     seen_links = set()
     seen_titles = set()
@@ -390,6 +633,9 @@ def fetch_market_news():
         return content.get('providerPublishTime', 0)
     
     all_news.sort(key=get_pub_time, reverse=True)
+
+    # Collapse near-duplicate headlines to one copy per story
+    all_news = best_of_clusters(all_news, lambda n: news_fields(n)[0], news_rank)
     
     keywords = ["market", "stock", "dow", "s&p", "nasdaq", "rally", "plunge", "inflation", "fed", "rate", "earnings"]
     
@@ -405,9 +651,11 @@ def fetch_market_news():
         
         if not title or not link: continue
         
-        # Deduplication
+        # Deduplication (this feed, then earlier reports and the ticker cards)
         if link in seen_links or title in seen_titles:
             continue
+        if not NEWS_HISTORY.claim(title, link):
+            continue
             
         # Filter for relevant content (optional, but good for "drivers")
         # For now, we take top news but prioritize those with keywords if we implement scoring.
@@ -426,144 +674,6 @@ def fetch_market_news():
             
     return unique_news
 
-def generate_chart(symbol, df, filename):
-    # Use more trading days for better context (120 days)
-    plot_df = df.tail(120).copy()
-    
-    # Remove empty data
-    plot_df = plot_df.dropna(subset=['Open', 'High', 'Low', 'Close'])
-    
-    # EMA line settings (Add only if data exists)
-    apds = []
-    
-    # EMA 20
-    if 'EMA20' in plot_df.columns and not plot_df['EMA20'].isnull().all():
-        apds.append(mpf.make_addplot(plot_df['EMA20'], color='#f59e0b', width=1.2, label='EMA 20'))
-        
-    # EMA 60
-    if 'EMA60' in plot_df.columns and not plot_df['EMA60'].isnull().all():
-        apds.append(mpf.make_addplot(plot_df['EMA60'], color='#8b5cf6', width=1.2, label='EMA 60'))
-        
-    # EMA 120 (Exclude if insufficient data, e.g., newly listed stocks)
-    if 'EMA120' in plot_df.columns and not plot_df['EMA120'].isnull().all():
-        apds.append(mpf.make_addplot(plot_df['EMA120'], color='#64748b', width=1.2, label='EMA 120'))
-        
-    # RSI
-    if 'RSI' in plot_df.columns and not plot_df['RSI'].isnull().all():
-        apds.append(mpf.make_addplot(plot_df['RSI'], panel=1, color='#313d4a', width=1.0, secondary_y=False))
-    
-    # Minimal style settings
-    mc = mpf.make_marketcolors(up='#10b981', down='#f43f5e', edge='inherit', wick='inherit', volume='inherit')
-    style = mpf.make_mpf_style(
-        marketcolors=mc, 
-        gridstyle=':', 
-        gridcolor='#f1f5f9',
-        facecolor='white', 
-        edgecolor='#cbd5e1',
-        rc={'font.family': 'sans-serif', 'font.size': 6.5}
-    )
-    
-    # Create chart folder
-    if not os.path.exists("public/charts"):
-        os.makedirs("public/charts")
-    
-    # Save chart
-    full_path = os.path.join("public/charts", filename)
-    print(f"Generating chart: {full_path}")
-    
-    # Set sufficient margins to center the chart body (box)
-    fig, axes = mpf.plot(
-        plot_df,
-        type='candle',
-        addplot=apds,
-        volume=False,
-        figratio=(12, 8), # Adjusted aspect ratio
-        style=style,
-        returnfig=True,
-        panel_ratios=(2, 1),
-        tight_layout=False,
-        ylabel='',
-        ylabel_lower=''
-    )
-    
-    # Reflect user feedback: Reduce left margin per orange guideline (0.2 -> 0.12)
-    # Maintain right margin (right=0.8) -> Increased to 0.85 for labels
-    # Maintain top/bottom margins (top=0.8, bottom=0.2)
-    plt.subplots_adjust(left=0.12, right=0.85, top=0.8, bottom=0.2)
-    
-    # Legend settings (Simple)
-    axes[0].legend(loc='upper left', fontsize=6, frameon=False)
-    
-    # RSI Horizontal lines
-    axes[2].axhline(y=70, color='#f43f5e', linestyle='--', linewidth=0.6, alpha=0.3)
-    axes[2].axhline(y=30, color='#10b981', linestyle='--', linewidth=0.6, alpha=0.3)
-    
-    # Axis alignment settings
-    axes[0].set_ylabel('')
-    axes[2].set_ylabel('')
-    
-    # Add Current EMA values as text labels on the right margin
-    last_p = plot_df.iloc[-1]
-    last_vals = []
-    if 'EMA20' in last_p: last_vals.append(('EMA20', last_p['EMA20'], '#f59e0b'))
-    if 'EMA60' in last_p: last_vals.append(('EMA60', last_p['EMA60'], '#8b5cf6'))
-    if 'EMA120' in last_p: last_vals.append(('EMA120', last_p['EMA120'], '#475569'))
-    
-    # Sort by value for clean vertical placement logic if needed, but simple for now
-    for name, val, color in last_vals:
-        if not pd.isna(val):
-            axes[0].text(len(plot_df)-0.5, val, f' {val:.2f}', color=color, 
-                        fontsize=6, fontweight='bold', va='center', ha='left')
-    
-    # Font and tick settings (Adjust pad so numbers appear outside the chart box with sufficient space)
-    for ax in axes:
-        ax.tick_params(axis='y', labelsize=6, pad=5)
-        ax.tick_params(axis='x', labelsize=6, pad=5)
-    
-    # Add High/Low price annotations
-    # Find max high and min low in the plot_df
-    max_idx = plot_df['High'].idxmax()
-    max_val = plot_df.loc[max_idx, 'High']
-    min_idx = plot_df['Low'].idxmin()
-    min_val = plot_df.loc[min_idx, 'Low']
-
-    # Get the numeric index for plotting
-    # Since we are using a range(len(plot_df)) internally for mpf if not specified, 
-    # we need the position.
-    max_pos = plot_df.index.get_loc(max_idx)
-    min_pos = plot_df.index.get_loc(min_idx)
-
-    # Annotate Highest Point
-    axes[0].annotate(f'{max_val:.2f}',
-                 xy=(max_pos, max_val),
-                 xytext=(0, 5),
-                 textcoords='offset points',
-                 ha='center',
-                 va='bottom',
-                 fontsize=6,
-                 fontweight='bold',
-                 color='#f43f5e',
-                 arrowprops=dict(arrowstyle='-', color='#f43f5e', linewidth=0.5))
-
-    # Annotate Lowest Point
-    axes[0].annotate(f'{min_val:.2f}',
-                 xy=(min_pos, min_val),
-                 xytext=(0, -5),
-                 textcoords='offset points',
-                 ha='center',
-                 va='top',
-                 fontsize=6,
-                 fontweight='bold',
-                 color='#10b981',
-                 arrowprops=dict(arrowstyle='-', color='#10b981', linewidth=0.5))
-
-    plt.savefig(full_path, dpi=160)
-    plt.close()
-    if os.path.exists(full_path):
-        print(f"Successfully saved chart to {full_path}")
-    else:
-        print(f"Failed to save chart to {full_path}")
-
 def get_access_token():
     """Refresh Token to issue new Access Token"""
     url = "https://kauth.kakao.com/oauth/token"
@@ -573,12 +683,13 @@ def get_access_token():
         "client_secret": KAKAO_CLIENT_SECRET,
         "refresh_token": KAKAO_REFRESH_TOKEN
     }
-    response = requests.post(url, data=data)
+    response = TAPE.call("kakao", url, lambda: requests.post(url, data=data))
     tokens = response.json()
     
     # Kakao sometimes issues a new refresh_token during the access_token refresh process.
     # We catch this and print it so that GitHub Actions can update the secret automatically.
-    if "refresh_token" in tokens:
+    # (A replayed token is an old one, so it is never reported.)
+    if "refresh_token" in tokens and TAPE.mode != REPLAY:
         print(f"NEW_KAKAO_REFRESH_TOKEN:{tokens['refresh_token']}")
         
     if "access_token" in tokens:
@@ -599,19 +710,13 @@ def get_access_token():
 
 
 
-def generate_html_report(results, filename="index.html", market_date=""):
-    # Set KST time (UTC+9)
-    now_utc = datetime.now(timezone.utc)
-    now_kst = now_utc + timedelta(hours=9)
-    date_str = now_kst.strftime('%Y-%m-%d %H:%M:%S KST')
-    
-    # Market date line (English)
-    market_date_line = f"Reference Market Date: {market_date}" if market_date else ""
-    
-    # ---------------------------------------------------------
-    # Generate Summaries (Market Overview & Ticker Insights)
-    # ---------------------------------------------------------
+def fetch_market_overview(results, price_histories=None):
+    """
+    Market overview shared by the HTML report and results.json: a headline summary,
+    per-ticker insights, the major indices, 52-week-high highlights and driver news.
+    """
     valid_results = [r for r in results if isinstance(r, dict)]
+    snapshot = market_snapshot(price_histories)
     market_overview = "Markets are currently processing AI sector consolidation, inflation expectations, and recent geopolitical developments affecting global trade sentiments."
     
     # Try to find a better overview from broad news (BTC-USD or index proxies)
@@ -638,648 +743,39 @@ def generate_html_report(results, filename="index.html", market_date=""):
             "symbol": res.get('Symbol', 'Unknown'),
             "insight": insight
         })
-    
-    ticker_summary_html = ""
-    for item in ticker_summaries:
-        ticker_summary_html += f"""
-                    <div class="summary-item">
-                        <span class="summary-symbol">{item['symbol']}</span>
-                        <span class="summary-text">{item['insight']}</span>
-                    </div>
-        """
-    # ---------------------------------------------------------
-    
-    html_template = f"""
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Daily US Stock Briefing - {now_kst.strftime('%Y-%m-%d')}</title>
-        <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800&family=Orbitron:wght@700;900&display=swap" rel="stylesheet">
-        <style>
-            :root {{
-                --bg-gradient: linear-gradient(135deg, #0f172a 0%, #1e1b4b 100%);
-                --card-bg: rgba(255, 255, 255, 0.05);
-                --accent-blue: #38bdf8;
-                --accent-green: #10b981;
-                --accent-red: #f43f5e;
-                --text-main: #f8fafc;
-                --text-dim: #94a3b8;
-                --buy-bg: rgba(16, 185, 129, 0.15);
-                --buy-text: #34d399;
-                --sell-bg: rgba(244, 63, 94, 0.15);
-                --sell-text: #fb7185;
-            }}
-            body {{
-                font-family: 'Inter', sans-serif;
-                background: var(--bg-gradient);
-                color: var(--text-main);
-                margin: 0;
-                padding: 40px 20px;
-                min-height: 100vh;
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-            }}
-            .container {{
-                max-width: 1000px;
-                width: 100%;
-            }}
-            header {{
-                text-align: center;
-                margin-bottom: 25px;
-                padding: 20px;
-                border: 2px solid #0ff;
-                border-radius: 12px;
-                box-shadow: 0 0 20px rgba(0, 255, 255, 0.1);
-                background: rgba(10, 10, 10, 0.8);
-            }}
-            h1 {{
-                font-family: 'Orbitron', sans-serif;
-                font-weight: 900;
-                font-size: 2.2rem;
-                text-transform: uppercase;
-                background: linear-gradient(90deg, #ff00de, #00ffea);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                text-shadow: 0 0 15px rgba(255, 0, 222, 0.4);
-                letter-spacing: 1px;
-                margin: 0 0 10px 0;
-                line-height: 1.1;
-            }}
-            .header-sub {{
-                font-family: 'Orbitron', sans-serif;
-                color: #00ffea;
-                letter-spacing: 2px;
-                font-size: 0.9rem;
-            }}
-            
-            /* Dashboard Section */
-            .dashboard {{
-                background: rgba(0, 0, 0, 0.3);
-                border: 1px solid rgba(255, 255, 255, 0.1);
-                border-radius: 16px;
-                padding: 24px;
-                margin-bottom: 40px;
-            }}
-            .dash-grid {{
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-                gap: 20px;
-                margin-bottom: 20px;
-            }}
-            .dash-item {{
-                background: var(--card-bg);
-                border-radius: 12px;
-                padding: 16px;
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                text-align: center;
-            }}
-            .dash-title {{
-                font-size: 0.9rem;
-                font-weight: 600;
-                color: var(--text-dim);
-                margin-bottom: 12px;
-                text-transform: uppercase;
-                letter-spacing: 0.05em;
-            }}
-            .ticker-badges {{
-                display: flex;
-                flex-wrap: wrap;
-                gap: 8px;
-                justify-content: center;
-            }}
-            .badge {{
-                padding: 6px 12px;
-                border-radius: 20px;
-                font-weight: 700;
-                font-size: 0.9rem;
-            }}
-            .badge.buy {{ background: var(--buy-bg); color: var(--buy-text); border: 1px solid var(--buy-text); }}
-            .badge.sell {{ background: var(--sell-bg); color: var(--sell-text); border: 1px solid var(--sell-text); }}
-            .badge.empty {{ background: rgba(255,255,255,0.05); color: var(--text-dim); font-weight: 400; }}
-            
-            .strategy-legend {{
-                font-size: 0.8rem;
-                color: var(--text-dim);
-                border-top: 1px solid rgba(255, 255, 255, 0.1);
-                padding-top: 15px;
-                line-height: 1.6;
-            }}
-            .strategy-legend strong {{ color: var(--text-main); margin-right: 4px; }}
-            .strategy-row {{ margin-bottom: 4px; }}
-
-            /* Stock Cards */
-            .grid {{
-                display: flex;
-                flex-direction: column;
-                gap: 30px;
-            }}
-            .card {{
-                background: var(--card-bg);
-                backdrop-filter: blur(10px);
-                border: 1px solid rgba(255, 255, 255, 0.1);
-                border-radius: 20px;
-                padding: 30px;
-                width: 100%;
-                box-sizing: border-box;
-            }}
-            .card-header {{
-                display: flex;
-                justify-content: space-between;
-                align-items: flex-start;
-                margin-bottom: 20px;
-                flex-wrap: wrap;
-                gap: 20px;
-            }}
-            .symbol-box {{
-                display: flex;
-                flex-direction: column;
-            }}
-            .symbol-row {{
-                display: flex;
-                align-items: baseline;
-                gap: 10px;
-                flex-wrap: wrap;
-            }}
-            .symbol {{
-                font-size: 2rem;
-                font-weight: 800;
-                line-height: 1;
-            }}
-            .symbol-desc {{
-                font-size: 0.9rem;
-                color: var(--text-dim);
-                font-weight: 400;
-                line-height: 1;
-            }}
-            .price-section {{
-                display: flex;
-                gap: 40px;
-                flex-wrap: wrap;
-            }}
-            .price-item {{
-                display: flex;
-                flex-direction: column;
-            }}
-            .price-label {{
-                font-size: 0.75rem;
-                color: var(--text-dim);
-                text-transform: uppercase;
-                margin-bottom: 4px;
-            }}
-            .price-value {{
-                font-size: 1.75rem;
-                font-weight: 700;
-            }}
-            .price-change {{
-                font-size: 1rem;
-                font-weight: 600;
-            }}
-            .up {{ color: var(--accent-green); }}
-            .down {{ color: var(--accent-red); }}
-            .chart-box {{
-                margin: 20px 0;
-                border: 1px solid rgba(255, 255, 255, 0.1);
-                border-radius: 12px;
-                overflow: hidden;
-                background: white;
-                cursor: zoom-in;
-            }}
-            .chart-box img {{
-                width: 100%;
-                display: block;
-            }}
-            
-            /* News Section */
-            .news-section {{
-                margin-top: 20px;
-                border-top: 1px solid rgba(255, 255, 255, 0.1);
-                padding-top: 20px;
-            }}
-            .news-header {{
-                font-size: 0.9rem;
-                color: var(--text-dim);
-                text-transform: uppercase;
-                margin-bottom: 15px;
-                letter-spacing: 0.05em;
-                display: flex;
-                align-items: center;
-                gap: 8px;
-            }}
-            .news-list {{
-                display: flex;
-                flex-direction: column;
-                gap: 16px;
-            }}
-            .news-item {{
-                display: flex;
-                flex-direction: column;
-                gap: 4px;
-            }}
-            .news-link {{
-                color: var(--text-main);
-                text-decoration: none;
-                font-size: 1.05rem;
-                font-weight: 600;
-                line-height: 1.4;
-            }}
-            .news-link:hover {{
-                color: var(--accent-blue);
-                text-decoration: underline;
-            }}
-            .news-source {{
-                font-size: 0.8rem;
-                color: var(--text-dim);
-                font-weight: 400;
-            }}
-            .news-empty {{
-                font-size: 0.9rem;
-                color: var(--text-dim);
-                font-style: italic;
-            }}
-
-            /* Market Summary */
-            .summary-box {{
-                background: rgba(255, 255, 255, 0.05);
-                border: 1px solid rgba(255, 255, 255, 0.1);
-                border-radius: 12px;
-                padding: 1.2rem;
-                margin-top: 15px;
-                margin-bottom: 25px;
-            }}
-            .summary-header {{
-                font-size: 0.85rem;
-                text-transform: uppercase;
-                letter-spacing: 0.05em;
-                color: var(--text-dim);
-                margin-bottom: 0.5rem;
-                display: flex;
-                align-items: center;
-                gap: 6px;
-                font-weight: 600;
-            }}
-            .summary-item {{
-                margin-bottom: 0.8rem;
-                font-size: 0.95rem;
-                line-height: 1.4;
-                display: flex;
-                align-items: flex-start;
-            }}
-            .summary-symbol {{
-                display: inline-block;
-                min-width: 60px;
-                font-weight: 700;
-                color: var(--accent);
-                margin-right: 10px;
-            }}
-            .summary-text {{
-                color: var(--text-base);
-            }}
-            @media (max-width: 600px) {{
-                .summary-item {{
-                    font-size: 0.9rem;
-                }}
-                .summary-symbol {{
-                    min-width: 50px;
-                }}
-            }}
-
-            /* Modal */
-            .modal {{
-                display: none;
-                position: fixed;
-                z-index: 1000;
-                top: 0;
-                left: 0;
-                width: 100%;
-                height: 100%;
-                background-color: rgba(0,0,0,0.95);
-                padding: 20px;
-                box-sizing: border-box;
-                justify-content: center;
-                align-items: center;
-            }}
-            .modal-content {{
-                max-width: 100%;
-                max-height: 100%;
-                border-radius: 8px;
-                object-fit: contain;
-            }}
-
-            footer {{
-                margin-top: 60px;
-                text-align: center;
-                color: var(--text-dim);
-                font-size: 0.875rem;
-            }}
-            @media (max-width: 600px) {{
-                .symbol-desc {{
-                    display: block;
-                    width: 100%;
-                    margin-top: 4px;
-                }}
-            }}
-
-            /* Indices Grid */
-            .indices-grid {{
-                display: grid;
-                grid-template-columns: repeat(2, 1fr);
-                gap: 12px;
-                margin-bottom: 24px;
-            }}
-            .index-card {{
-                background: rgba(255, 255, 255, 0.05);
-                border: 1px solid rgba(255, 255, 255, 0.1);
-                border-radius: 12px;
-                padding: 16px;
-                display: flex;
-                flex-direction: column;
-            }}
-            .index-name {{
-                font-size: 0.9rem;
-                color: #38bdf8;
-                margin-bottom: 8px;
-                font-weight: 600;
-            }}
-            .index-price {{
-                font-size: 1.1rem;
-                font-weight: 700;
-                color: var(--text-main);
-                margin-bottom: 4px;
-            }}
-            .index-change {{
-                font-size: 0.9rem;
-                font-weight: 600;
-            }}
-            
-            /* Market Commentary */
-            .commentary-section {{
-                margin-top: 20px;
-                border-top: 1px solid rgba(255, 255, 255, 0.1);
-                padding-top: 15px;
-            }}
-            .highlight-item {{
-                margin-bottom: 8px;
-                font-size: 0.95rem;
-                color: var(--accent-green);
-            }}
-            .driver-item {{
-                margin-bottom: 12px;
-                display: flex;
-                flex-direction: column;
-            }}
-            .driver-link {{
-                color: var(--text-main);
-                text-decoration: none;
-                font-size: 0.95rem;
-                font-weight: 500;
-                line-height: 1.4;
-            }}
-            .driver-link:hover {{
-                color: var(--accent-blue);
-                text-decoration: underline;
-            }}
-            .driver-source {{
-                font-size: 0.8rem;
-                color: var(--text-dim);
-                margin-top: 2px;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <header>
-                <h1>Daily US Stock Briefing</h1>
-                <div class="header-sub">{date_str}</div>
-                <div class="header-sub" style="font-size: 0.8rem; margin-top: 5px; color: rgba(255, 255, 255, 0.7);">{market_date_line}</div>
-            </header>
-            
-            <!-- Signal Dashboard -->
-            <div class="dashboard">
-                <div class="dash-grid">
-    """
-    
-    # Dashboard Content Logic
-    buy1_tickers = [r['Symbol'] for r in valid_results if r['Signals']['Buy1']]
-    buy2_tickers = [r['Symbol'] for r in valid_results if r['Signals']['Buy2']]
-    sell1_tickers = [r['Symbol'] for r in valid_results if r['Signals']['Sell1']]
-
-    # 1. 1st Buy List
-    if buy1_tickers:
-        html_template += """
-                    <!-- 1st Buy -->
-                    <div class="dash-item">
-                        <div class="dash-title">Bullish Setup (1st Buy)</div>
-                        <div class="ticker-badges">
-        """
-        for t in buy1_tickers:
-            html_template += f'<div class="badge buy">{t}</div>'
-        html_template += """
-                        </div>
-                    </div>
-        """
-
-    # 2. 2nd Buy List
-    if buy2_tickers:
-        html_template += """
-                    <!-- 2nd Buy -->
-                    <div class="dash-item">
-                        <div class="dash-title">Oversold & Bullish (2nd Buy)</div>
-                        <div class="ticker-badges">
-        """
-        for t in buy2_tickers:
-            html_template += f'<div class="badge buy">{t}</div>'
-        html_template += """
-                        </div>
-                    </div>
-        """
-    
-    # 3. Sell List
-    if sell1_tickers:
-        html_template += """
-                    <!-- 1st Sell -->
-                    <div class="dash-item">
-                        <div class="dash-title">Overbought & Peak (Sell)</div>
-                        <div class="ticker-badges">
-        """
-        for t in sell1_tickers:
-            html_template += f'<div class="badge sell">{t}</div>'
-        html_template += """
-                        </div>
-                    </div>
-        """
-
-    html_template += """
-                </div>
-                <div class="strategy-legend">
-                    <div class="strategy-row"><strong>1st Buy:</strong> Bearish Alignment (20 < 60 < 120*) + Close < EMA(20)</div>
-                    <div class="strategy-row"><strong>2nd Buy:</strong> 1st Buy Conditions Met + RSI(14) < 30 (Deep Oversold)</div>
-                    <div class="strategy-row"><strong>1st Sell:</strong> Bullish Alignment (20 > 60 > 120*) + Close > EMA(20) + RSI(14) > 70</div>
-                    <div class="strategy-row" style="margin-top: 10px; font-style: italic;">* Note: EMA(120) is optional for new stock listings.</div>
-                </div>
-            </div>
-    """
 
-    # Fetch Market Indices Data
-    indices_data = fetch_market_indices()
-    
-    indices_html = '<div class="indices-grid">'
-    for idx in indices_data:
-        c_class = "up" if idx['change_pct'] >= 0 else "down"
-        c_sign = "+" if idx['change_pct'] >= 0 else ""
-        formatted_price = f"{idx['price']:,.2f}"
-        formatted_change = f"{c_sign}{idx['change_pct']:.2f}%"
-        
-        indices_html += f"""
-            <div class="index-card">
-                <span class="index-name">{idx['name']}</span>
-                <span class="index-price">{formatted_price}</span>
-                <span class="index-change {c_class}">{formatted_change}</span>
-            </div>
-        """
-    indices_html += '</div>'
-
-    # Fetch Highlights & News
-    highlights = fetch_market_highlights()
-    market_news = fetch_market_news()
-    
-    commentary_html = '<div class="commentary-section">'
-    
-    # Highlights
-    if highlights:
-        commentary_html += '<div style="margin-bottom: 15px;">'
-        for h in highlights:
-            commentary_html += f'<div class="highlight-item">✅ {h}</div>'
-        commentary_html += '</div>'
-        
-    # News Drivers
-    if market_news:
-        commentary_html += '<div class="summary-header"><span>📰</span> KEY MARKET DRIVERS</div>'
-        for n in market_news:
-            commentary_html += f"""
-                <div class="driver-item">
-                    <a href="{n['link']}" target="_blank" class="driver-link">{n['title']}</a>
-                    <span class="driver-source">{n['source']}</span>
-                </div>
-            """
-    else:
-        commentary_html += '<div class="news-empty">No major headlines found.</div>'
-        
-    commentary_html += '</div>'
-
-    html_template += f"""
-            <!-- Market Summary -->
-            <div class="summary-box">
-                {indices_html}
-                
-                <div class="summary-header" style="margin-top: 1rem;">
-                    <span>📝</span> MARKET COMMENTARY
-                </div>
-                {commentary_html}
-            </div>
-
-            <div class="grid">
-    """
+    return {
+        "summary": market_overview,
+        "insights": ticker_summaries,
+        "indices": fetch_market_indices(snapshot=snapshot),
+        "highlights": fetch_market_highlights(snapshot=snapshot),
+        "news": fetch_market_news(snapshot=snapshot),
+    }
+
+def generate_html_report(results, filename="index.html", market_date="", price_histories=None, market=None):
+    # Set KST time (UTC+9)
+    now_utc = datetime.now(timezone.utc)
+    now_kst = now_utc + timedelta(hours=9)
+    date_str = now_kst.strftime('%Y-%m-%d %H:%M:%S KST')
     
-    for res in valid_results:
-        c_class = "up" if res['Change'] >= 0 else "down"
-        c_sign = "+" if res['Change'] >= 0 else ""
-        a_class = "up" if (res['AfterChange'] or 0) >= 0 else "down"
-        a_sign = "+" if (res['AfterChange'] or 0) >= 0 else ""
-        
-        # Symbol + Description
-        desc_html = f'<span class="symbol-desc">({res["LongName"]})</span>' if res["LongName"] else ""
-        
-        html_template += f"""
-                <div class="card">
-                    <div class="card-header">
-                        <div class="symbol-box">
-                            <div class="symbol-row">
-                                <span class="symbol">{res['Symbol']}</span>
-                                {desc_html}
-                            </div>
-                        </div>
-                        <div class="price-section">
-                            <div class="price-item">
-                                <span class="price-label">At Close</span>
-                                <span class="price-value">{res['Price']}</span>
-                                <span class="price-change {c_class}">{c_sign}{res['Change']}%</span>
-                            </div>
-        """
-        
-        if res['AfterPrice']:
-            html_template += f"""
-                            <div class="price-item">
-                                <span class="price-label">After Hours</span>
-                                <span class="price-value">{res['AfterPrice']}</span>
-                                <span class="price-change {a_class}">{a_sign}{res['AfterChange']}%</span>
-                            </div>
-            """
-            
-        html_template += f"""
-                        </div>
-                    </div>
-                    
-                    <div class="chart-box" onclick="openModal('charts/{res['Chart']}')">
-                        <img src="charts/{res['Chart']}" alt="{res['Symbol']} Chart">
-                    </div>
-                    
-                    <div class="news-section">
-                        <div class="news-header">
-                            <span>📰</span> Related News & Market {f"({res['NewsAsset']} Insights)" if res['NewsAsset'] != res['Symbol'] else "Insights"}
-                        </div>
-                        <div class="news-list">
-        """
-        
-        if res['News']:
-            for n in res['News']:
-                html_template += f"""
-                            <div class="news-item">
-                                <a href="{n['link']}" target="_blank" class="news-link">{n['title']}</a>
-                                <span class="news-source">Source: {n['publisher']}</span>
-                            </div>
-            """
-        else:
-            html_template += """
-                            <div class="news-item">
-                                <p class="news-empty">There are no significant news affecting today's stock price.</p>
-                            </div>
-            """
-            
-        html_template += f"""
-                        </div>
-                    </div>
-                </div>
-        """
-        
-    html_template += """
-            </div>
-            <footer>
-                <p>Crafted by Google Antigravity based on <a href="https://heroyik.github.io" target="_blank" style="color: inherit; text-decoration: underline;">nIcK</a>'s trading strategy</p>
-            </footer>
-        </div>
-
-        <div id="modal" class="modal" onclick="closeModal()">
-            <img class="modal-content" id="modalImg">
-        </div>
-
-        <script>
-            function openModal(src) {
-                document.getElementById('modal').style.display = 'flex';
-                document.getElementById('modalImg').src = src;
-            }
-            function closeModal() {
-                document.getElementById('modal').style.display = 'none';
-            }
-        </script>
-    </body>
-    </html>
-    """
+    # Market date line (English)
+    market_date_line = f"Reference Market Date: {market_date}" if market_date else ""
     
+    valid_results = [r for r in results if isinstance(r, dict)]
+    if market is None:
+        market = fetch_market_overview(results, price_histories)
+
+    html_template = render_report(
+        valid_results,
+        date_str=date_str,
+        title_date=now_kst.strftime('%Y-%m-%d'),
+        market_date_line=market_date_line,
+        indices=market["indices"],
+        highlights=market["highlights"],
+        market_news=market["news"],
+        thumb_size=thumb_size(),
+    )
+
     if not os.path.exists("public"):
         os.makedirs("public")
     
@@ -1291,7 +787,7 @@ def generate_html_report(results, filename="index.html", market_date=""):
 def send_kakao_link(briefing_url, results, market_date):
     if not KAKAO_REST_API_KEY or not KAKAO_REFRESH_TOKEN:
         print(f"Kakao configuration missing. Briefing URL: {briefing_url}")
-        return
+        return False
 
     access_token = get_access_token()
     
@@ -1340,47 +836,65 @@ def send_kakao_link(briefing_url, results, market_date):
         "template_object": json.dumps(template_object)
     }
     
-    response = requests.post(url, headers=headers, data=payload)
+    response = TAPE.call("kakao", [url, market_date], lambda: requests.post(url, headers=headers, data=payload))
     if response.status_code == 200:
         print("KakaoTalk message sent successfully!")
+        return True
     else:
         print(f"Failed to send KakaoTalk message: {response.status_code} - {response.text}")
         raise Exception(f"Kakao API Error: {response.text}")
 
-def get_last_trading_date():
-    """Fetches the last trading date from SPY history."""
-    try:
-        spy = yf.Ticker("SPY")
-        hist = spy.history(period="5d")
-        if hist.empty:
-            return None
-        return hist.index[-1].date().strftime('%Y-%m-%d')
-    except Exception as e:
-        print(f"Error fetching last trading date: {e}")
-        return None
+def get_last_trading_date(day=None):
+    """Last NYSE session on or before `day` (default: today in New York), from the offline calendar."""
+    return last_session(day).strftime('%Y-%m-%d')
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="FinRep: Daily US Stock Briefing")
     parser.add_argument("--manual", action="store_true", help="Run in manual mode (updates index.html, skips Kakao notification)")
+    parser.add_argument("--workers", type=int, default=os.getenv("FINREP_WORKERS", "1"),
+                        help="Fetch tickers concurrently with this many threads (default: 1, sequential)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Compute indicators and signals for all tickers in one vectorized pass")
+    parser.add_argument("--chart-mode", choices=["png", "series"], default=os.getenv("FINREP_CHART_MODE", "png"),
+                        help="png: render chart images; series: write compact series files drawn in the browser")
+    parser.add_argument("--chart-workers", type=int, default=os.getenv("FINREP_CHART_WORKERS", "0"),
+                        help="Processes used to render charts (default: CPU count)")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Ignore the stages saved for this market date and redo the whole run")
+    parser.add_argument("--renotify", action="store_true",
+                        help="Send the KakaoTalk notification even if it was already sent for this market date")
+    tape_group = parser.add_mutually_exclusive_group()
+    tape_group.add_argument("--record", metavar="DIR", default=os.getenv("FINREP_RECORD"),
+                            help="Record every Yahoo and Kakao response of this run (and its starting cache) into DIR")
+    tape_group.add_argument("--replay", metavar="DIR", default=os.getenv("FINREP_REPLAY"),
+                            help="Replay a run recorded with --record from DIR, without network access")
     args = parser.parse_args()
 
-    # 1. Determine Target Date (Clock Time in NY) - What day is it locally?
     ny_tz = ZoneInfo("America/New_York")
-    now_ny = datetime.now(ny_tz)
+    if args.record:
+        TAPE.start(RECORD, args.record)
+        TAPE.snapshot_cache(storage.CACHE_DIR)
+        TAPE.meta["now_ny"] = datetime.now(ny_tz).isoformat()
+        TAPE.save()  # the start time is needed even if the run stops early
+    elif args.replay:
+        TAPE.start(REPLAY, args.replay)
+        storage.set_cache_dir(TAPE.restore_cache())
+        print(f"Replaying {args.replay} against the cache copy in {storage.CACHE_DIR}")
+
+    # 1. Determine Target Date (Clock Time in NY) - What day is it locally?
+    # (A replay runs at the recorded time, so it picks the same market date)
+    if "now_ny" in TAPE.meta:
+        now_ny = datetime.fromisoformat(TAPE.meta["now_ny"])
+    else:
+        now_ny = datetime.now(ny_tz)
     target_date_str = now_ny.strftime('%Y-%m-%d')
 
     # 2. Determine Data Date (Market Reality) - What was the last actual trading day?
-    data_date_str = get_last_trading_date()
-    
-    if not data_date_str:
-        print("❌ Critical: Unable to fetch SPY data to determine market date.")
-        # Determine fallback behavior? exit or fallback to target
-        if not args.manual:
-            exit(1)
-        data_date_str = target_date_str # Fallback for manual if internet is weird but we want to try?
+    # Comes from the offline NYSE calendar, so it needs no network access
+    data_date_str = get_last_trading_date(now_ny.date())
 
     print(f"Target Date (NY): {target_date_str}")
-    print(f"Data Date (SPY):  {data_date_str}")
+    print(f"Data Date (NYSE): {data_date_str}")
 
     # 3. Check for Auto-Run Validity
     # Only skip generation on SCHEDULED (cron) runs if the market was closed on the target date.
@@ -1394,7 +908,8 @@ if __name__ == "__main__":
         # Since we run at 07:00 KST (17:00/18:00 EST), the Data Date matches Target Date if market was open.
         # If target != data, it means market was closed on Target Date (e.g. Holiday or Weekend).
         if target_date_str != data_date_str:
-            print(f"🚫 Market was CLOSED on {target_date_str}. (Last open: {data_date_str})")
+            reason = holiday_name(target_date_str) or "Weekend"
+            print(f"🚫 Market was CLOSED on {target_date_str} ({reason}). (Last open: {data_date_str})")
             print("Skipping scheduled briefing generation for holiday/weekend.")
             exit(0)
         print(f"✅ Market was OPEN on {target_date_str}. Proceeding with scheduled run.")
@@ -1406,23 +921,51 @@ if __name__ == "__main__":
     # 4. Set the official Reference Market Date for the report
     # ALWAYS use the Data Date, so the report says "Analysis of Jan 5" even if generated on "Jan 6 morning".
     market_date_str = data_date_str
+    NEWS_HISTORY.day = market_date_str
 
-    report_data = []
-    for ticker in TICKERS:
-        print(f"Analyzing {ticker}...")
-        report_data.append(fetch_and_analyze(ticker))
+    # Stage outputs are saved per market date; a rerun only redoes what is missing or failed
+    checkpoint = RunCheckpoint(market_date_str, enabled=not args.fresh)
+
+    report_data, price_histories = analyze_with_checkpoint(
+        checkpoint, TICKERS, workers=args.workers, batch=args.batch,
+        chart_workers=args.chart_workers or None, chart_mode=args.chart_mode)
     
+    # Market overview is shared by the HTML report and the results.json snapshot
+    overview_inputs = market_inputs(report_data, price_histories)
+    market = checkpoint.load("market", overview_inputs)
+    if market is None:
+        market = fetch_market_overview(report_data, price_histories)
+        checkpoint.save("market", market, overview_inputs)
+
     # Generate HTML report
-    generate_html_report(report_data, "index.html", market_date_str)
+    generate_html_report(report_data, "index.html", market_date_str, price_histories, market=market)
+
+    # Machine-readable snapshot of the same data
+    write_results_json(report_data, market_date_str, market)
+
+    # Remember the headlines shown today so later reports don't repeat them
+    NEWS_HISTORY.save()
     
     # GitHub Pages URL
     GITHUB_USER = "heroyik"
     REPO_NAME = "finrep"
     briefing_url = f"https://{GITHUB_USER}.github.io/{REPO_NAME}/"
     
-    # Send KakaoTalk Link (Skip in manual mode)
-    if not args.manual:
-        send_kakao_link(briefing_url, report_data, market_date_str)
-    else:
+    # Send KakaoTalk Link (Skip in manual mode, and once sent for this market date)
+    if args.manual:
         print("Manual mode: Skipping KakaoTalk notification.")
+    elif checkpoint.done("notify") and not args.renotify:
+        print(f"KakaoTalk notification for {market_date_str} was already sent. Use --renotify to send it again.")
+    elif send_kakao_link(briefing_url, report_data, market_date_str):
+        checkpoint.save("notify", {"url": briefing_url})
+
+    checkpoint.prune()
+
+    # Requests, retries and open circuits per Yahoo endpoint
+    if YAHOO.stats:
+        print(YAHOO.summary())
+
+    if TAPE.active:
+        TAPE.save()
+        print(TAPE.summary())
 
@@ -0,0 +1,155 @@
+"""
+Offline NYSE trading calendar.
+
+Sessions, holidays and early closes are computed from the exchange's rules (fixed
+and weekday-based holidays with their weekend observance, Good Friday from the
+Easter date, 1:00 pm closes around Independence Day, Thanksgiving and Christmas)
+plus a short list of unscheduled closures, so deciding whether the market traded
+on a day needs no network access. Holidays are computed once per year and cached.
+
+Dates can be passed as `datetime.date` objects or "YYYY-MM-DD" strings.
+"""
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+NY_TZ = ZoneInfo("America/New_York")
+
+REGULAR_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+
+# Unscheduled full-day closures (national days of mourning, weather, 9/11)
+SPECIAL_CLOSURES = {
+    date(2001, 9, 11): "September 11",
+    date(2001, 9, 12): "September 11",
+    date(2001, 9, 13): "September 11",
+    date(2001, 9, 14): "September 11",
+    date(2004, 6, 11): "Day of Mourning (Reagan)",
+    date(2007, 1, 2): "Day of Mourning (Ford)",
+    date(2012, 10, 29): "Hurricane Sandy",
+    date(2012, 10, 30): "Hurricane Sandy",
+    date(2018, 12, 5): "Day of Mourning (G. H. W. Bush)",
+    date(2025, 1, 9): "Day of Mourning (Carter)",
+}
+
+
+def _date(day):
+    if isinstance(day, datetime):
+        return day.date()
+    if isinstance(day, str):
+        return date.fromisoformat(day)
+    return day
+
+def _nth_weekday(year, month, weekday, n):
+    """n-th (1-based) `weekday` (Mon=0) of the month; n=-1 is the last one."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year, month + 1, 1) - timedelta(days=1) if month < 12 else date(year, 12, 31)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+def _observed(day):
+    """Saturday holidays are observed on Friday, Sunday holidays on Monday."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+def easter(year):
+    """Western Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+@lru_cache(maxsize=None)
+def holidays(year):
+    """{date: name} of the full-day NYSE closures in `year`."""
+    days = {}
+    new_year = date(year, 1, 1)
+    # A Saturday New Year's Day is not observed on the Friday before (the year-end close)
+    if new_year.weekday() != 5:
+        days[_observed(new_year)] = "New Year's Day"
+    if year >= 1998:
+        days[_nth_weekday(year, 1, 0, 3)] = "Martin Luther King Jr. Day"
+    days[_nth_weekday(year, 2, 0, 3)] = "Washington's Birthday"
+    days[easter(year) - timedelta(days=2)] = "Good Friday"
+    days[_nth_weekday(year, 5, 0, -1)] = "Memorial Day"
+    if year >= 2022:
+        days[_observed(date(year, 6, 19))] = "Juneteenth"
+    days[_observed(date(year, 7, 4))] = "Independence Day"
+    days[_nth_weekday(year, 9, 0, 1)] = "Labor Day"
+    days[_nth_weekday(year, 11, 3, 4)] = "Thanksgiving Day"
+    days[_observed(date(year, 12, 25))] = "Christmas Day"
+    days.update({d: name for d, name in SPECIAL_CLOSURES.items() if d.year == year})
+    return days
+
+@lru_cache(maxsize=None)
+def early_closes(year):
+    """{date: name} of the 1:00 pm closes in `year`."""
+    days = {}
+    july_3 = date(year, 7, 3)
+    if july_3.weekday() < 4:
+        days[july_3] = "Independence Day eve"
+    days[_nth_weekday(year, 11, 3, 4) + timedelta(days=1)] = "Day after Thanksgiving"
+    christmas_eve = date(year, 12, 24)
+    if christmas_eve.weekday() < 4:
+        days[christmas_eve] = "Christmas Eve"
+    return {d: name for d, name in days.items() if d not in holidays(year)}
+
+def holiday_name(day):
+    """Name of the holiday closing the market on `day`, or None."""
+    day = _date(day)
+    return holidays(day.year).get(day)
+
+def is_session(day):
+    """True if the NYSE trades on `day`."""
+    day = _date(day)
+    return day.weekday() < 5 and day not in holidays(day.year)
+
+def is_early_close(day):
+    day = _date(day)
+    return is_session(day) and day in early_closes(day.year)
+
+def session_close(day):
+    """Closing time (New York) of the session on `day`, or None if the market is closed."""
+    if not is_session(day):
+        return None
+    return EARLY_CLOSE if is_early_close(day) else REGULAR_CLOSE
+
+def last_session(day=None):
+    """The latest session on or before `day` (default: today in New York)."""
+    day = _date(day) if day is not None else today_ny()
+    while not is_session(day):
+        day -= timedelta(days=1)
+    return day
+
+def previous_session(day):
+    return last_session(_date(day) - timedelta(days=1))
+
+def next_session(day):
+    day = _date(day) + timedelta(days=1)
+    while not is_session(day):
+        day += timedelta(days=1)
+    return day
+
+def sessions(start, end):
+    """Every session from `start` to `end`, inclusive."""
+    day, end = _date(start), _date(end)
+    result = []
+    while day <= end:
+        if is_session(day):
+            result.append(day)
+        day += timedelta(days=1)
+    return result
+
+def today_ny():
+    return datetime.now(NY_TZ).date()
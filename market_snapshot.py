@@ -0,0 +1,104 @@
+"""
+One fetch per market index per run.
+
+The market overview needs, for every index, the last price and previous close
+(index cards), the 52-week high (highlights) and the news (market drivers).
+MarketSnapshot gathers all of it once per index, concurrently, preferring data
+the run already has: the batch-fetched daily history (price, previous close and
+52-week high from the stored bars) and the shared info / news caches. yfinance is
+only asked directly when an index has no usable history.
+
+Adding an index (VIX, a sector ETF, ...) is one entry in the index list; entries
+can opt out of the 52-week-high check with "highlight": False.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import yfinance as yf
+
+from yahoo_scheduler import YAHOO
+
+SNAPSHOT_WORKERS = 8
+
+# Window of the 52-week high, taken from the stored history (`info` only without one)
+YEAR_DAYS = 365
+
+
+class MarketSnapshot:
+    def __init__(self, indices, price_histories=None, info_cache=None, news_cache=None, workers=SNAPSHOT_WORKERS):
+        self.indices = list(indices)
+        self.price_histories = price_histories or {}
+        self.info_cache = info_cache
+        self.news_cache = news_cache
+        self.workers = workers
+        self._quotes = None
+
+    def _prices(self, symbol):
+        """(price, previous close) from the stored history, fast_info or a short history download."""
+        hist = self.price_histories.get(symbol)
+        if hist is not None:
+            closes = hist['Close'].dropna()
+            if len(closes) > 1:
+                return closes.iloc[-1], closes.iloc[-2]
+
+        ticker = yf.Ticker(symbol)
+        try:
+            return YAHOO.call("quote", lambda: (ticker.fast_info['last_price'], ticker.fast_info['previous_close']),
+                              key=symbol)
+        except Exception as e:
+            print(f"fast_info unavailable for {symbol} ({e}). Falling back to history.")
+
+        hist = YAHOO.call("history", ticker.history, period="2d", key=[symbol, "2d"])
+        if hist.empty:
+            return None, None
+        current = hist.iloc[-1]['Close']
+        prev = hist.iloc[-2]['Close'] if len(hist) > 1 else current
+        return current, prev
+
+    def _year_high(self, symbol):
+        hist = self.price_histories.get(symbol)
+        if hist is not None and not hist.empty:
+            # A history shorter than a year is the symbol's whole life, so its high is the 52-week high
+            start = hist.index[-1] - pd.Timedelta(days=YEAR_DAYS)
+            return hist.loc[hist.index > start, 'High'].max()
+        if self.info_cache is None:
+            return None
+        return self.info_cache.get(symbol, ['fiftyTwoWeekHigh']).get('fiftyTwoWeekHigh')
+
+    def _quote(self, index):
+        symbol = index["symbol"]
+        quote = {
+            "name": index["name"], "symbol": symbol, "price": None, "previous_close": None,
+            "change_pct": None, "year_high": None, "news": [], "error": False,
+        }
+        try:
+            price, prev_close = self._prices(symbol)
+            if price is not None:
+                quote["price"], quote["previous_close"] = price, prev_close
+                quote["change_pct"] = ((price - prev_close) / prev_close) * 100 if prev_close else 0.0
+            else:
+                quote["error"] = True
+        except Exception as e:
+            print(f"Error fetching index {index['name']}: {e}")
+            quote["error"] = True
+
+        if index.get("highlight", True):
+            try:
+                quote["year_high"] = self._year_high(symbol)
+            except Exception as e:
+                print(f"Error checking highlight for {index['name']}: {e}")
+
+        if self.news_cache is not None and index.get("news", True):
+            quote["news"] = self.news_cache.get(symbol)
+        return quote
+
+    def quotes(self):
+        """One quote dict per index (in order), fetched concurrently on first use."""
+        if self._quotes is None:
+            print(f"Fetching market snapshot for {len(self.indices)} indices...")
+            if self.workers <= 1 or len(self.indices) <= 1:
+                self._quotes = [self._quote(idx) for idx in self.indices]
+            else:
+                with ThreadPoolExecutor(max_workers=min(self.workers, len(self.indices))) as pool:
+                    self._quotes = list(pool.map(self._quote, self.indices))
+        return self._quotes
@@ -0,0 +1,63 @@
+"""
+Per-run cache of yfinance `Ticker.news`, keyed by symbol.
+
+Several tickers can share an underlying (and the market drivers read the index
+news), so every consumer goes through one cache: each symbol is fetched at most
+once per run, and `prefetch` fetches all unique symbols of a run concurrently.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import yfinance as yf
+
+from yahoo_scheduler import YAHOO
+
+NEWS_WORKERS = 8
+
+
+class NewsCache:
+    def __init__(self, fetch=None, workers=NEWS_WORKERS):
+        self.fetch = fetch or (lambda symbol: YAHOO.call("news", lambda: yf.Ticker(symbol).news, key=symbol))
+        self.workers = workers
+        self._news = {}  # symbol -> list of raw news items fetched during this run
+        self._lock = threading.Lock()
+        self._symbol_locks = {}
+
+    def get(self, symbol):
+        """Raw news items for `symbol` ([] if the fetch failed), fetched on first use."""
+        with self._lock:
+            symbol_lock = self._symbol_locks.setdefault(symbol, threading.Lock())
+
+        with symbol_lock:
+            if symbol not in self._news:
+                try:
+                    self._news[symbol] = list(self.fetch(symbol) or [])
+                except Exception as e:
+                    print(f"Error fetching news for {symbol}: {e}")
+                    self._news[symbol] = []
+            return self._news[symbol]
+
+    def get_many(self, symbols):
+        """News items of all `symbols`, concatenated in order (a new list)."""
+        items = []
+        for symbol in symbols:
+            items.extend(self.get(symbol))
+        return items
+
+    def prefetch(self, symbols):
+        """Fetch every not yet cached symbol once, on up to `workers` threads."""
+        missing = [s for s in dict.fromkeys(symbols) if s not in self._news]
+        if not missing:
+            return
+        print(f"Fetching news for {len(missing)} symbols...")
+        if self.workers <= 1 or len(missing) == 1:
+            for symbol in missing:
+                self.get(symbol)
+            return
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(missing))) as pool:
+            list(pool.map(self.get, missing))
+
+    def clear(self):
+        with self._lock:
+            self._news.clear()
+            self._symbol_locks.clear()
@@ -0,0 +1,117 @@
+"""
+Headlines already shown in earlier reports, kept across runs.
+
+Each shown article is recorded under two keys, a hash of its normalized link
+(scheme, "www.", query string and fragment dropped) and a hash of its normalized
+title, so a syndicated copy with a different URL or tracking parameters is
+recognized too. An article counts as seen if it was shown for an earlier market
+date, or already shown by another card in this run; a rerun for the same market
+date therefore reproduces the same report.
+
+Entries expire after `ttl` seconds and the file keeps at most `max_entries`
+(the oldest are dropped), so it stays small over months of daily runs.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from storage import cache_path
+
+NEWS_HISTORY_NAME = "news_history.json"
+NEWS_HISTORY_TTL = 14 * 24 * 3600
+NEWS_HISTORY_MAX_ENTRIES = 5000
+
+
+def normalize_link(link):
+    parts = urlsplit(link.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return f"{host}{parts.path.rstrip('/')}"
+
+def normalize_title(title):
+    return " ".join(re.sub(r"[^\w\s]", " ", title.casefold()).split())
+
+def _digest(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+def news_keys(title, link):
+    """Store keys of an article: its normalized link and its normalized title."""
+    keys = []
+    if link:
+        keys.append("l:" + _digest(normalize_link(link)))
+    if title:
+        keys.append("t:" + _digest(normalize_title(title)))
+    return keys
+
+
+class NewsHistory:
+    def __init__(self, path=None, ttl=NEWS_HISTORY_TTL, max_entries=NEWS_HISTORY_MAX_ENTRIES, day=None):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Market date of this run; entries recorded for it don't hide anything on a rerun
+        self.day = day or datetime.now(timezone.utc).strftime('%Y-%m-%d')
+        self._entries = None  # key -> [market date first shown, timestamp]
+        self._shown = set()   # keys shown during this run
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._entries is None:
+            if self.path is None:
+                self.path = cache_path(NEWS_HISTORY_NAME)
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                entries = {}
+            cutoff = time.time() - self.ttl
+            self._entries = {k: v for k, v in entries.items() if v[1] >= cutoff}
+        return self._entries
+
+    def _seen(self, keys):
+        entries = self._load()
+        for key in keys:
+            if key in self._shown:
+                return True
+            entry = entries.get(key)
+            if entry is not None and entry[0] != self.day:
+                return True
+        return False
+
+    def seen(self, title, link):
+        with self._lock:
+            return self._seen(news_keys(title, link))
+
+    def claim(self, title, link):
+        """Record the article as shown unless it was seen before. Returns True if it may be shown."""
+        keys = news_keys(title, link)
+        with self._lock:
+            if self._seen(keys):
+                return False
+            entries = self._load()
+            now = time.time()
+            for key in keys:
+                self._shown.add(key)
+                entries.setdefault(key, [self.day, now])
+            return True
+
+    def save(self):
+        """Write the store, keeping only the newest `max_entries` entries."""
+        with self._lock:
+            entries = self._load()
+            if len(entries) > self.max_entries:
+                newest = sorted(entries.items(), key=lambda item: item[1][1], reverse=True)
+                self._entries = entries = dict(newest[:self.max_entries])
+            try:
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(entries, f, separators=(",", ":"))
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Error saving news history: {e}")
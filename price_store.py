@@ -0,0 +1,257 @@
+"""
+Incremental on-disk OHLCV store.
+
+Daily bars are kept per symbol in a SQLite database under the cache directory.
+The first request for a symbol backfills its full history; every later request
+only asks yfinance for the bars since the last stored session and merges them in.
+"""
+import sqlite3
+import threading
+
+import pandas as pd
+import yfinance as yf
+
+from storage import cache_path
+from yahoo_scheduler import YAHOO
+
+PRICE_DB_NAME = "prices.sqlite"
+
+# yfinance column name -> SQLite column name
+BAR_COLUMNS = {
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Volume": "volume",
+    "Dividends": "dividends",
+    "Stock Splits": "splits",
+}
+
+# Number of already stored bars that are downloaded again on an incremental update.
+# The newest stored bar may have been a partial (intraday) bar, so it is always replaced;
+# the one before it is final and is used to detect re-adjusted history.
+OVERLAP_BARS = 2
+
+# Relative tolerance when comparing an overlapping bar against its stored copy.
+REVISION_TOLERANCE = 1e-6
+
+# Symbols per yf.download request; each request costs one scheduler token per symbol
+DOWNLOAD_CHUNK = 20
+
+
+class PriceStore:
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self.path is None:
+            self.path = cache_path(PRICE_DB_NAME)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS bars ("
+            " symbol TEXT NOT NULL, date TEXT NOT NULL,"
+            " open REAL, high REAL, low REAL, close REAL, volume REAL,"
+            " dividends REAL, splits REAL,"
+            " PRIMARY KEY (symbol, date))"
+        )
+        return conn
+
+    def load(self, symbol):
+        """Return every stored bar for a symbol as a Date-indexed DataFrame (empty if unknown)."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT date, open, high, low, close, volume, dividends, splits"
+                " FROM bars WHERE symbol = ? ORDER BY date",
+                (symbol,)
+            ).fetchall()
+        finally:
+            conn.close()
+
+        df = pd.DataFrame(rows, columns=["Date"] + list(BAR_COLUMNS.keys()))
+        df["Date"] = pd.to_datetime(df["Date"])
+        df = df.set_index("Date").astype(float)
+        return df
+
+    def save(self, symbol, df, replace=False):
+        """
+        Upsert bars for a symbol. With replace=True the symbol's existing bars are
+        dropped first (used after a full backfill).
+        """
+        df = normalize_bars(df)
+        records = [
+            (symbol, idx.strftime('%Y-%m-%d')) + tuple(
+                None if pd.isna(row[col]) else float(row[col]) for col in BAR_COLUMNS
+            )
+            for idx, row in df.iterrows()
+        ]
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    if replace:
+                        conn.execute("DELETE FROM bars WHERE symbol = ?", (symbol,))
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO bars"
+                        " (symbol, date, open, high, low, close, volume, dividends, splits)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        records
+                    )
+            finally:
+                conn.close()
+
+    def get_history(self, symbol, fetch=None):
+        """
+        Return the full daily history for a symbol, downloading only what is missing.
+
+        `fetch(symbol, start)` returns yfinance bars starting at `start` (a 'YYYY-MM-DD'
+        string), or the full history when `start` is None.
+        """
+        fetch = fetch or download_history
+        return self.get_histories(
+            [symbol], download=lambda symbols, start: {symbols[0]: fetch(symbols[0], start)}
+        )[symbol]
+
+    def get_histories(self, symbols, download=None):
+        """
+        Return {symbol: full daily history} for every symbol, batching the downloads.
+
+        Symbols are grouped by the date their update has to start from, and each group is
+        fetched with a single `download(symbols, start)` call returning {symbol: bars}
+        (`start` is None for a full backfill).
+        """
+        download = download or download_histories
+        symbols = list(dict.fromkeys(symbols))
+        histories = {}
+        backfill = []
+        groups = {}
+
+        for symbol in symbols:
+            stored = self.load(symbol)
+            if len(stored) < OVERLAP_BARS:
+                backfill.append(symbol)
+            else:
+                histories[symbol] = stored
+                start = stored.index[-OVERLAP_BARS].strftime('%Y-%m-%d')
+                groups.setdefault(start, []).append(symbol)
+
+        for start, group in groups.items():
+            try:
+                fetched = download(group, start)
+            except Exception as e:
+                # Serve the stored bars rather than nothing; the next run catches up
+                print(f"Error updating history since {start} for {', '.join(group)}: {e}")
+                continue
+            for symbol in group:
+                stored = histories[symbol]
+                fresh = normalize_bars(fetched.get(symbol))
+                if fresh.empty:
+                    continue
+                if is_revised(stored, fresh):
+                    print(f"History of {symbol} was re-adjusted upstream. Refetching full history...")
+                    backfill.append(symbol)
+                    continue
+                self.save(symbol, fresh)
+                histories[symbol] = pd.concat([stored[stored.index < fresh.index[0]], fresh])
+                print(f"Updated {symbol} with {len(fresh)} bar(s) since {start}.")
+
+        if backfill:
+            print(f"Backfilling full history for {', '.join(backfill)}...")
+            try:
+                fetched = download(backfill, None)
+            except Exception as e:
+                print(f"Error backfilling history for {', '.join(backfill)}: {e}")
+                fetched = {}
+            for symbol in backfill:
+                df = normalize_bars(fetched.get(symbol))
+                if not df.empty:
+                    self.save(symbol, df, replace=True)
+                    histories[symbol] = df
+                else:
+                    histories.setdefault(symbol, df)
+
+        return {symbol: histories[symbol] for symbol in symbols}
+
+
+def download_history(symbol, start=None):
+    """Fetch daily bars for one symbol from yfinance (full history when start is None)."""
+    ticker = yf.Ticker(symbol)
+    if start is None:
+        return YAHOO.call("history", ticker.history, period="max", key=[symbol, None])
+    return YAHOO.call("history", ticker.history, start=start, key=[symbol, start])
+
+def download_histories(symbols, start=None):
+    """
+    Fetch daily bars for several symbols in batched yfinance requests (DOWNLOAD_CHUNK
+    symbols each, paced by the Yahoo scheduler).
+    Returns {symbol: bars}; symbols Yahoo could not serve map to an empty frame or are
+    missing (a failed chunk only loses its own symbols).
+    """
+    results = {}
+    for i in range(0, len(symbols), DOWNLOAD_CHUNK):
+        chunk = symbols[i:i + DOWNLOAD_CHUNK]
+        try:
+            results.update(_download_chunk(chunk, start))
+        except Exception as e:
+            print(f"Error downloading history for {', '.join(chunk)}: {e}")
+    return results
+
+def _download_chunk(symbols, start):
+    kwargs = {"period": "max"} if start is None else {"start": start}
+    data = YAHOO.call(
+        "history", yf.download, symbols, cost=len(symbols), key=[symbols, start], group_by="ticker", auto_adjust=True,
+        actions=True, threads=True, progress=False, **kwargs
+    )
+    if data is None or data.empty:
+        return {}
+
+    results = {}
+    for symbol in symbols:
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in data.columns.get_level_values(0):
+                continue
+            df = data[symbol]
+        else:
+            df = data
+        # The batch shares one index, so drop the rows where this symbol did not trade
+        results[symbol] = df.dropna(how="all", subset=[c for c in ["Open", "High", "Low", "Close"] if c in df.columns])
+    return results
+
+def normalize_bars(df):
+    """Keep the stored OHLCV columns and index bars by naive session date."""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=list(BAR_COLUMNS.keys()), index=pd.DatetimeIndex([], name="Date"), dtype=float)
+
+    df = df.copy()
+    for col in BAR_COLUMNS:
+        if col not in df.columns:
+            df[col] = 0.0
+    df = df[list(BAR_COLUMNS.keys())].astype(float)
+
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df.index = index.normalize().rename("Date")
+    return df[~df.index.duplicated(keep="last")].sort_index()
+
+def is_revised(stored, fresh):
+    """
+    True if freshly downloaded bars contradict the stored history, i.e. Yahoo
+    re-adjusted past prices (dividend, split) and the store needs a backfill.
+    """
+    # New corporate actions re-adjust every earlier bar
+    new_actions = fresh.loc[fresh.index > stored.index[-1], ["Dividends", "Stock Splits"]]
+    if (new_actions.fillna(0) != 0).any().any():
+        return True
+
+    # The finalized overlap bar must match what we stored
+    overlap = stored.index[stored.index.isin(fresh.index)]
+    if len(overlap) == 0:
+        return True
+    check_date = overlap[0]
+    old_close = stored.loc[check_date, "Close"]
+    new_close = fresh.loc[check_date, "Close"]
+    if pd.isna(old_close) or pd.isna(new_close):
+        return not (pd.isna(old_close) and pd.isna(new_close))
+    return abs(new_close - old_close) > REVISION_TOLERANCE * max(abs(old_close), 1e-12)
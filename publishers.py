@@ -0,0 +1,63 @@
+"""
+Publisher tiers for news curation.
+
+The excluded / preferred / major publisher lists are compiled once into a single
+case-insensitive regex; a publisher belongs to a list if any of its names occurs
+anywhere in the publisher string (the same substring rule as before), and an
+excluded match always wins. Tiers are memoized per publisher string, so a feed
+with thousands of articles from a few dozen publishers runs the regex a few dozen
+times.
+"""
+import re
+import threading
+
+EXCLUDED = "excluded"
+PREFERRED = "preferred"
+MAJOR = "major"
+OTHER = "other"
+
+# Checked in this order when several lists match
+TIERS = [EXCLUDED, PREFERRED, MAJOR]
+
+# Preference when picking one article among copies of the same story (lower is better)
+TIER_RANK = {PREFERRED: 0, MAJOR: 1, OTHER: 2, EXCLUDED: 3}
+
+
+class PublisherClassifier:
+    def __init__(self, excluded, preferred, major):
+        names = {EXCLUDED: excluded, PREFERRED: preferred, MAJOR: major}
+        # Longest names first so the reported match is the most specific one; the
+        # lookahead makes every position a match candidate, so overlapping names are not skipped
+        groups = "|".join(
+            f"(?P<{tier}>{'|'.join(re.escape(n.lower()) for n in sorted(names[tier], key=len, reverse=True))})"
+            for tier in TIERS if names[tier]
+        )
+        self._pattern = re.compile(f"(?=(?:{groups}))") if groups else None
+        self._tiers = {}
+        self._lock = threading.Lock()
+
+    def _classify(self, publisher):
+        if self._pattern is None:
+            return OTHER
+        found = set()
+        for match in self._pattern.finditer(publisher.lower()):
+            if match.lastgroup == EXCLUDED:
+                return EXCLUDED
+            found.add(match.lastgroup)
+        return next((tier for tier in TIERS if tier in found), OTHER)
+
+    def tier(self, publisher):
+        """EXCLUDED, PREFERRED, MAJOR or OTHER for a publisher name (memoized)."""
+        tier = self._tiers.get(publisher)
+        if tier is None:
+            tier = self._classify(publisher)
+            with self._lock:
+                self._tiers[publisher] = tier
+        return tier
+
+    def is_excluded(self, publisher):
+        return self.tier(publisher) == EXCLUDED
+
+    def is_trusted(self, publisher):
+        """Preferred or major publisher."""
+        return self.tier(publisher) in (PREFERRED, MAJOR)
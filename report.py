@@ -0,0 +1,215 @@
+"""
+HTML report templating.
+
+Page and section templates live in templates/ and are parsed once per process
+(string.Template); sections are built as lists of rendered fragments and joined,
+so rendering stays linear in the number of tickers. The CSS and JS in static/
+are published to public/static/ under content-fingerprinted names, so browsers
+can keep them cached across daily reports.
+"""
+import hashlib
+import os
+import re
+from functools import lru_cache
+from string import Template
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = os.path.join(BASE_DIR, "templates")
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+
+# Published as public/static/<name>.<fingerprint>.<ext>
+STATIC_ASSETS = ["report.css", "report.js", "series-chart.js"]
+STATIC_URL = "static"
+
+# One-line fragments, compiled once at import
+FRAGMENTS = {
+    "badge": Template('<div class="badge $kind">$symbol</div>'),
+    "description": Template('<span class="symbol-desc">($long_name)</span>'),
+    "price": Template(
+        '                        <div class="price-item">\n'
+        '                            <span class="price-label">$label</span>\n'
+        '                            <span class="price-value">$price</span>\n'
+        '                            <span class="price-change $change_class">$change</span>\n'
+        '                        </div>'
+    ),
+    "news": Template(
+        '                        <div class="news-item">\n'
+        '                            <a href="$link" target="_blank" class="news-link">$title</a>\n'
+        '                            <span class="news-source">Source: $publisher</span>\n'
+        '                        </div>'
+    ),
+    "news_empty": Template(
+        '                        <div class="news-item">\n'
+        '                            <p class="news-empty">There are no significant news affecting today\'s stock price.</p>\n'
+        '                        </div>'
+    ),
+    "highlight": Template('<div class="highlight-item">✅ $text</div>'),
+    "driver": Template(
+        '<div class="driver-item">'
+        '<a href="$link" target="_blank" class="driver-link">$title</a>'
+        '<span class="driver-source">$source</span>'
+        '</div>'
+    ),
+    "chart_series": Template(
+        '<div class="chart-box" data-series="charts/$series">'
+        '<canvas class="series-canvas" aria-label="$symbol Chart"></canvas>'
+        '</div>'
+    ),
+    "chart_picture": Template(
+        '<div class="chart-box" onclick="openModal(\'charts/$full\', {$full_sources})">'
+        '<picture>$sources<img src="charts/$thumb" $loading decoding="async" width="$width" height="$height" alt="$symbol Chart"></picture>'
+        '</div>'
+    ),
+    "chart_image": Template(
+        '<div class="chart-box" onclick="openModal(\'charts/$image\')">'
+        '<img src="charts/$image" loading="lazy" decoding="async" alt="$symbol Chart">'
+        '</div>'
+    ),
+    "source": Template('<source type="image/$format" srcset="charts/$name">'),
+    "script": Template('    <script src="$src" defer></script>'),
+}
+
+DASHBOARD_SECTIONS = [
+    # (signal, comment, title, badge kind)
+    ("Buy1", "1st Buy", "Bullish Setup (1st Buy)", "buy"),
+    ("Buy2", "2nd Buy", "Oversold & Bullish (2nd Buy)", "buy"),
+    ("Sell1", "1st Sell", "Overbought & Peak (Sell)", "sell"),
+]
+
+
+@lru_cache(maxsize=None)
+def load_template(name):
+    """Parse templates/<name> once per process."""
+    with open(os.path.join(TEMPLATE_DIR, name), "r", encoding="utf-8") as f:
+        return Template(f.read())
+
+def publish_assets(public_dir="public"):
+    """
+    Copy the static assets to public/static/ under fingerprinted names (older
+    fingerprints of the same asset are removed). Returns {asset: relative URL}.
+    """
+    target_dir = os.path.join(public_dir, STATIC_URL)
+    os.makedirs(target_dir, exist_ok=True)
+    published = {}
+    for name in STATIC_ASSETS:
+        with open(os.path.join(STATIC_DIR, name), "rb") as f:
+            content = f.read()
+        stem, ext = os.path.splitext(name)
+        fingerprinted = f"{stem}.{hashlib.sha256(content).hexdigest()[:10]}{ext}"
+        path = os.path.join(target_dir, fingerprinted)
+        if not os.path.exists(path):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        stale = re.compile(re.escape(stem) + r"\.[0-9a-f]{10}" + re.escape(ext))
+        for other in os.listdir(target_dir):
+            if other != fingerprinted and stale.fullmatch(other):
+                os.remove(os.path.join(target_dir, other))
+        published[name] = f"{STATIC_URL}/{fingerprinted}"
+    return published
+
+
+def render_dashboard(results):
+    items = []
+    for signal, comment, title, kind in DASHBOARD_SECTIONS:
+        symbols = [r['Symbol'] for r in results if r['Signals'][signal]]
+        if not symbols:
+            continue
+        badges = "".join(FRAGMENTS["badge"].substitute(kind=kind, symbol=s) for s in symbols)
+        items.append(load_template("dashboard_item.html").substitute(comment=comment, title=title, badges=badges))
+    return "".join(items)
+
+def render_indices(indices):
+    cards = []
+    for idx in indices:
+        c_sign = "+" if idx['change_pct'] >= 0 else ""
+        cards.append(load_template("index_card.html").substitute(
+            name=idx['name'],
+            price=f"{idx['price']:,.2f}",
+            change=f"{c_sign}{idx['change_pct']:.2f}%",
+            change_class="up" if idx['change_pct'] >= 0 else "down",
+        ))
+    return '<div class="indices-grid">\n' + "".join(cards) + '            </div>'
+
+def render_commentary(highlights, market_news):
+    parts = ['<div class="commentary-section">']
+    if highlights:
+        parts.append('<div style="margin-bottom: 15px;">')
+        parts.extend(FRAGMENTS["highlight"].substitute(text=h) for h in highlights)
+        parts.append('</div>')
+    if market_news:
+        parts.append('<div class="summary-header"><span>📰</span> KEY MARKET DRIVERS</div>')
+        parts.extend(FRAGMENTS["driver"].substitute(link=n['link'], title=n['title'], source=n['source']) for n in market_news)
+    else:
+        parts.append('<div class="news-empty">No major headlines found.</div>')
+    parts.append('</div>')
+    return "".join(parts)
+
+def render_chart(res, eager, thumb_size):
+    """Chart markup: series canvas, responsive thumbnail picture, or the plain PNG."""
+    if res.get('ChartMode') == "series":
+        return FRAGMENTS["chart_series"].substitute(series=res['Chart'], symbol=res['Symbol'])
+    if res.get('ChartVariants'):
+        # Lazily loaded thumbnail (AVIF / WebP, PNG fallback); the modal loads the full-size image
+        thumbs, full = res['ChartVariants']['thumb'], res['ChartVariants']['full']
+        sources = "".join(FRAGMENTS["source"].substitute(format=fmt, name=name)
+                          for fmt, name in thumbs.items() if fmt != "png")
+        full_sources = ", ".join(f"{fmt}: 'charts/{name}'" for fmt, name in full.items() if fmt != "png")
+        return FRAGMENTS["chart_picture"].substitute(
+            full=full['png'], full_sources=full_sources, sources=sources, thumb=thumbs['png'],
+            # The first chart is above the fold on phones: load it right away
+            loading='loading="eager" fetchpriority="high"' if eager else 'loading="lazy"',
+            width=thumb_size[0], height=thumb_size[1], symbol=res['Symbol'],
+        )
+    return FRAGMENTS["chart_image"].substitute(image=res['Chart'], symbol=res['Symbol'])
+
+def render_card(res, eager=False, thumb_size=(720, 480)):
+    def price_item(label, price, change):
+        sign = "+" if (change or 0) >= 0 else ""
+        return FRAGMENTS["price"].substitute(
+            label=label, price=price, change=f"{sign}{change}%",
+            change_class="up" if (change or 0) >= 0 else "down",
+        )
+
+    prices = [price_item("At Close", res['Price'], res['Change'])]
+    if res['AfterPrice']:
+        prices.append(price_item("After Hours", res['AfterPrice'], res['AfterChange']))
+
+    if res['News']:
+        news = [FRAGMENTS["news"].substitute(link=n['link'], title=n['title'], publisher=n['publisher']) for n in res['News']]
+    else:
+        news = [FRAGMENTS["news_empty"].substitute()]
+
+    return load_template("card.html").substitute(
+        symbol=res['Symbol'],
+        description=FRAGMENTS["description"].substitute(long_name=res["LongName"]) if res["LongName"] else "",
+        prices="\n".join(prices),
+        chart=render_chart(res, eager, thumb_size),
+        news_label=f"({res['NewsAsset']} Insights)" if res['NewsAsset'] != res['Symbol'] else "Insights",
+        news="\n".join(news),
+    )
+
+def render_report(results, date_str, title_date, market_date_line, indices, highlights, market_news,
+                  thumb_size=(720, 480), public_dir="public"):
+    """Render the full briefing page for the valid (dict) results. Returns the HTML string."""
+    assets = publish_assets(public_dir)
+    cards = [render_card(res, eager=(i == 0), thumb_size=thumb_size) for i, res in enumerate(results)]
+
+    # Client-side chart renderer (only needed for --chart-mode series)
+    scripts = []
+    if any(res.get('ChartMode') == "series" for res in results):
+        scripts.append(FRAGMENTS["script"].substitute(src=assets["series-chart.js"]))
+
+    return load_template("report.html").substitute(
+        title_date=title_date,
+        css_href=assets["report.css"],
+        js_src=assets["report.js"],
+        date_str=date_str,
+        market_date_line=market_date_line,
+        dashboard=render_dashboard(results),
+        indices=render_indices(indices),
+        commentary=render_commentary(highlights, market_news),
+        cards="\n".join(cards),
+        scripts="\n".join(scripts),
+    )
@@ -0,0 +1,61 @@
+"""
+Machine-readable snapshot of a run, published next to the report as public/results.json.
+
+Holds everything the HTML report shows: one entry per ticker (the analyze_ticker_data
+result: prices, after-hours, RSI/EMAs, signals, news, chart files), the tickers that
+failed, and the market overview (summary, indices, highlights, driver news). Chart
+file names are relative to charts/ next to the snapshot.
+
+`version` is bumped whenever a field is renamed or removed; new fields may be added
+without a bump.
+"""
+import json
+import math
+import os
+from datetime import datetime, timezone
+
+RESULTS_VERSION = 1
+RESULTS_PATH = "public/results.json"
+
+
+def json_safe(value):
+    """JSON-safe copy: numpy scalars become Python values, NaN / inf become null."""
+    if isinstance(value, dict):
+        return {str(k): json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(v) for v in value]
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+def build_results(results, market_date, market, generated_at=None):
+    """Snapshot dict for analyze_tickers results (error strings are listed under "errors")."""
+    generated_at = generated_at or datetime.now(timezone.utc)
+    return json_safe({
+        "version": RESULTS_VERSION,
+        "generated_at": generated_at.isoformat(timespec="seconds"),
+        "market_date": market_date,
+        "market": market,
+        "tickers": [r for r in results if isinstance(r, dict)],
+        "errors": [r for r in results if not isinstance(r, dict)],
+    })
+
+def write_results_json(results, market_date, market, path=RESULTS_PATH):
+    """Write the snapshot (compact JSON, written atomically). Returns its path."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(build_results(results, market_date, market), f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    print(f"Results snapshot written: {path}")
+    return path
+
+def read_results_json(path=RESULTS_PATH):
+    """Load a snapshot, rejecting versions this code does not understand."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != RESULTS_VERSION:
+        raise ValueError(f"Unsupported results.json version: {data.get('version')}")
+    return data
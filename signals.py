@@ -0,0 +1,161 @@
+"""
+Declarative trading signal rules.
+
+Each signal is a list of conditions on indicator operands. Rules are compiled
+once into vectorized boolean expressions, so the same definitions evaluate a
+single ticker's whole history (Series), a date x ticker matrix (DataFrame) or
+plain numpy arrays.
+
+Condition syntax: "<left> <op> <right>", where an operand is an indicator role
+(see OPERAND_COLUMNS), a named threshold (see SIGNAL_PARAMS) or a number.
+A condition given as {"term": ..., "if_available": role} only applies where
+that indicator is available (> 0 after NaN filling), e.g. EMA120 for new listings.
+"""
+import operator
+
+import numpy as np
+
+# Strategy thresholds referenced by name in the rules (tunable, e.g. by the backtester)
+SIGNAL_PARAMS = {
+    "rsi_oversold": 30,
+    "rsi_overbought": 70,
+}
+
+# Indicator role -> column name in the analysis DataFrame
+OPERAND_COLUMNS = {
+    "Close": "Close",
+    "RSI": "RSI",
+    "FastEMA": "EMA20",
+    "MidEMA": "EMA60",
+    "SlowEMA": "EMA120",
+}
+
+# Values substituted for missing (NaN) indicators before evaluating the rules
+FILL_VALUES = {
+    "RSI": 50,
+    "FastEMA": 0,
+    "MidEMA": 0,
+    "SlowEMA": 0,
+}
+
+SIGNAL_RULES = [
+    {
+        # 1st Buy: Bearish Alignment (20 < 60 < 120*) AND Close < EMA20
+        "name": "Buy1",
+        "all": [
+            "FastEMA < MidEMA",
+            {"term": "MidEMA < SlowEMA", "if_available": "SlowEMA"},
+            "FastEMA > 0",
+            "Close < FastEMA",
+        ],
+        # Tickers in the 2nd Buy list are removed from the 1st Buy list
+        "superseded_by": ["Buy2"],
+    },
+    {
+        # 2nd Buy: 1st Buy Condition Met AND RSI < 30
+        "name": "Buy2",
+        "extends": "Buy1",
+        "all": ["RSI < rsi_oversold"],
+    },
+    {
+        # 1st Sell: Bullish Alignment (20 > 60 > 120*) AND Close > EMA20 AND RSI > 70
+        "name": "Sell1",
+        "all": [
+            "FastEMA > MidEMA",
+            {"term": "MidEMA > SlowEMA", "if_available": "SlowEMA"},
+            "Close > FastEMA",
+            "RSI > rsi_overbought",
+        ],
+    },
+]
+
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def _fill(values, fill):
+    if fill is None:
+        return values
+    if hasattr(values, "fillna"):
+        return values.fillna(fill)
+    return np.where(np.isnan(values), fill, values)
+
+def _operand(token, params):
+    """Return ("role", name) or ("const", value) for a condition operand."""
+    if token in params:
+        return ("const", float(params[token]))
+    try:
+        return ("const", float(token))
+    except ValueError:
+        pass
+    if token not in OPERAND_COLUMNS:
+        raise ValueError(f"Unknown signal operand: {token}")
+    return ("role", token)
+
+def _compile_term(term, params):
+    if isinstance(term, dict):
+        expr, if_available = term["term"], term.get("if_available")
+    else:
+        expr, if_available = term, None
+    left, op, right = expr.split()
+    if op not in OPERATORS:
+        raise ValueError(f"Unknown signal operator in '{expr}'")
+    return (_operand(left, params), OPERATORS[op], _operand(right, params), if_available)
+
+def compile_rules(rules=SIGNAL_RULES, params=None, columns=OPERAND_COLUMNS):
+    """
+    Compile rule definitions into a function that maps a frame (DataFrame or dict of
+    Series / DataFrames / arrays keyed by column name) to {signal: boolean mask}.
+    """
+    params = {**SIGNAL_PARAMS, **(params or {})}
+    compiled = []
+    defined = set()
+    for rule in rules:
+        parent = rule.get("extends")
+        if parent is not None and parent not in defined:
+            raise ValueError(f"Signal {rule['name']} extends undefined signal {parent}")
+        terms = [_compile_term(term, params) for term in rule["all"]]
+        compiled.append((rule["name"], parent, terms, rule.get("superseded_by", [])))
+        defined.add(rule["name"])
+
+    roles = {role for _, _, terms, _ in compiled for term in terms
+             for kind, role in (term[0], term[2]) if kind == "role"}
+    roles |= {term[3] for _, _, terms, _ in compiled for term in terms if term[3]}
+
+    def evaluate(frame):
+        values = {role: _fill(frame[columns[role]], FILL_VALUES.get(role)) for role in roles}
+
+        def resolve(operand):
+            kind, value = operand
+            return values[value] if kind == "role" else value
+
+        raw = {}
+        for name, parent, terms, _ in compiled:
+            mask = raw[parent] if parent is not None else None
+            for left, op, right, if_available in terms:
+                condition = op(resolve(left), resolve(right))
+                if if_available:
+                    condition = condition | ~(values[if_available] > 0)
+                mask = condition if mask is None else (mask & condition)
+            raw[name] = mask
+
+        signals = {}
+        for name, _, _, superseded_by in compiled:
+            mask = raw[name]
+            for other in superseded_by:
+                mask = mask & ~raw[other]
+            signals[name] = mask
+        return signals
+
+    return evaluate
+
+# Compiled once with the default strategy parameters
+evaluate_signals = compile_rules()
+
+def latest_signals(frame):
+    """Evaluate the rules over a ticker's whole history and return the last bar's signals."""
+    return {name: bool(np.asarray(mask)[-1]) for name, mask in evaluate_signals(frame).items()}
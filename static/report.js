@@ -0,0 +1,20 @@
+/* FinRep daily briefing: chart zoom modal */
+function openModal(src, sources) {
+    // sources: optional {format: url} of better-compressed variants (e.g. avif, webp)
+    const picture = document.getElementById('modalPicture');
+    const img = document.getElementById('modalImg');
+    picture.querySelectorAll('source').forEach((el) => el.remove());
+    Object.entries(sources || {}).forEach(([format, url]) => {
+        const source = document.createElement('source');
+        source.type = 'image/' + format;
+        source.srcset = url;
+        picture.insertBefore(source, img);
+    });
+    document.getElementById('modal').style.display = 'flex';
+    document.getElementById('modalCanvas').style.display = 'none';
+    img.style.display = '';
+    img.src = src;
+}
+function closeModal() {
+    document.getElementById('modal').style.display = 'none';
+}
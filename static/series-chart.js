@@ -0,0 +1,266 @@
+/*
+ * FinRep client-side charts (--chart-mode series).
+ *
+ * Draws the compact per-ticker series files written by chart_series.py on a
+ * <canvas>, with the same colors, EMA value labels and high/low markers as the
+ * server-rendered PNG charts. Series are fetched lazily when a card scrolls
+ * into view; clicking a chart redraws it full-size in the modal.
+ */
+(function () {
+    'use strict';
+
+    const COLORS = {
+        up: '#10b981', down: '#f43f5e',
+        ema20: '#f59e0b', ema60: '#8b5cf6', ema120: '#64748b', rsi: '#313d4a',
+        ema20Label: '#f59e0b', ema60Label: '#8b5cf6', ema120Label: '#475569',
+        high: '#f43f5e', low: '#10b981',
+        grid: '#f1f5f9', edge: '#cbd5e1', text: '#334155'
+    };
+    const EMAS = [['ema20', 'EMA 20'], ['ema60', 'EMA 60'], ['ema120', 'EMA 120']];
+    const RSI_GUIDES = [[70, '#f43f5e'], [30, '#10b981']];
+    const MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'];
+
+    function decode(data) {
+        const out = {};
+        Object.keys(data.series).forEach((name) => {
+            let prev = 0;
+            out[name] = data.series[name].map((d) => {
+                if (d === null) return NaN;
+                prev += d;
+                return prev / data.scale;
+            });
+        });
+        let t = Date.parse(data.start + 'T00:00:00Z');
+        out.dates = data.days.map((d) => { t += d * 86400000; return new Date(t); });
+        return out;
+    }
+
+    function extent(arrays) {
+        let lo = Infinity, hi = -Infinity;
+        arrays.forEach((values) => (values || []).forEach((v) => {
+            if (Number.isFinite(v)) { lo = Math.min(lo, v); hi = Math.max(hi, v); }
+        }));
+        if (lo === hi) { lo -= 1; hi += 1; }
+        const pad = (hi - lo) * 0.05;
+        return [lo - pad, hi + pad];
+    }
+
+    function niceTicks(range, count) {
+        const raw = (range[1] - range[0]) / count;
+        const mag = Math.pow(10, Math.floor(Math.log10(raw)));
+        const step = [1, 2, 2.5, 5, 10].map((m) => m * mag).find((s) => s >= raw);
+        const ticks = [];
+        for (let v = Math.ceil(range[0] / step) * step; v <= range[1]; v += step) ticks.push(+v.toFixed(10));
+        return ticks;
+    }
+
+    function formatDate(date, withYear) {
+        const day = String(date.getUTCDate()).padStart(2, '0');
+        const month = MONTHS[date.getUTCMonth()];
+        return withYear ? `${date.getUTCFullYear()}-${month}-${day}` : `${month} ${day}`;
+    }
+
+    function draw(canvas, s) {
+        const ratio = window.devicePixelRatio || 1;
+        const width = canvas.clientWidth;
+        const height = Math.round(width * 2 / 3);  // same 12:8 figure ratio as the PNG charts
+        canvas.style.height = height + 'px';
+        canvas.width = Math.round(width * ratio);
+        canvas.height = Math.round(height * ratio);
+        const ctx = canvas.getContext('2d');
+        ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+        ctx.fillStyle = 'white';
+        ctx.fillRect(0, 0, width, height);
+
+        const font = Math.max(9, Math.round(width / 90));
+        const left = font * 4, right = font * 5, top = font, bottom = font * 5, gap = font * 0.5;
+        const plotWidth = width - left - right;
+        const innerHeight = height - top - bottom - gap;
+        const pricePanel = { y: top, h: innerHeight * 2 / 3 };
+        const rsiPanel = { y: top + pricePanel.h + gap, h: innerHeight / 3 };
+        const n = s.c.length;
+        const step = plotWidth / (n + 1);  // one bar spacing of padding on each side
+        const X = (i) => left + step * (i + 1);
+        const priceRange = extent([s.l, s.h, s.ema20, s.ema60, s.ema120]);
+        const rsiRange = extent([s.rsi]);
+        const Y = (panel, range, v) => panel.y + panel.h - (v - range[0]) / (range[1] - range[0]) * panel.h;
+        ctx.font = `${font}px sans-serif`;
+        ctx.lineJoin = 'round';
+
+        function frame(panel, range) {
+            ctx.strokeStyle = COLORS.grid;
+            ctx.setLineDash([1, 3]);
+            ctx.lineWidth = 1;
+            ctx.fillStyle = COLORS.text;
+            ctx.textAlign = 'right';
+            ctx.textBaseline = 'middle';
+            niceTicks(range, 5).forEach((v) => {
+                const y = Y(panel, range, v);
+                ctx.beginPath(); ctx.moveTo(left, y); ctx.lineTo(left + plotWidth, y); ctx.stroke();
+                ctx.fillText(String(v), left - font * 0.6, y);
+            });
+            ctx.setLineDash([]);
+            ctx.strokeStyle = COLORS.edge;
+            ctx.strokeRect(left, panel.y, plotWidth, panel.h);
+        }
+
+        function line(values, panel, range, color, width) {
+            if (!values) return;
+            ctx.strokeStyle = color;
+            ctx.lineWidth = width;
+            ctx.beginPath();
+            let drawing = false;
+            values.forEach((v, i) => {
+                if (!Number.isFinite(v)) { drawing = false; return; }
+                const x = X(i), y = Y(panel, range, v);
+                if (drawing) ctx.lineTo(x, y); else ctx.moveTo(x, y);
+                drawing = true;
+            });
+            ctx.stroke();
+        }
+
+        frame(pricePanel, priceRange);
+        frame(rsiPanel, rsiRange);
+
+        // Candles
+        const body = Math.max(1, step * 0.6);
+        ctx.globalAlpha = 0.9;
+        for (let i = 0; i < n; i++) {
+            const o = s.o[i], h = s.h[i], l = s.l[i], c = s.c[i];
+            if (!Number.isFinite(c)) continue;
+            const color = o < c ? COLORS.up : COLORS.down;
+            ctx.strokeStyle = color;
+            ctx.fillStyle = color;
+            ctx.lineWidth = 1;
+            ctx.beginPath();
+            ctx.moveTo(X(i), Y(pricePanel, priceRange, h));
+            ctx.lineTo(X(i), Y(pricePanel, priceRange, l));
+            ctx.stroke();
+            const yTop = Y(pricePanel, priceRange, Math.max(o, c));
+            ctx.fillRect(X(i) - body / 2, yTop, body, Math.max(1, Y(pricePanel, priceRange, Math.min(o, c)) - yTop));
+        }
+        ctx.globalAlpha = 1;
+
+        // EMA lines, legend and current values on the right margin
+        let legendY = pricePanel.y + font;
+        ctx.textAlign = 'left';
+        EMAS.forEach(([name, label]) => {
+            const values = s[name];
+            if (!values) return;
+            line(values, pricePanel, priceRange, COLORS[name], 1.5);
+            ctx.fillStyle = COLORS[name];
+            ctx.fillRect(left + font * 0.6, legendY - 1, font * 1.6, 2);
+            ctx.fillStyle = COLORS.text;
+            ctx.fillText(label, left + font * 2.6, legendY);
+            legendY += font * 1.4;
+            const last = values[n - 1];
+            if (Number.isFinite(last)) {
+                ctx.font = `bold ${font}px sans-serif`;
+                ctx.fillStyle = COLORS[name + 'Label'];
+                ctx.fillText(' ' + last.toFixed(2), X(n - 1) + step * 0.5, Y(pricePanel, priceRange, last));
+                ctx.font = `${font}px sans-serif`;
+            }
+        });
+
+        // High / low markers
+        let hi = 0, lo = 0;
+        for (let i = 1; i < n; i++) {
+            if (s.h[i] > s.h[hi]) hi = i;
+            if (s.l[i] < s.l[lo]) lo = i;
+        }
+        ctx.font = `bold ${font}px sans-serif`;
+        ctx.textAlign = 'center';
+        [[hi, s.h[hi], COLORS.high, -1], [lo, s.l[lo], COLORS.low, 1]].forEach(([i, v, color, dir]) => {
+            const x = X(i), y = Y(pricePanel, priceRange, v);
+            ctx.strokeStyle = color;
+            ctx.fillStyle = color;
+            ctx.lineWidth = 0.75;
+            ctx.beginPath(); ctx.moveTo(x, y); ctx.lineTo(x, y + dir * font * 0.5); ctx.stroke();
+            ctx.textBaseline = dir < 0 ? 'bottom' : 'top';
+            ctx.fillText(v.toFixed(2), x, y + dir * font * 0.6);
+        });
+        ctx.font = `${font}px sans-serif`;
+
+        // RSI with the 70 / 30 guides
+        ctx.globalAlpha = 0.3;
+        ctx.setLineDash([4, 3]);
+        RSI_GUIDES.forEach(([level, color]) => {
+            if (level < rsiRange[0] || level > rsiRange[1]) return;
+            const y = Y(rsiPanel, rsiRange, level);
+            ctx.strokeStyle = color;
+            ctx.beginPath(); ctx.moveTo(left, y); ctx.lineTo(left + plotWidth, y); ctx.stroke();
+        });
+        ctx.setLineDash([]);
+        ctx.globalAlpha = 1;
+        line(s.rsi, rsiPanel, rsiRange, COLORS.rsi, 1.2);
+
+        // Date labels
+        const withYear = s.dates[0].getUTCFullYear() !== s.dates[n - 1].getUTCFullYear();
+        const labels = Math.max(2, Math.min(6, Math.floor(plotWidth / (font * 8))));
+        ctx.fillStyle = COLORS.text;
+        ctx.textAlign = 'right';
+        ctx.textBaseline = 'middle';
+        for (let k = 0; k < labels; k++) {
+            const i = Math.round(k * (n - 1) / (labels - 1));
+            ctx.save();
+            ctx.translate(X(i), rsiPanel.y + rsiPanel.h + font * 0.8);
+            ctx.rotate(-Math.PI / 4);
+            ctx.fillText(formatDate(s.dates[i], withYear), 0, 0);
+            ctx.restore();
+        }
+    }
+
+    function load(box) {
+        if (box.dataset.loading) return;
+        box.dataset.loading = '1';
+        fetch(box.dataset.series)
+            .then((response) => response.json())
+            .then((data) => {
+                box.series = decode(data);
+                draw(box.querySelector('canvas'), box.series);
+            })
+            .catch((error) => console.error('Unable to load chart series', box.dataset.series, error));
+    }
+
+    function openSeriesModal(box) {
+        if (!box.series) return;
+        const modal = document.getElementById('modal');
+        const image = document.getElementById('modalImg');
+        const canvas = document.getElementById('modalCanvas');
+        modal.style.display = 'flex';
+        if (image) image.style.display = 'none';
+        canvas.style.display = 'block';
+        canvas.style.width = Math.min(window.innerWidth - 40, (window.innerHeight - 40) * 1.5, 1400) + 'px';
+        draw(canvas, box.series);
+    }
+
+    function init() {
+        const boxes = Array.from(document.querySelectorAll('.chart-box[data-series]'));
+        if ('IntersectionObserver' in window) {
+            const observer = new IntersectionObserver((entries) => entries.forEach((entry) => {
+                if (entry.isIntersecting) {
+                    observer.unobserve(entry.target);
+                    load(entry.target);
+                }
+            }), { rootMargin: '200px' });
+            boxes.forEach((box) => observer.observe(box));
+        } else {
+            boxes.forEach(load);
+        }
+        boxes.forEach((box) => box.addEventListener('click', () => openSeriesModal(box)));
+
+        let resizeTimer = null;
+        window.addEventListener('resize', () => {
+            clearTimeout(resizeTimer);
+            resizeTimer = setTimeout(() => boxes.forEach((box) => {
+                if (box.series) draw(box.querySelector('canvas'), box.series);
+            }), 150);
+        });
+    }
+
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', init);
+    } else {
+        init();
+    }
+})();
@@ -0,0 +1,19 @@
+import os
+
+# Local cache root shared by every persistent store (price history, metadata, ...).
+# Overridable so CI can point it at a directory restored by actions/cache.
+CACHE_DIR = os.getenv("FINREP_CACHE_DIR", ".cache")
+
+def set_cache_dir(path):
+    """Point every store at another cache root (worker processes inherit it through the environment)."""
+    global CACHE_DIR
+    CACHE_DIR = path
+    os.environ["FINREP_CACHE_DIR"] = path
+
+def cache_path(*parts):
+    """Return a path under the cache root, creating its parent folder if needed."""
+    path = os.path.join(CACHE_DIR, *parts)
+    parent = os.path.dirname(path)
+    if parent and not os.path.exists(parent):
+        os.makedirs(parent, exist_ok=True)
+    return path
@@ -2,12 +2,13 @@ import yfinance as yf
 import pandas as pd
 import pandas_ta as ta
 import os
-from main import generate_chart
+from charts import generate_chart
+from yahoo_scheduler import YAHOO
 
 def test_annotation():
     symbol = "NVDA" # Use a high-volume stock for testing
     ticker = yf.Ticker(symbol)
-    df = ticker.history(period="1y")
+    df = YAHOO.call("history", ticker.history, period="1y", key=[symbol, "1y"])
     
     # Calculate indicators as per main.py logic
     df['RSI'] = ta.rsi(df['Close'], length=14)
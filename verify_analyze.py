@@ -0,0 +1,57 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import main
+
+
+class TestConcurrentAnalyze(unittest.TestCase):
+
+    def setUp(self):
+        # Keep the pipeline to the fetch / analyze split: no news, no charts
+        for name, value in [("prefetch_news", lambda tickers: None),
+                            ("select_news", lambda data, news=None: data),
+                            ("render_chart_stage", lambda jobs, workers=None, chart_mode="png": [])]:
+            patcher = patch.object(main, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_analysis(self, tickers, workers, failing=()):
+        threads = set()
+
+        def fetch(ticker, history=None):
+            threads.add(threading.get_ident())
+            # Later tickers finish first, so completion order differs from input order
+            time.sleep(0.01 * (len(tickers) - tickers.index(ticker)))
+            if ticker in failing:
+                raise RuntimeError("Yahoo is down")
+            return {"Symbol": ticker}
+
+        def analyze(data, chart_jobs, chart_mode="png"):
+            return {"Symbol": data["Symbol"], "Price": 1.0}
+
+        with patch.object(main, "fetch_ticker_data", fetch), patch.object(main, "analyze_ticker_data", analyze):
+            return main.analyze_tickers(tickers, workers=workers), threads
+
+    def test_results_keep_input_order(self):
+        tickers = ["AAA", "BBB", "CCC", "DDD", "EEE", "FFF"]
+        results, threads = self.run_analysis(tickers, workers=4)
+        self.assertGreater(len(threads), 1)
+        self.assertEqual([r["Symbol"] for r in results], tickers)
+
+    def test_failing_ticker_only_affects_its_own_result(self):
+        tickers = ["AAA", "BBB", "CCC", "DDD"]
+        results, _ = self.run_analysis(tickers, workers=4, failing={"BBB"})
+        self.assertEqual(len(results), 4)
+        self.assertIsInstance(results[1], str)
+        self.assertIn("BBB", results[1])
+        self.assertEqual([r["Symbol"] for i, r in enumerate(results) if i != 1], ["AAA", "CCC", "DDD"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import backtest
+
+
+def make_closes(n, columns, seed=5):
+    rng = np.random.default_rng(seed)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, (n, columns)), axis=0))
+    return pd.DataFrame(values, index=pd.bdate_range("2015-01-01", periods=n),
+                        columns=[f"T{i}" for i in range(columns)])
+
+
+class TestBacktest(unittest.TestCase):
+
+    def test_trade_returns_from_signals(self):
+        index = pd.bdate_range("2024-01-01", periods=7)
+        closes = pd.DataFrame({"A": [100., 90., 99., 110., 100., 80., 88.]}, index=index)
+        flags = lambda *bars: pd.DataFrame({"A": [i in bars for i in range(7)]}, index=index)
+        # Buy at 90 (bar 1), sell at 110 (bar 3); buy again at 80 (bar 5), still open at 88
+        signals = {"Buy1": flags(1), "Buy2": flags(2, 5), "Sell1": flags(3)}
+
+        positions = backtest.positions_from_signals(signals)
+        self.assertEqual(list(positions["A"]), [0, 1, 1, 0, 0, 1, 1])
+
+        stats = backtest.trade_statistics(closes, positions).loc["A"]
+        self.assertEqual(stats["trades"], 2)
+        self.assertAlmostEqual(stats["total_return"], (110 / 90) * (88 / 80) - 1)
+        self.assertAlmostEqual(stats["avg_trade"], ((110 / 90 - 1) + (88 / 80 - 1)) / 2)
+        self.assertEqual(stats["win_rate"], 1.0)
+        self.assertAlmostEqual(stats["max_drawdown"], 0.0)
+
+    def test_sweep_parallel_matches_serial(self):
+        closes = make_closes(600, 4)
+        closes.iloc[:300, 1] = np.nan  # later listing
+        grid = {"fast": [10, 20], "mid": [60], "slow": [120], "rsi_oversold": [30, 45], "rsi_overbought": [55, 70]}
+        serial = backtest.sweep(closes, grid, workers=1)
+        parallel = backtest.sweep(closes, grid, workers=2)
+        self.assertEqual(len(serial), 8)
+        pd.testing.assert_frame_equal(serial, parallel)
+        self.assertGreater(serial["avg_return"].nunique(), 1, "Parameters should change the results")
+
+
+if __name__ == '__main__':
+    unittest.main()
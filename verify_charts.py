@@ -0,0 +1,138 @@
+import unittest
+import os
+import sys
+import tempfile
+import types
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import charts
+import chart_series
+
+# verify_news.py replaces matplotlib/mplfinance with MagicMocks when run in the same session
+HAS_MPLFINANCE = isinstance(charts.mpf, types.ModuleType)
+
+
+def make_bars(n, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    df = pd.DataFrame({
+        "Open": close * 0.99, "High": close * 1.02, "Low": close * 0.97, "Close": close,
+        "Volume": rng.integers(1000, 5000, n),
+    }, index=pd.bdate_range("2024-01-01", periods=n))
+    df["EMA20"] = df["Close"].ewm(span=20, adjust=False).mean()
+    df["RSI"] = 50.0
+    return df
+
+
+@unittest.skipUnless(HAS_MPLFINANCE, "mplfinance is not available")
+class TestRenderCharts(unittest.TestCase):
+
+    def setUp(self):
+        if not isinstance(sys.modules.get("matplotlib"), types.ModuleType):
+            self.skipTest("matplotlib is mocked in this session")
+        # CHART_DIR is relative to the working directory, which worker processes inherit
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(os.chdir, self.cwd)
+
+    def test_pool_renders_each_job_and_reports_status(self):
+        jobs = [
+            charts.chart_job("AAA", make_bars(200), "AAA_chart.png"),
+            charts.chart_job("BAD", make_bars(200).iloc[0:0], "BAD_chart.png"),  # no bars
+            charts.chart_job("BBB", make_bars(150, seed=4), "BBB_chart.png"),
+        ]
+        self.assertEqual(len(jobs[0][1]), charts.CHART_BARS)
+        self.assertNotIn("Volume", jobs[0][1].columns)
+
+        statuses = charts.render_charts(jobs, workers=2)
+        self.assertEqual([s["Symbol"] for s in statuses], ["AAA", "BAD", "BBB"])
+        self.assertEqual([s["Status"] for s in statuses], ["ok", "error", "ok"])
+        for status in (statuses[0], statuses[2]):
+            self.assertTrue(os.path.getsize(status["Path"]) > 0)
+        self.assertTrue(statuses[1]["Error"])
+        self.assertIsNone(statuses[1]["Variants"])
+
+    def test_thumbnail_and_full_size_variants(self):
+        status = charts.render_charts([charts.chart_job("AAA", make_bars(200), "AAA_chart.png")], workers=1)[0]
+        variants = status["Variants"]
+        self.assertEqual(variants["full"]["png"], "AAA_chart.png")
+        self.assertEqual(list(variants["thumb"])[-1], "png")  # PNG is always the fallback
+        for size in ("full", "thumb"):
+            for name in variants[size].values():
+                self.assertTrue(os.path.getsize(os.path.join(charts.CHART_DIR, name)) > 0, name)
+        with Image.open(os.path.join(charts.CHART_DIR, variants["thumb"]["png"])) as thumb:
+            self.assertEqual(thumb.width, charts.CHART_VARIANTS["thumb_width"])
+
+    def test_template_reuse_leaves_no_state_behind(self):
+        a, b = make_bars(200, seed=1), make_bars(200, seed=2)
+        b["EMA20"] = np.nan  # lines without data are hidden, then shown again for the next symbol
+        paths = []
+        for name, df in [("A1", a), ("B", b), ("A2", a)]:
+            charts.generate_chart(name, df, f"{name}.png", use_cache=False)
+            paths.append(os.path.join(charts.CHART_DIR, f"{name}.png"))
+        images = []
+        for path in paths:
+            with open(path, "rb") as f:
+                images.append(f.read())
+        self.assertEqual(images[0], images[2])
+        self.assertNotEqual(images[0], images[1])
+        self.assertEqual(list(charts._TEMPLATES), [charts.CHART_BARS])
+
+    def test_unchanged_inputs_reuse_cached_image(self):
+        job = charts.chart_job("AAA", make_bars(200), "AAA_chart.png")
+        first = charts.render_charts([job], workers=1)[0]
+        self.assertEqual((first["Status"], first["Cached"]), ("ok", False))
+        with open(first["Path"], "rb") as f:
+            image = f.read()
+
+        for name in charts._variant_files("AAA_chart.png"):
+            os.remove(os.path.join(charts.CHART_DIR, name))
+        again = charts.render_charts([job], workers=1)[0]
+        self.assertEqual((again["Status"], again["Cached"]), ("ok", True))
+        with open(again["Path"], "rb") as f:
+            self.assertEqual(f.read(), image)
+        for name in charts._variant_files("AAA_chart.png"):
+            self.assertTrue(os.path.exists(os.path.join(charts.CHART_DIR, name)), name)
+
+        # A new bar or a style change is a different chart
+        changed = charts.chart_job("AAA", make_bars(201), "AAA_chart.png")
+        self.assertFalse(charts.render_charts([changed], workers=1)[0]["Cached"])
+        with patch.dict(charts.CHART_STYLE, {"dpi": 80}):
+            self.assertFalse(charts.render_charts([job], workers=1)[0]["Cached"])
+
+
+class TestChartSeries(unittest.TestCase):
+
+    def test_series_round_trip(self):
+        df = make_bars(200)
+        df["EMA60"] = np.nan           # not available -> omitted
+        df.iloc[-5, df.columns.get_loc("RSI")] = np.nan
+        encoded = chart_series.encode_series("AAA", df)
+
+        self.assertEqual(encoded["scale"], 100)
+        self.assertNotIn("ema60", encoded["series"])
+        self.assertEqual(len(encoded["days"]), chart_series.CHART_BARS)
+        self.assertEqual(encoded["start"], df.index[-chart_series.CHART_BARS].strftime('%Y-%m-%d'))
+        for name, column in [("c", "Close"), ("ema20", "EMA20"), ("rsi", "RSI")]:
+            decoded = chart_series.delta_decode(encoded["series"][name], encoded["scale"])
+            expected = df[column].tail(chart_series.CHART_BARS).to_numpy()
+            self.assertTrue(np.allclose(decoded, expected, atol=0.005, equal_nan=True), name)
+
+    def test_sub_dollar_prices_keep_precision(self):
+        df = make_bars(50) / 1000
+        encoded = chart_series.encode_series("PENNY", df)
+        self.assertEqual(encoded["scale"], 10000)
+        decoded = chart_series.delta_decode(encoded["series"]["c"], encoded["scale"])
+        self.assertTrue(np.allclose(decoded, df["Close"], atol=0.00005))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import main
+from checkpoints import RunCheckpoint
+
+
+class TestRunCheckpoint(unittest.TestCase):
+
+    def test_round_trip_and_input_change(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cp = RunCheckpoint("2026-10-16", root=tmp)
+            self.assertIsNone(cp.load("market", {"tickers": ["AAA"]}))
+            self.assertFalse(cp.done("market"))
+
+            cp.save("market", {"summary": "s", "price": np.float64(1.5)}, {"tickers": ["AAA"]})
+            self.assertTrue(cp.done("market"))
+            self.assertEqual(cp.load("market", {"tickers": ["AAA"]}), {"summary": "s", "price": 1.5})
+            # Different inputs: the saved output is stale
+            self.assertIsNone(cp.load("market", {"tickers": ["AAA", "BBB"]}))
+
+            # Another run of the same market date sees it; --fresh ignores it but still knows it ran
+            self.assertIsNotNone(RunCheckpoint("2026-10-16", root=tmp).load("market", {"tickers": ["AAA"]}))
+            fresh = RunCheckpoint("2026-10-16", root=tmp, enabled=False)
+            self.assertIsNone(fresh.load("market", {"tickers": ["AAA"]}))
+            self.assertTrue(fresh.done("market"))
+            self.assertIsNone(RunCheckpoint("2026-10-15", root=tmp).load("market", {"tickers": ["AAA"]}))
+
+    def test_prune_keeps_newest_dates(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for day in ["2026-10-13", "2026-10-14", "2026-10-15", "2026-10-16"]:
+                RunCheckpoint(day, root=tmp).save("notify", {"url": "u"})
+            RunCheckpoint("2026-10-16", root=tmp).prune(keep=2)
+            self.assertEqual(sorted(os.listdir(tmp)), ["2026-10-15", "2026-10-16"])
+
+
+class TestAnalyzeWithCheckpoint(unittest.TestCase):
+
+    def run_pipeline(self, checkpoint, closes, missing_charts=()):
+        """One run over AAA / BBB whose last bar closes at `closes`; returns (results, analyzed, news passed in)."""
+        histories = {t: pd.DataFrame({"Close": [10.0, close]}, index=pd.to_datetime(["2026-10-15", "2026-10-16"]))
+                     for t, close in closes.items()}
+        calls = []
+
+        def analyze(tickers, price_histories, news=None, **kwargs):
+            calls.append((list(tickers), dict(news)))
+            return [{"Symbol": t, "Price": float(price_histories[t]["Close"].iloc[-1]), "Chart": f"{t}.png",
+                     "News": [{"title": f"{t} news", "link": f"https://x/{t}"}], "NewsAsset": t} for t in tickers]
+
+        with patch.object(main, "fetch_price_histories", lambda tickers: histories), \
+                patch.object(main, "analyze_tickers", analyze), \
+                patch.object(main, "NEWS_HISTORY", MagicMock()), \
+                patch.object(main, "chart_files_exist", lambda res: res["Symbol"] not in missing_charts):
+            results, _ = main.analyze_with_checkpoint(checkpoint, ["AAA", "BBB"])
+        return results, calls
+
+    def test_analysis_is_redone_when_the_bars_change(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = RunCheckpoint("2026-10-16", root=tmp)
+            self.run_pipeline(checkpoint, {"AAA": 11.0, "BBB": 20.0})
+
+            # Same bars: nothing is analyzed again
+            results, calls = self.run_pipeline(checkpoint, {"AAA": 11.0, "BBB": 20.0})
+            self.assertEqual(calls, [])
+            self.assertEqual([r["Price"] for r in results], [11.0, 20.0])
+
+            # After the close AAA's last bar changed: only AAA is redone, with its saved news
+            results, calls = self.run_pipeline(checkpoint, {"AAA": 11.5, "BBB": 20.0})
+            self.assertEqual([c[0] for c in calls], [["AAA"]])
+            self.assertEqual(calls[0][1], {"AAA": ([{"title": "AAA news", "link": "https://x/AAA"}], "AAA")})
+            self.assertEqual([r["Price"] for r in results], [11.5, 20.0])
+
+            # A missing chart redoes the ticker without fetching its news again
+            _, calls = self.run_pipeline(checkpoint, {"AAA": 11.5, "BBB": 20.0}, missing_charts={"BBB"})
+            self.assertEqual([c[0] for c in calls], [["BBB"]])
+            self.assertIn("BBB", calls[0][1])
+
+    def test_market_inputs_follow_index_data(self):
+        bars = lambda close: pd.DataFrame({"Close": [close]}, index=pd.to_datetime(["2026-10-16"]))
+        results = [{"Symbol": "AAA"}, "❌ BBB: Unable to fetch data."]
+        intraday = main.market_inputs(results, {"AAA": bars(1.0), "^GSPC": bars(6000.0)})
+        self.assertEqual(intraday, main.market_inputs(results, {"AAA": bars(1.0), "^GSPC": bars(6000.0)}))
+        self.assertNotEqual(intraday, main.market_inputs(results, {"AAA": bars(1.0), "^GSPC": bars(6010.0)}))
+        self.assertEqual(list(intraday["tickers"]), ["AAA"])
+
+
+if __name__ == '__main__':
+    unittest.main()
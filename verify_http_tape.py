@@ -0,0 +1,73 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from http_tape import RECORD, REPLAY, HttpTape, ReplayMissError
+from yahoo_scheduler import RequestScheduler
+
+
+class TestHttpTape(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = os.path.join(self.tmp.name, "rec")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_record_then_replay_without_network(self):
+        bars = pd.DataFrame({"Close": [1.0, 2.0]}, index=pd.to_datetime(["2026-10-15", "2026-10-16"]))
+        calls = []
+
+        def history(symbol, start=None):
+            calls.append(symbol)
+            if symbol == "BAD":
+                raise KeyError("no data")
+            return bars
+
+        tape = HttpTape()
+        tape.start(RECORD, self.dir)
+        tape.meta["now_ny"] = "2026-10-16T18:00:00-04:00"
+        yahoo = RequestScheduler(rate=1000.0, tape=tape)
+        self.assertIs(yahoo.call("history", history, "AAA", start="2026-10-15", key=["AAA", "2026-10-15"]), bars)
+        with self.assertRaises(KeyError):
+            yahoo.call("history", history, "BAD", key=["BAD", None])
+        tape.save()
+
+        replay = HttpTape()
+        replay.start(REPLAY, self.dir)
+        self.assertEqual(replay.meta["now_ny"], "2026-10-16T18:00:00-04:00")
+        yahoo = RequestScheduler(rate=1000.0, tape=replay)
+        offline = lambda *a, **k: self.fail("replay must not call Yahoo")
+        pd.testing.assert_frame_equal(yahoo.call("history", offline, "AAA", key=["AAA", "2026-10-15"]), bars)
+        with self.assertRaises(KeyError):
+            yahoo.call("history", offline, "BAD", key=["BAD", None])
+        with self.assertRaises(ReplayMissError):
+            yahoo.call("history", offline, "AAA", key=["AAA", "2026-10-16"])
+        self.assertEqual(calls, ["AAA", "BAD"])
+        self.assertEqual(replay.counts, {"recorded": 0, "replayed": 2, "missed": 1})
+
+    def test_cache_snapshot_skips_saved_stages(self):
+        cache = os.path.join(self.tmp.name, "cache")
+        os.makedirs(os.path.join(cache, "runs", "2026-10-16"))
+        with open(os.path.join(cache, "info_cache.json"), "w") as f:
+            f.write("{}")
+
+        tape = HttpTape()
+        tape.start(RECORD, self.dir)
+        tape.snapshot_cache(cache)
+        restored = tape.restore_cache()
+        try:
+            self.assertEqual(os.listdir(restored), ["info_cache.json"])
+        finally:
+            shutil.rmtree(restored)
+
+
+if __name__ == '__main__':
+    unittest.main()
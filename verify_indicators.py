@@ -0,0 +1,98 @@
+import unittest
+import os
+import sys
+import tempfile
+import types
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import indicators
+
+try:
+    import pandas_ta
+    # verify_news.py replaces pandas_ta with a MagicMock when run in the same session
+    HAS_PANDAS_TA = isinstance(pandas_ta, types.ModuleType)
+except ImportError:
+    HAS_PANDAS_TA = False
+
+
+def make_closes(n, seed=7):
+    rng = np.random.default_rng(seed)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))
+    return pd.Series(values, index=pd.bdate_range("2020-01-01", periods=n), name="Close")
+
+
+def same_values(a, b):
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    return a.shape == b.shape and bool(np.all((a == b) | (np.isnan(a) & np.isnan(b))))
+
+
+class TestEwmRecurrence(unittest.TestCase):
+
+    def test_step_matches_pandas_ewm(self):
+        closes = make_closes(500)
+        closes.iloc[200] = np.nan  # gaps must decay the weights exactly like pandas
+        for kwargs, alpha in [({"span": 20}, indicators.ewm_alpha(span=20)),
+                              ({"alpha": 1 / 14}, indicators.ewm_alpha(alpha=1 / 14))]:
+            expected = closes.ewm(adjust=False, **kwargs).mean()
+            state = [indicators.NAN, 1.]
+            got = [indicators.ewm_step(state, float(v), alpha) for v in closes]
+            self.assertTrue(same_values(expected, got), f"ewm mismatch for {kwargs}")
+
+
+@unittest.skipUnless(HAS_PANDAS_TA, "pandas_ta is not installed")
+class TestIndicatorParity(unittest.TestCase):
+
+    def setUp(self):
+        # Make sure indicators.compute_full gets the real pandas_ta, not another test's mock
+        patcher = patch.dict(sys.modules, {"pandas_ta": pandas_ta})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_incremental_matches_pandas_ta(self):
+        closes = make_closes(800)
+        for cut in (121, 400, 795, 799):
+            self.assertEqual(indicators.parity_check(closes, cut), [], f"Mismatch when resuming at bar {cut}")
+
+    def test_engine_resumes_and_detects_revisions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = indicators.IndicatorEngine(os.path.join(tmp, "state.json"))
+            closes = make_closes(600)
+
+            engine.apply("TEST", closes.iloc[:590].to_frame())
+            df = engine.apply("TEST", closes.to_frame())
+            full, _ = indicators.compute_full(closes)
+            for name, series in full.items():
+                self.assertTrue(same_values(df[name].iloc[-indicators.KEEP_BARS:], series.iloc[-indicators.KEEP_BARS:]))
+            self.assertTrue(df['EMA20'].iloc[:-indicators.KEEP_BARS].isna().all(), "Incremental run should only fill the tail")
+
+            # Re-adjusted history (e.g. a dividend) forces a full recomputation
+            revised = closes * 0.99
+            df = engine.apply("TEST", revised.to_frame())
+            full, _ = indicators.compute_full(revised)
+            for name, series in full.items():
+                self.assertTrue(same_values(df[name], series))
+
+    def test_matrix_matches_per_ticker(self):
+        full = make_closes(400, seed=1)
+        series = {
+            "FULL": full,
+            "NEW": make_closes(90, seed=2).set_axis(full.index[-90:]),    # too short for EMA120
+            "TINY": make_closes(10, seed=3).set_axis(full.index[-10:]),   # too short for anything
+            "GAPPY": make_closes(400, seed=4).drop(full.index[150]),     # missing bar
+        }
+        closes = pd.DataFrame(series)
+        matrix = indicators.compute_matrix(closes)
+        for name, close in series.items():
+            expected_columns, _ = indicators.compute_full(close)
+            for column, expected in expected_columns.items():
+                got = matrix[column][name].reindex(close.index)
+                expected = expected if expected is not None else pd.Series(np.nan, index=close.index)
+                self.assertTrue(same_values(got, expected), f"{column} mismatch for {name}")
+
+if __name__ == '__main__':
+    unittest.main()
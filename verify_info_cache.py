@@ -0,0 +1,108 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+import tempfile
+from datetime import date
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import main
+from info_cache import QUOTE_TTL, STATIC_TTL, InfoCache
+
+
+class TestInfoCache(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "info_cache.json")
+        self.now = 1_000_000.0
+        self.fetched = []
+        self.info = {"longName": "Alpha Inc.", "shortName": "Alpha", "fiftyTwoWeekHigh": 10.0}
+
+    def cache(self, fail=False):
+        """A new cache on the same file, like the next run."""
+        def fetch(symbol):
+            self.fetched.append(symbol)
+            if fail:
+                raise ConnectionError("Yahoo is down")
+            return dict(self.info)
+        return InfoCache(path=self.path, fetch=fetch, clock=lambda: self.now)
+
+    def test_names_persist_for_weeks_and_quotes_for_minutes(self):
+        self.assertEqual(self.cache().get("AAA", ["longName", "shortName"]), {"longName": "Alpha Inc.", "shortName": "Alpha"})
+        self.assertEqual(self.cache().get("AAA", ["fiftyTwoWeekHigh"]), {"fiftyTwoWeekHigh": 10.0})
+        self.assertEqual(self.fetched, ["AAA", "AAA"])
+
+        # A day later: names still come from disk, the quote field has expired
+        self.now += 24 * 3600
+        self.info["longName"] = "Renamed Inc."
+        self.info["fiftyTwoWeekHigh"] = 12.0
+        self.assertEqual(self.cache().get("AAA", ["longName", "shortName"]), {"longName": "Alpha Inc.", "shortName": "Alpha"})
+        self.assertEqual(len(self.fetched), 2)
+        self.assertEqual(self.cache().get("AAA", ["fiftyTwoWeekHigh"]), {"fiftyTwoWeekHigh": 12.0})
+        self.assertEqual(len(self.fetched), 3)
+
+        self.now += QUOTE_TTL - 1
+        self.assertEqual(self.cache().get("AAA", ["fiftyTwoWeekHigh"]), {"fiftyTwoWeekHigh": 12.0})
+        self.assertEqual(len(self.fetched), 3)
+
+        self.now += STATIC_TTL
+        self.assertEqual(self.cache().get("AAA", ["longName"]), {"longName": "Renamed Inc."})
+        self.assertEqual(len(self.fetched), 4)
+
+    def test_info_is_fetched_once_per_symbol_per_run(self):
+        cache = self.cache()
+        cache.get("AAA", ["longName"])
+        cache.get("AAA", ["fiftyTwoWeekHigh"])
+        self.now += QUOTE_TTL + 1
+        cache.get("AAA", ["fiftyTwoWeekHigh"])
+        cache.get("BBB", ["longName"])
+        self.assertEqual(self.fetched, ["AAA", "BBB"])
+
+    def test_failed_fetch_serves_stale_names_but_not_quotes(self):
+        self.cache().get("AAA", ["longName", "fiftyTwoWeekHigh"])
+        self.now += STATIC_TTL + 1
+        values = self.cache(fail=True).get("AAA", ["longName", "fiftyTwoWeekHigh"])
+        self.assertEqual(values, {"longName": "Alpha Inc.", "fiftyTwoWeekHigh": None})
+
+
+class TestTickerInfoUsage(unittest.TestCase):
+
+    def test_daily_runs_read_names_from_disk_and_after_hours_from_the_chart(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        fetched = []
+        history = pd.DataFrame({"Close": [10.0, 11.0]}, index=pd.to_datetime(["2026-10-15", "2026-10-16"]))
+
+        def run():
+            cache = InfoCache(path=os.path.join(tmp.name, "info.json"),
+                              fetch=lambda symbol: fetched.append(symbol) or {"longName": "Alpha Inc."})
+            with patch.object(main, "INFO_CACHE", cache), \
+                    patch.object(main, "fetch_news", return_value=([], "AAA")), \
+                    patch.object(main, "fetch_after_hours_price", return_value=11.5) as after:
+                data = main.fetch_ticker_data("AAA", history)
+            after.assert_called_once_with("AAA", date(2026, 10, 16))
+            return data
+
+        for _ in range(3):
+            data = run()
+        self.assertEqual((data["LongName"], data["AfterPrice"]), ("Alpha Inc.", 11.5))
+        self.assertEqual(fetched, ["AAA"])
+
+    def test_after_hours_price_is_the_last_bar_after_the_close(self):
+        index = pd.DatetimeIndex(["2026-10-16 15:55", "2026-10-16 16:00", "2026-10-16 19:55", "2026-10-19 04:00"],
+                                 tz="America/New_York")
+        bars = pd.DataFrame({"Close": [10.0, 10.2, 10.4, 10.9]}, index=index)
+        with patch.object(main.yf, "Ticker") as ticker:
+            ticker.return_value.history = MagicMock(return_value=bars)
+            self.assertEqual(main.fetch_after_hours_price("AAA", date(2026, 10, 16)), 10.4)
+            ticker.return_value.history = MagicMock(return_value=bars.iloc[:1])
+            self.assertIsNone(main.fetch_after_hours_price("AAA", date(2026, 10, 16)))
+
+
+if __name__ == '__main__':
+    unittest.main()
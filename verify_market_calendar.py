@@ -0,0 +1,57 @@
+import unittest
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import market_calendar
+
+
+class TestMarketCalendar(unittest.TestCase):
+
+    def test_published_holidays(self):
+        # NYSE holiday schedules for 2022 and 2024-2026
+        expected = {
+            2022: ["2022-01-17", "2022-02-21", "2022-04-15", "2022-05-30", "2022-06-20",
+                   "2022-07-04", "2022-09-05", "2022-11-24", "2022-12-26"],
+            2024: ["2024-01-01", "2024-01-15", "2024-02-19", "2024-03-29", "2024-05-27", "2024-06-19",
+                   "2024-07-04", "2024-09-02", "2024-11-28", "2024-12-25"],
+            2025: ["2025-01-01", "2025-01-09", "2025-01-20", "2025-02-17", "2025-04-18", "2025-05-26",
+                   "2025-06-19", "2025-07-04", "2025-09-01", "2025-11-27", "2025-12-25"],
+            2026: ["2026-01-01", "2026-01-19", "2026-02-16", "2026-04-03", "2026-05-25", "2026-06-19",
+                   "2026-07-03", "2026-09-07", "2026-11-26", "2026-12-25"],
+        }
+        for year, days in expected.items():
+            self.assertEqual(sorted(d.isoformat() for d in market_calendar.holidays(year)), days, year)
+
+    def test_early_closes(self):
+        self.assertEqual(sorted(market_calendar.early_closes(2024)), [date(2024, 7, 3), date(2024, 11, 29), date(2024, 12, 24)])
+        self.assertEqual(sorted(market_calendar.early_closes(2026)), [date(2026, 11, 27), date(2026, 12, 24)])
+        self.assertEqual(sorted(market_calendar.early_closes(2022)), [date(2022, 11, 25)])
+        self.assertEqual(market_calendar.session_close("2025-07-03"), market_calendar.EARLY_CLOSE)
+        self.assertEqual(market_calendar.session_close("2025-07-07"), market_calendar.REGULAR_CLOSE)
+        self.assertIsNone(market_calendar.session_close("2025-07-04"))
+
+    def test_sessions(self):
+        self.assertTrue(market_calendar.is_session("2026-10-16"))
+        self.assertFalse(market_calendar.is_session("2026-10-17"))  # Saturday
+        self.assertTrue(market_calendar.is_session("2021-12-31"))  # A Saturday New Year's Day is not observed
+        self.assertEqual(market_calendar.last_session("2026-10-18"), date(2026, 10, 16))
+        self.assertEqual(market_calendar.last_session("2026-04-05"), date(2026, 4, 2))  # Good Friday weekend
+        self.assertEqual(market_calendar.next_session("2025-12-24"), date(2025, 12, 26))
+        self.assertEqual(market_calendar.previous_session("2025-01-10"), date(2025, 1, 8))
+        self.assertEqual(len(market_calendar.sessions("2024-01-01", "2024-12-31")), 252)
+        self.assertEqual(market_calendar.holiday_name("2026-11-26"), "Thanksgiving Day")
+
+    def test_lookup_is_fast(self):
+        market_calendar.is_session("2026-10-16")
+        start = time.perf_counter()
+        for _ in range(10000):
+            market_calendar.is_session(date(2026, 10, 16))
+        self.assertLess((time.perf_counter() - start) / 10000, 1e-4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from market_snapshot import MarketSnapshot
+from news_cache import NewsCache
+
+
+def make_history(days, last_close, high):
+    index = pd.bdate_range(end="2026-10-16", periods=days)
+    closes = np.linspace(last_close - 10, last_close, days)
+    df = pd.DataFrame({"Close": closes, "High": closes + 1}, index=index)
+    df.iloc[len(df) // 2, df.columns.get_loc("High")] = high
+    return df
+
+
+class TestMarketSnapshot(unittest.TestCase):
+
+    def test_quotes_use_stored_history_and_shared_caches(self):
+        indices = [
+            {"name": "S&P 500", "symbol": "^GSPC"},
+            {"name": "New ETF", "symbol": "NEW"},
+            {"name": "VIX", "symbol": "^VIX", "highlight": False},
+        ]
+        histories = {"^GSPC": make_history(300, 6000.0, 6010.0), "NEW": make_history(20, 50.0, 55.0),
+                     "^VIX": make_history(300, 20.0, 80.0)}
+        info_cache = MagicMock()
+        info_cache.get.return_value = {"fiftyTwoWeekHigh": 56.0}
+        news_calls = []
+        news_cache = NewsCache(fetch=lambda symbol: news_calls.append(symbol) or [{"title": symbol}])
+
+        with patch("market_snapshot.yf.Ticker") as ticker:
+            snapshot = MarketSnapshot(indices, histories, info_cache=info_cache, news_cache=news_cache, workers=3)
+            quotes = snapshot.quotes()
+            self.assertIs(snapshot.quotes(), quotes)
+        ticker.assert_not_called()
+
+        spx, new, vix = quotes
+        closes = histories["^GSPC"]["Close"]
+        self.assertEqual((spx["price"], spx["previous_close"]), (closes.iloc[-1], closes.iloc[-2]))
+        self.assertAlmostEqual(spx["change_pct"], (closes.iloc[-1] / closes.iloc[-2] - 1) * 100)
+        self.assertEqual(spx["year_high"], 6010.0)
+        # Less than a year of bars is the whole life of the symbol: no info call either
+        self.assertEqual(new["year_high"], 55.0)
+        info_cache.get.assert_not_called()
+        self.assertIsNone(vix["year_high"])
+        self.assertEqual([q["news"] for q in quotes], [[{"title": s}] for s in ["^GSPC", "NEW", "^VIX"]])
+        self.assertEqual(sorted(news_calls), ["NEW", "^GSPC", "^VIX"])
+
+    def test_index_without_history_falls_back_to_yfinance(self):
+        with patch("market_snapshot.yf.Ticker") as ticker:
+            ticker.return_value.fast_info = {"last_price": 110.0, "previous_close": 100.0}
+            info_cache = MagicMock()
+            info_cache.get.return_value = {"fiftyTwoWeekHigh": 120.0}
+            quote = MarketSnapshot([{"name": "Dow Jones", "symbol": "^DJI"}], info_cache=info_cache, workers=1).quotes()[0]
+        self.assertEqual((quote["price"], quote["change_pct"], quote["error"]), (110.0, 10.0, False))
+        # Without stored bars the 52-week high comes from info
+        self.assertEqual(quote["year_high"], 120.0)
+        info_cache.get.assert_called_once_with("^DJI", ["fiftyTwoWeekHigh"])
+
+        with patch("market_snapshot.yf.Ticker") as ticker:
+            ticker.return_value.fast_info = {}
+            ticker.return_value.history.return_value = pd.DataFrame()
+            quote = MarketSnapshot([{"name": "Dow Jones", "symbol": "^DJI"}], workers=1).quotes()[0]
+        self.assertTrue(quote["error"])
+
+
+if __name__ == '__main__':
+    unittest.main()
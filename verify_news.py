@@ -2,6 +2,12 @@ import unittest
 from unittest.mock import MagicMock, patch
 import sys
 import os
+import json
+import random
+import tempfile
+import time
+
+import pandas as pd
 
 # Add parent directory to path to import main
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -11,14 +17,30 @@ sys.modules['pandas_ta'] = MagicMock()
 sys.modules['mplfinance'] = MagicMock()
 sys.modules['matplotlib'] = MagicMock()
 sys.modules['matplotlib.pyplot'] = MagicMock()
+sys.modules['matplotlib.colors'] = MagicMock()
+sys.modules['matplotlib.dates'] = MagicMock()
 
 # Import the module to be tested
 # We will patch yfinance.Ticker inside the test methods
 import main
+from news_cache import NewsCache
+from market_snapshot import MarketSnapshot
+from news_history import NewsHistory
+import headlines
+import publishers
+from publishers import PublisherClassifier
 
 class TestFetchNews(unittest.TestCase):
 
     def setUp(self):
+        # News is cached per run; start each test from an empty cache and no shown headlines
+        main.NEWS_CACHE.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        history = patch.object(main, "NEWS_HISTORY", NewsHistory(path=os.path.join(tmp.name, "history.json")))
+        history.start()
+        self.addCleanup(history.stop)
+
         # Sample news data for testing
         self.mock_news_data = [
             {
@@ -204,5 +226,165 @@ class TestFetchNews(unittest.TestCase):
             self.assertEqual(results[0]['title'], "NVDA News (New)", "Should be sorted by latest first")
             self.assertEqual(results[1]['title'], "AMD News (Old)")
 
+    def test_shared_headline_goes_to_the_first_ticker_with_workers(self):
+        shared = {"title": "Chip stocks rally on AI demand", "publisher": "Reuters",
+                  "link": "https://reuters.com/chips", "providerPublishTime": 1672345700}
+
+        def raw_news(symbol):
+            return [dict(shared), {"title": f"{symbol} files quarterly report", "publisher": "Reuters",
+                                   "link": f"https://reuters.com/{symbol}", "providerPublishTime": 1672345600}]
+
+        def fetch(ticker, history=None):
+            # The first ticker's fetch finishes last
+            time.sleep(0.05 if ticker == "AAA" else 0.0)
+            df = pd.DataFrame({"Close": [1.0, 2.0]}, index=pd.to_datetime(["2026-10-15", "2026-10-16"]))
+            return {"Symbol": ticker, "History": df, "LongName": ticker, "AfterPrice": None}
+
+        def analyze(data, chart_jobs=None, chart_mode="png"):
+            return {"Symbol": data["Symbol"], "News": [n['title'] for n in data["News"]]}
+
+        for _ in range(3):
+            with tempfile.TemporaryDirectory() as tmp, \
+                    patch.object(main, "NEWS_HISTORY", NewsHistory(path=os.path.join(tmp, "history.json"))), \
+                    patch.object(main, "NEWS_CACHE", NewsCache(fetch=raw_news)), \
+                    patch.object(main, "fetch_ticker_data", fetch), \
+                    patch.object(main, "analyze_ticker_data", analyze), \
+                    patch.object(main, "render_chart_stage", lambda jobs, workers=None, chart_mode="png": []):
+                aaa, bbb = main.analyze_tickers(["AAA", "BBB"], workers=4)
+            self.assertIn(shared["title"], aaa["News"])
+            self.assertNotIn(shared["title"], bbb["News"])
+            self.assertEqual(bbb["News"], ["BBB files quarterly report"])
+
+class TestPublisherClassifier(unittest.TestCase):
+
+    def test_substring_tiers(self):
+        classifier = PublisherClassifier(main.EXCLUDED_PUBLISHERS, main.PREFERRED_PUBLISHERS, main.MAJOR_PUBLISHERS)
+        self.assertEqual(classifier.tier("Barrons.com"), publishers.EXCLUDED)
+        self.assertEqual(classifier.tier("The Wall Street Journal"), publishers.EXCLUDED)
+        self.assertEqual(classifier.tier("REUTERS"), publishers.PREFERRED)
+        self.assertEqual(classifier.tier("Bloomberg Opinion"), publishers.MAJOR)
+        self.assertEqual(classifier.tier("Small Blog"), publishers.OTHER)
+        # "AP" also matches inside other names, as with the plain substring checks
+        self.assertEqual(classifier.tier("Snap Daily"), publishers.PREFERRED)
+        # An excluded name wins wherever it appears
+        self.assertEqual(classifier.tier("Reuters via Zacks"), publishers.EXCLUDED)
+        self.assertEqual(classifier.tier("zacks / Reuters"), publishers.EXCLUDED)
+
+    def test_overlapping_names(self):
+        classifier = PublisherClassifier(["Fool"], ["Motley"], [])
+        self.assertEqual(classifier.tier("Motley Fool"), publishers.EXCLUDED)
+        classifier = PublisherClassifier(["abc"], ["xab"], [])
+        self.assertEqual(classifier.tier("xabc"), publishers.EXCLUDED)
+
+
+class TestNewsHistory(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "history.json")
+
+    def test_shown_headlines_are_not_repeated_on_later_days(self):
+        day1 = NewsHistory(path=self.path, day="2026-10-15")
+        self.assertTrue(day1.claim("Fed holds rates", "https://www.reuters.com/markets/fed?utm=x"))
+        # Another card in the same run, or a syndicated copy of the title
+        self.assertFalse(day1.claim("Fed holds rates", "https://apnews.com/fed"))
+        self.assertFalse(day1.claim("FED HOLDS RATES!", "https://cnbc.com/a"))
+        day1.save()
+
+        # Rerun for the same market date: same news again
+        rerun = NewsHistory(path=self.path, day="2026-10-15")
+        self.assertTrue(rerun.claim("Fed holds rates", "https://reuters.com/markets/fed/"))
+
+        day2 = NewsHistory(path=self.path, day="2026-10-16")
+        self.assertTrue(day2.seen("Other title", "http://reuters.com/markets/fed"))
+        self.assertFalse(day2.claim("Fed holds rates", "https://cnbc.com/b"))
+        self.assertTrue(day2.claim("Stocks rally", "https://cnbc.com/c"))
+
+    def test_entries_expire_and_size_is_bounded(self):
+        history = NewsHistory(path=self.path, ttl=3600, max_entries=4, day="2026-10-15")
+        with patch("news_history.time.time", return_value=1000.0):
+            history.claim("Old", "https://x/old")
+        for i in range(3):
+            with patch("news_history.time.time", return_value=5000.0 + i):
+                history.claim(f"New {i}", f"https://x/{i}")
+        history.save()
+        with open(self.path) as f:
+            self.assertEqual(len(json.load(f)), 4)  # 2 keys per article, newest 2 articles
+
+        with patch("news_history.time.time", return_value=5001.5 + 3600):
+            later = NewsHistory(path=self.path, ttl=3600, day="2026-10-16")
+            self.assertFalse(later.seen("New 0", "https://x/0"))  # dropped by the size bound
+            self.assertFalse(later.seen("New 1", "https://x/1"))  # expired
+            self.assertTrue(later.seen("New 2", "https://x/2"))
+
+
+class TestHeadlineClustering(unittest.TestCase):
+
+    def test_near_duplicates_are_grouped(self):
+        titles = [
+            "Nvidia shares rise after earnings beat",
+            "Oracle cloud revenue jumps 50%",
+            "Nvidia stock rises after earnings beat estimates",
+            "Fed holds interest rates steady",
+            "Fed keeps interest rates steady as inflation cools",
+            "Nvidia's shares rise after earnings beat, says analyst",
+        ]
+        self.assertEqual(headlines.cluster_headlines(titles), [0, 1, 0, 3, 3, 0])
+
+    def test_best_tier_copy_is_kept(self):
+        items = [
+            {"title": "Nvidia stock rises after earnings beat estimates", "publisher": "Small Blog", "link": "https://blog/1", "providerPublishTime": 3},
+            {"title": "Nvidia shares rise after earnings beat", "publisher": "Investing.com", "link": "https://inv/1", "providerPublishTime": 2},
+            {"title": "Nvidia's shares rise after earnings beat", "publisher": "Reuters", "link": "https://reuters/1", "providerPublishTime": 1},
+            {"title": "Oracle cloud revenue jumps 50%", "publisher": "Small Blog", "link": "https://blog/2", "providerPublishTime": 0},
+        ]
+        kept = headlines.best_of_clusters(items, lambda n: n["title"], main.news_rank)
+        # Both preferred copies tie on tier: the newer one wins
+        self.assertEqual([n["link"] for n in kept], ["https://inv/1", "https://blog/2"])
+
+    def test_large_feed_is_not_quadratic(self):
+        rng = random.Random(0)
+        vocab = [f"w{i}" for i in range(3000)]
+        titles = [" ".join(rng.sample(vocab, 10)) for _ in range(2000)]
+        titles += [t + " update" for t in titles[:100]]
+        start = time.perf_counter()
+        clusters = headlines.cluster_headlines(titles)
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(len(set(clusters)), 2000)
+        self.assertEqual(clusters[2000:], list(range(100)))
+
+
+class TestNewsCache(unittest.TestCase):
+
+    def test_each_symbol_is_fetched_once(self):
+        calls = []
+        def fetch(symbol):
+            calls.append(symbol)
+            if symbol == "BAD":
+                raise ValueError("boom")
+            return [{"title": f"{symbol} news"}]
+
+        cache = NewsCache(fetch=fetch, workers=4)
+        cache.prefetch(["NVDA", "AMD", "NVDA", "BAD", "^GSPC"])
+        self.assertEqual(sorted(calls), ["AMD", "BAD", "NVDA", "^GSPC"])
+
+        self.assertEqual([n["title"] for n in cache.get_many(["AMD", "BAD", "NVDA"])], ["AMD news", "NVDA news"])
+        cache.prefetch(["NVDA", "MU"])
+        self.assertEqual(len(calls), 5)
+
+    def test_tickers_sharing_an_underlying_share_its_news(self):
+        calls = []
+        cache = NewsCache(fetch=lambda symbol: calls.append(symbol) or [], workers=2)
+        with patch.object(main, "NEWS_CACHE", cache), \
+             patch.dict('main.UNDERLYING_MAP', {"LONG": "NVDA", "SHORT": "NVDA", "BASKET": ["NVDA", "AMD"]}):
+            main.prefetch_news(["LONG", "SHORT", "BASKET"])
+            for ticker in ["LONG", "SHORT", "BASKET"]:
+                main.fetch_news(ticker)
+            index_histories = {idx["symbol"]: pd.DataFrame({"Close": [1.0, 2.0], "High": [1.0, 2.0]}) for idx in main.MARKET_INDICES}
+            main.fetch_market_news(snapshot=MarketSnapshot(main.MARKET_INDICES, index_histories, news_cache=cache))
+        self.assertEqual(sorted(calls), sorted(["NVDA", "AMD"] + [idx["symbol"] for idx in main.MARKET_INDICES]))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from price_store import PriceStore
+
+
+def make_bars(dates, closes, dividends=None):
+    index = pd.DatetimeIndex(pd.to_datetime(dates)).tz_localize("America/New_York")
+    return pd.DataFrame({
+        "Open": closes,
+        "High": [c + 1 for c in closes],
+        "Low": [c - 1 for c in closes],
+        "Close": closes,
+        "Volume": [1000] * len(closes),
+        "Dividends": dividends or [0.0] * len(closes),
+        "Stock Splits": [0.0] * len(closes),
+    }, index=index)
+
+
+class FakeFetch:
+    """Serves bars from an in-memory 'upstream' history and records every request."""
+
+    def __init__(self, upstream):
+        self.upstream = upstream
+        self.calls = []
+
+    def __call__(self, symbol, start):
+        self.calls.append(start)
+        if start is None:
+            return self.upstream
+        return self.upstream[self.upstream.index.tz_localize(None) >= pd.Timestamp(start)]
+
+
+class TestPriceStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = PriceStore(os.path.join(self.tmp.name, "prices.sqlite"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_backfill_then_incremental(self):
+        dates = ["2026-01-05", "2026-01-06", "2026-01-07"]
+        fetch = FakeFetch(make_bars(dates, [10.0, 11.0, 12.0]))
+        df = self.store.get_history("TEST", fetch=fetch)
+        self.assertEqual(fetch.calls, [None], "First run should backfill the full history")
+        self.assertEqual(list(df["Close"]), [10.0, 11.0, 12.0])
+
+        # Next day: the last bar (partial) moved and a new bar appeared
+        fetch.upstream = make_bars(dates + ["2026-01-08"], [10.0, 11.0, 12.5, 13.0])
+        df = self.store.get_history("TEST", fetch=fetch)
+        self.assertEqual(fetch.calls[-1], "2026-01-06", "Only bars from the overlap onwards should be fetched")
+        self.assertEqual(list(df["Close"]), [10.0, 11.0, 12.5, 13.0])
+        self.assertEqual(list(self.store.load("TEST")["Close"]), [10.0, 11.0, 12.5, 13.0])
+
+    def test_revised_history_triggers_backfill(self):
+        dates = ["2026-01-05", "2026-01-06", "2026-01-07"]
+        fetch = FakeFetch(make_bars(dates, [10.0, 11.0, 12.0]))
+        self.store.get_history("TEST", fetch=fetch)
+
+        # A dividend re-adjusts every earlier close
+        fetch.upstream = make_bars(
+            dates + ["2026-01-08"], [9.5, 10.5, 11.5, 13.0], dividends=[0.0, 0.0, 0.0, 0.5]
+        )
+        df = self.store.get_history("TEST", fetch=fetch)
+        self.assertIsNone(fetch.calls[-1], "Re-adjusted history should be refetched in full")
+        self.assertEqual(list(df["Close"]), [9.5, 10.5, 11.5, 13.0])
+        self.assertEqual(list(self.store.load("TEST")["Close"]), [9.5, 10.5, 11.5, 13.0])
+
+    def test_batched_download(self):
+        dates = ["2026-01-05", "2026-01-06", "2026-01-07"]
+        upstream = {
+            "AAA": make_bars(dates, [10.0, 11.0, 12.0]),
+            "BBB": make_bars(dates, [20.0, 21.0, 22.0]),
+            "^IDX": make_bars(dates, [30.0, 31.0, 32.0]),
+        }
+        calls = []
+
+        def download(symbols, start):
+            calls.append((sorted(symbols), start))
+            return {s: FakeFetch(upstream[s])(s, start) for s in symbols}
+
+        histories = self.store.get_histories(["AAA", "BBB", "^IDX"], download=download)
+        self.assertEqual(calls, [(["AAA", "BBB", "^IDX"], None)], "Backfill should be one batched request")
+        self.assertEqual(list(histories["BBB"]["Close"]), [20.0, 21.0, 22.0])
+
+        histories = self.store.get_histories(["AAA", "BBB", "^IDX"], download=download)
+        self.assertEqual(calls[-1], (["AAA", "BBB", "^IDX"], "2026-01-06"), "Updates should be one batched request")
+        self.assertEqual(list(histories["^IDX"]["Close"]), [30.0, 31.0, 32.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
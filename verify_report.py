@@ -0,0 +1,64 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import report
+
+
+def make_result(symbol, **overrides):
+    res = {
+        "Symbol": symbol, "LongName": f"{symbol} Corp", "Price": 10.5, "Change": -1.2,
+        "AfterPrice": None, "AfterChange": None, "NewsAsset": symbol, "News": [],
+        "Chart": f"{symbol}_chart.png", "ChartMode": "png", "ChartVariants": None,
+        "Signals": {"Buy1": False, "Buy2": False, "Sell1": False},
+    }
+    res.update(overrides)
+    return res
+
+
+class TestReport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_assets_are_fingerprinted_and_stale_copies_removed(self):
+        stale = os.path.join(self.tmp.name, "static", "report.0123456789.css")
+        os.makedirs(os.path.dirname(stale))
+        open(stale, "w").close()
+
+        assets = report.publish_assets(self.tmp.name)
+        self.assertEqual(sorted(assets), sorted(report.STATIC_ASSETS))
+        self.assertRegex(assets["report.css"], r"^static/report\.[0-9a-f]{10}\.css$")
+        self.assertFalse(os.path.exists(stale))
+        with open(os.path.join(self.tmp.name, assets["report.css"]), "rb") as f, \
+             open(os.path.join(report.STATIC_DIR, "report.css"), "rb") as src:
+            self.assertEqual(f.read(), src.read())
+        self.assertEqual(report.publish_assets(self.tmp.name), assets)
+
+    def test_render_report(self):
+        results = [
+            make_result("AAA", Signals={"Buy1": True, "Buy2": False, "Sell1": False},
+                        News=[{"title": "AAA beats $5 estimate", "link": "https://x/a", "publisher": "Reuters"}]),
+            make_result("BBB", ChartMode="series", Chart="BBB_series.json"),
+        ]
+        html = report.render_report(
+            results, date_str="2026-10-17 06:05:00 KST", title_date="2026-10-17",
+            market_date_line="Reference Market Date: 2026-10-16",
+            indices=[{"name": "S&P 500", "price": 6000.0, "change_pct": 0.5}],
+            highlights=[], market_news=[], public_dir=self.tmp.name,
+        )
+        self.assertNotIn("$", html.replace("$5", ""))
+        self.assertIn('<div class="badge buy">AAA</div>', html)
+        self.assertIn("AAA beats $5 estimate", html)
+        self.assertIn('data-series="charts/BBB_series.json"', html)
+        self.assertIn("No major headlines found.", html)
+        self.assertRegex(html, r'<script src="static/series-chart\.[0-9a-f]{10}\.js" defer>')
+        self.assertIn("6,000.00", html)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import results_json
+
+
+class TestResultsJson(unittest.TestCase):
+
+    def test_snapshot_round_trip(self):
+        results = [
+            {"Symbol": "AAA", "Price": np.float64(10.5), "RSI": np.float64("nan"),
+             "Signals": {"Buy1": np.bool_(True), "Buy2": False, "Sell1": False},
+             "News": [{"title": "t", "link": "https://x/a", "publisher": "Reuters"}]},
+            "❌ BBB: Unable to fetch data.",
+        ]
+        market = {"summary": "s", "indices": [{"name": "S&P 500", "price": np.float64(6000.0), "change_pct": 0.5}],
+                  "highlights": [], "news": []}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "public", "results.json")
+            results_json.write_results_json(results, "2026-10-16", market, path=path)
+            with open(path, encoding="utf-8") as f:
+                json.loads(f.read(), parse_constant=self.fail)  # strict JSON: no NaN
+            data = results_json.read_results_json(path)
+
+        self.assertEqual(data["version"], results_json.RESULTS_VERSION)
+        self.assertEqual(data["market_date"], "2026-10-16")
+        self.assertEqual(data["errors"], ["❌ BBB: Unable to fetch data."])
+        ticker = data["tickers"][0]
+        self.assertEqual((ticker["Price"], ticker["RSI"]), (10.5, None))
+        self.assertIs(ticker["Signals"]["Buy1"], True)
+        self.assertEqual(data["market"]["indices"][0]["price"], 6000.0)
+
+    def test_unknown_version_is_rejected(self):
+        snapshot = results_json.build_results([], "2026-10-16", {}, generated_at=datetime(2026, 10, 16, tzinfo=timezone.utc))
+        self.assertEqual(snapshot["generated_at"], "2026-10-16T00:00:00+00:00")
+        snapshot["version"] = results_json.RESULTS_VERSION + 1
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump(snapshot, f)
+        self.addCleanup(os.remove, f.name)
+        with self.assertRaises(ValueError):
+            results_json.read_results_json(f.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
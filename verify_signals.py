@@ -0,0 +1,72 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import signals
+
+
+def scalar_signals(close, rsi, ema20, ema60, ema120):
+    """The original hard-coded Buy1/Buy2/Sell1 logic of fetch_and_analyze (reference)."""
+    c_rsi = rsi if not pd.isna(rsi) else 50
+    c_ema20 = ema20 if not pd.isna(ema20) else 0
+    c_ema60 = ema60 if not pd.isna(ema60) else 0
+    c_ema120 = ema120 if not pd.isna(ema120) else 0
+
+    alignment_buy = (c_ema20 < c_ema60)
+    if c_ema120 > 0:
+        alignment_buy = alignment_buy and (c_ema60 < c_ema120)
+    is_buy_1 = alignment_buy and (c_ema20 > 0) and (close < c_ema20)
+    is_buy_2 = is_buy_1 and (c_rsi < 30)
+    if is_buy_2:
+        is_buy_1 = False
+
+    alignment_sell = (c_ema20 > c_ema60)
+    if c_ema120 > 0:
+        alignment_sell = alignment_sell and (c_ema60 > c_ema120)
+    is_sell_1 = alignment_sell and (close > c_ema20) and (c_rsi > 70)
+    return {"Buy1": bool(is_buy_1), "Buy2": bool(is_buy_2), "Sell1": bool(is_sell_1)}
+
+
+def random_frame(n, seed):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        "Close": rng.uniform(80, 120, n),
+        "RSI": rng.uniform(0, 100, n),
+        "EMA20": rng.uniform(80, 120, n),
+        "EMA60": rng.uniform(80, 120, n),
+        "EMA120": rng.uniform(80, 120, n),
+    })
+    # Missing indicators (new listings, warm-up bars)
+    for column in ["RSI", "EMA20", "EMA60", "EMA120"]:
+        frame.loc[rng.random(n) < 0.15, column] = np.nan
+    return frame
+
+
+class TestSignalRules(unittest.TestCase):
+
+    def test_rules_match_scalar_logic_on_every_bar(self):
+        frame = random_frame(5000, seed=11)
+        masks = signals.evaluate_signals(frame)
+        for i, row in enumerate(frame.itertuples(index=False)):
+            expected = scalar_signals(row.Close, row.RSI, row.EMA20, row.EMA60, row.EMA120)
+            got = {name: bool(mask.iloc[i]) for name, mask in masks.items()}
+            self.assertEqual(got, expected, f"Signal mismatch on bar {i}: {row}")
+
+    def test_buy2_supersedes_buy1(self):
+        frame = pd.DataFrame({"Close": [90.0], "RSI": [20.0], "EMA20": [100.0], "EMA60": [110.0], "EMA120": [np.nan]})
+        self.assertEqual(signals.latest_signals(frame), {"Buy1": False, "Buy2": True, "Sell1": False})
+
+    def test_custom_parameters(self):
+        frame = pd.DataFrame({"Close": [90.0], "RSI": [35.0], "EMA20": [100.0], "EMA60": [110.0], "EMA120": [120.0]})
+        evaluate = signals.compile_rules(params={"rsi_oversold": 40})
+        self.assertTrue(bool(evaluate(frame)["Buy2"].iloc[-1]))
+        self.assertFalse(signals.latest_signals(frame)["Buy2"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Wall-clock budget for the market-day check (measured ~0.07s, mostly interpreter start-up)
+STATUS_STARTUP_TARGET = 0.5
+
+PLOTTING_MODULES = ["matplotlib", "mplfinance", "PIL", "pandas_ta"]
+
+
+def loaded_modules(code, names):
+    """Which of `names` a fresh interpreter has imported after running `code`."""
+    check = f"import sys; {code}; print('loaded:' + ','.join(n for n in {names!r} if n in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", check], cwd=ROOT, capture_output=True, text=True, check=True)
+    line = [l for l in out.stdout.splitlines() if l.startswith("loaded:")][-1]
+    return [n for n in line[len("loaded:"):].split(",") if n]
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_main_does_not_load_plotting_libraries(self):
+        self.assertEqual(loaded_modules("import main", PLOTTING_MODULES), [])
+
+    def test_market_check_is_lightweight(self):
+        code = "sys.path.insert(0, 'scripts'); import check_market"
+        self.assertEqual(loaded_modules(code, PLOTTING_MODULES + ["pandas", "yfinance"]), [])
+
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join("scripts", "check_market.py")], cwd=ROOT,
+                       capture_output=True, check=True, env={**os.environ, "GITHUB_OUTPUT": ""})
+        self.assertLess(time.perf_counter() - start, STATUS_STARTUP_TARGET)
+
+
+if __name__ == '__main__':
+    unittest.main()
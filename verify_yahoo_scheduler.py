@@ -0,0 +1,142 @@
+import unittest
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from yahoo_scheduler import CircuitOpenError, RequestScheduler, TokenBucket, is_throttled, is_transient
+
+
+class YFRateLimitError(Exception):
+    """Stand-in with yfinance's class name (matched by name, like the real one)."""
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def flaky(errors, result="ok"):
+    """A call failing with each of `errors` in turn, then returning `result`."""
+    errors = list(errors)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if errors:
+            raise errors.pop(0)
+        return result
+    return fn, calls
+
+
+class TestYahooScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def scheduler(self, **kwargs):
+        kwargs.setdefault("rate", 1000.0)
+        return RequestScheduler(clock=self.clock, sleep=self.clock.sleep, seed=1, **kwargs)
+
+    def test_error_classification(self):
+        self.assertTrue(is_throttled(YFRateLimitError("Too Many Requests. Rate limited.")))
+        self.assertTrue(is_transient(TimeoutError("read timed out")))
+        self.assertTrue(is_transient(ConnectionError("reset")))
+        self.assertFalse(is_transient(KeyError("regularMarketPrice")))
+
+    def test_retries_throttled_calls_with_growing_jittered_backoff(self):
+        yahoo = self.scheduler(retries=4, backoff_base=1.0)
+        fn, calls = flaky([YFRateLimitError("Too Many Requests")] * 3)
+        self.assertEqual(yahoo.call("info", fn), "ok")
+        self.assertEqual(len(calls), 4)
+
+        backoffs = [s for s in self.clock.sleeps if s >= 0.5]
+        self.assertEqual(len(backoffs), 3)
+        for attempt, delay in enumerate(backoffs):
+            self.assertGreaterEqual(delay, 2 ** attempt / 2)
+            self.assertLessEqual(delay, 2 ** attempt)
+        stats = yahoo.stats["info"]
+        self.assertEqual((stats["calls"], stats["retries"], stats["throttled"], stats["failed"]), (1, 3, 3, 0))
+
+    def test_other_errors_are_not_retried(self):
+        yahoo = self.scheduler()
+        fn, calls = flaky([KeyError("no such field")])
+        with self.assertRaises(KeyError):
+            yahoo.call("info", fn)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(yahoo.breaker("info").state, "closed")
+
+    def test_circuit_opens_fails_fast_and_recovers(self):
+        yahoo = self.scheduler(retries=0, breaker_threshold=3, breaker_cooldown=60.0)
+        fn, calls = flaky([TimeoutError("timed out")] * 3)
+        for _ in range(3):
+            with self.assertRaises(TimeoutError):
+                yahoo.call("news", fn)
+        self.assertEqual(yahoo.breaker("news").state, "open")
+
+        # Open: rejected without calling Yahoo; other endpoints are unaffected
+        with self.assertRaises(CircuitOpenError):
+            yahoo.call("news", fn)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(yahoo.call("info", lambda: "info"), "info")
+
+        # After the cooldown one trial request closes it again
+        self.clock.now += 60.0
+        self.assertEqual(yahoo.call("news", fn), "ok")
+        self.assertEqual(yahoo.breaker("news").state, "closed")
+        self.assertEqual(yahoo.stats["news"]["rejected"], 1)
+
+    def test_failed_trial_reopens_circuit(self):
+        yahoo = self.scheduler(retries=0, breaker_threshold=1, breaker_cooldown=10.0)
+        fn, _ = flaky([TimeoutError("t"), TimeoutError("t")])
+        with self.assertRaises(TimeoutError):
+            yahoo.call("quote", fn)
+        self.clock.now += 10.0
+        with self.assertRaises(TimeoutError):
+            yahoo.call("quote", fn)
+        with self.assertRaises(CircuitOpenError):
+            yahoo.call("quote", fn)
+
+    def test_token_bucket_paces_requests(self):
+        bucket = TokenBucket(rate=2.0, burst=2, clock=self.clock, sleep=self.clock.sleep)
+        for _ in range(6):
+            bucket.acquire()
+        # Two requests go out at once, the other four at 2 per second
+        self.assertAlmostEqual(self.clock.now, 2.0)
+        bucket.pause(5.0)
+        bucket.acquire()
+        self.assertAlmostEqual(self.clock.now, 7.5)
+
+    def test_per_endpoint_concurrency_limit(self):
+        yahoo = RequestScheduler(rate=1000.0, burst=100, concurrency={"history": 2})
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def fetch():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+        threads = [threading.Thread(target=yahoo.call, args=("history", fetch)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(peak[0], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,247 @@
+"""
+One scheduler for every Yahoo Finance request.
+
+Yahoo throttles per client, so all yfinance calls (price history, info, news,
+quotes) go through the shared YAHOO scheduler instead of failing independently:
+
+- a token bucket paces requests across all endpoints (a batched download costs
+  one token per symbol), and a throttled response pauses the bucket for everyone;
+- each endpoint has its own concurrency limit;
+- throttled (429) and transient (timeouts, connection errors, 5xx) failures are
+  retried with jittered exponential backoff; other errors are raised at once;
+- each endpoint has a circuit breaker: after BREAKER_THRESHOLD consecutive
+  failures its calls fail fast with CircuitOpenError until BREAKER_COOLDOWN has
+  passed, then a single trial request decides whether it closes again.
+
+Calls made with a `key` are recorded / replayed by the HTTP tape (http_tape.py);
+replayed calls skip the pacing, limits and retries.
+
+`summary()` reports calls, retries and failures per endpoint at the end of a run.
+"""
+import random
+import threading
+import time
+
+from http_tape import TAPE
+
+# Requests per second across all endpoints, and how many may be sent back to back
+YAHOO_RATE = 5.0
+YAHOO_BURST = 20
+
+# Concurrent requests per endpoint (endpoints not listed use DEFAULT_CONCURRENCY)
+ENDPOINT_CONCURRENCY = {"history": 4, "info": 4, "news": 8, "quote": 4}
+DEFAULT_CONCURRENCY = 4
+
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 60.0
+
+THROTTLE_STATUS = {429}
+TRANSIENT_STATUS = {500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised without contacting Yahoo while an endpoint's circuit is open."""
+
+
+def _status(exc):
+    return getattr(getattr(exc, "response", None), "status_code", None)
+
+def is_throttled(exc):
+    """True for Yahoo's rate-limit responses (yfinance raises YFRateLimitError or an HTTP 429)."""
+    return (type(exc).__name__ == "YFRateLimitError" or _status(exc) in THROTTLE_STATUS
+            or "too many requests" in str(exc).lower())
+
+def is_transient(exc):
+    """True for failures worth retrying: throttling, timeouts, dropped connections and 5xx."""
+    if is_throttled(exc) or _status(exc) in TRANSIENT_STATUS:
+        return True
+    # requests / curl_cffi timeouts and connection errors don't derive from the builtins
+    name = type(exc).__name__
+    return isinstance(exc, (ConnectionError, TimeoutError)) or "Timeout" in name or "ConnectionError" in name
+
+
+class TokenBucket:
+    def __init__(self, rate, burst, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = burst
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        # Nothing accrues while paused
+        since = max(self._updated, min(now, self._paused_until))
+        self._tokens = min(self.burst, self._tokens + (now - since) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` (at most `burst`) are available, then take them."""
+        tokens = min(tokens, self.burst)
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= tokens - 1e-9:  # tolerate float rounding in the refill
+                    self._tokens -= tokens
+                    return
+                else:
+                    wait = (tokens - self._tokens) / self.rate
+            self.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold every request for `seconds` and restart from an empty bucket."""
+        with self._lock:
+            now = self.clock()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0
+            self._updated = now
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, threshold, cooldown, clock=time.monotonic, name="Yahoo"):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """False while open; after the cooldown lets exactly one trial request through."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.clock() - self._opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+
+    def failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.threshold:
+                if self.state != self.OPEN:
+                    print(f"{self.name} circuit opened after {self._failures} consecutive failures. "
+                          f"Retrying in {self.cooldown:.0f}s.")
+                self.state = self.OPEN
+                self._opened_at = self.clock()
+
+
+class RequestScheduler:
+    def __init__(self, rate=YAHOO_RATE, burst=YAHOO_BURST, concurrency=None, retries=MAX_RETRIES,
+                 backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX,
+                 breaker_threshold=BREAKER_THRESHOLD, breaker_cooldown=BREAKER_COOLDOWN,
+                 clock=time.monotonic, sleep=time.sleep, seed=None, tape=None):
+        self.tape = tape
+        self.bucket = TokenBucket(rate, burst, clock=clock, sleep=sleep)
+        self.concurrency = dict(ENDPOINT_CONCURRENCY if concurrency is None else concurrency)
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.clock = clock
+        self.sleep = sleep
+        self._random = random.Random(seed)
+        self._endpoints = {}  # endpoint -> (semaphore, CircuitBreaker)
+        self.stats = {}       # endpoint -> {"calls", "retries", "throttled", "failed", "rejected"}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, endpoint):
+        with self._lock:
+            if endpoint not in self._endpoints:
+                limit = threading.BoundedSemaphore(self.concurrency.get(endpoint, DEFAULT_CONCURRENCY))
+                breaker = CircuitBreaker(self.breaker_threshold, self.breaker_cooldown,
+                                         clock=self.clock, name=f"Yahoo {endpoint}")
+                self._endpoints[endpoint] = (limit, breaker)
+                self.stats[endpoint] = dict.fromkeys(["calls", "retries", "throttled", "failed", "rejected"], 0)
+            return self._endpoints[endpoint]
+
+    def _count(self, endpoint, key):
+        with self._lock:
+            self.stats[endpoint][key] += 1
+
+    def backoff(self, attempt):
+        """Delay before retry `attempt` (0-based): exponential, capped, half of it jittered."""
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return delay / 2 + self._random.uniform(0, delay / 2)
+
+    def breaker(self, endpoint):
+        return self._endpoint(endpoint)[1]
+
+    def call(self, endpoint, fn, *args, cost=1, key=None, **kwargs):
+        """
+        Run `fn(*args, **kwargs)` as a request to `endpoint`, paced, limited and retried.
+        `cost` is the number of Yahoo requests the call makes (e.g. symbols in a batch);
+        `key` identifies the request for record / replay.
+        Raises CircuitOpenError while the endpoint's circuit is open, or the last error.
+        """
+        if key is not None and self.tape is not None and self.tape.active:
+            return self.tape.call(f"yahoo-{endpoint}", key, lambda: self._call(endpoint, fn, args, kwargs, cost))
+        return self._call(endpoint, fn, args, kwargs, cost)
+
+    def _call(self, endpoint, fn, args, kwargs, cost):
+        limit, breaker = self._endpoint(endpoint)
+        self._count(endpoint, "calls")
+        for attempt in range(self.retries + 1):
+            if not breaker.allow():
+                self._count(endpoint, "rejected")
+                raise CircuitOpenError(f"Yahoo {endpoint} requests suspended after repeated failures")
+            self.bucket.acquire(cost)
+            with limit:
+                try:
+                    result = fn(*args, **kwargs)
+                except Exception as e:
+                    error = e
+                else:
+                    breaker.success()
+                    return result
+
+            if not is_transient(error):
+                # Yahoo answered (unknown symbol, bad data, ...): not a service failure
+                breaker.success()
+                raise error
+            breaker.failure()
+            delay = self.backoff(attempt)
+            if is_throttled(error):
+                self._count(endpoint, "throttled")
+                self.bucket.pause(delay)
+            if attempt == self.retries:
+                self._count(endpoint, "failed")
+                raise error
+            self._count(endpoint, "retries")
+            print(f"Yahoo {endpoint} request failed ({error}). Retrying in {delay:.1f}s...")
+            self.sleep(delay)
+
+    def summary(self):
+        """One line per endpoint used in this run."""
+        with self._lock:
+            return "\n".join(
+                f"Yahoo {endpoint}: {s['calls']} calls, {s['retries']} retries, {s['throttled']} throttled, "
+                f"{s['failed']} failed, {s['rejected']} rejected (circuit {self._endpoints[endpoint][1].state})"
+                for endpoint, s in sorted(self.stats.items())
+            )
+
+
+# Shared by every module that talks to Yahoo
+YAHOO = RequestScheduler(tape=TAPE)